@@ -0,0 +1,273 @@
+"""
+Reproducible performance benchmarks on synthetic well reports.
+
+Times PDF parsing, table extraction, save_chunks, get_chunks and the full
+process_well_report pipeline for reports of each requested size, against a stub
+Ollama server and the hashing embedder, so results do not depend on models or the
+network. Results are written as JSON; with --baseline, the run fails (exit code 1)
+if any benchmark's median is slower than the baseline's by more than --threshold.
+
+Usage:
+    python benchmarks/run_benchmarks.py --pages 10 100 --output results.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --threshold 0.25
+    python benchmarks/run_benchmarks.py --pages 10 100 2000 --update-baseline baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Callable, Optional
+
+# Add the project root to the python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from benchmarks.synthetic_report import generate_report
+
+QUERIES = [
+    "casing shoe depth", "13 3/8 casing", "mud density", "oil based mud", "gas peak",
+    "total gas background", "sandstone reservoir", "formation tops", "bit run ROP", "LOT",
+]
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """
+    Answers /api/chat like Ollama after `latency` seconds. Streaming requests get the
+    answer in small pieces as NDJSON, followed by some chatty trailing output.
+    """
+    latency = 0.0
+    piece_chars = 8
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.latency:
+            time.sleep(self.latency)
+        if not body.get("messages"):
+            # A warm-up request: Ollama just loads the model.
+            self._send_json({"model": body["model"], "created_at": "2024-01-01T00:00:00Z",
+                             "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "load"})
+            return
+        prompt = body["messages"][-1]["content"]
+        if "well_name" in prompt:
+            content = '{"well_name": "Synthetic 1", "operator": "Benchmark Energy AS"}'
+        elif "casing_data" in prompt:
+            content = '{"casing_data": [], "mud_data": []}'
+        else:
+            content = "No drilling problems reported."
+        final = {
+            "model": body["model"],
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "prompt_eval_count": len(prompt) // 4,
+            "eval_count": len(content) // 4
+        }
+        if not body.get("stream", True):
+            self._send_json(final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        text = content + "\n\nLet me know if you need anything else!" if content.startswith("{") else content
+        try:
+            for start in range(0, len(text), self.piece_chars):
+                part = {"model": body["model"], "created_at": final["created_at"], "done": False,
+                        "message": {"role": "assistant", "content": text[start:start + self.piece_chars]}}
+                self.wfile.write(json.dumps(part).encode() + b"\n")
+                self.wfile.flush()
+            final["message"]["content"] = ""
+            self.wfile.write(json.dumps(final).encode() + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client stopped reading: the answer was complete.
+
+    def _send_json(self, response: Dict[str, Any]):
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_llm(latency: float = 0.0) -> ThreadingHTTPServer:
+    StubOllamaHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(function: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Runs `function` `repeat` times (after `setup` each time) with its output silenced."""
+    runs = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            function()
+            runs.append(time.perf_counter() - start)
+    return {
+        "median_seconds": round(statistics.median(runs), 6),
+        "min_seconds": round(min(runs), 6),
+        "runs": [round(run, 6) for run in runs]
+    }
+
+
+def write_config(workdir: str, llm_url: str) -> str:
+    config_path = os.path.join(workdir, "config.yaml")
+    with open(config_path, "w") as f:
+        f.write(
+            f'chroma_db_path: "{os.path.join(workdir, "chroma_db")}"\n'
+            'collection_name: "benchmark"\n'
+            f'pdf_folder: "{workdir}"\n'
+            f'ollama_url: "{llm_url}"\n'
+            f'llm_cache_path: "{os.path.join(workdir, "llm_cache.sqlite")}"\n'
+            'embedding_provider: "hashing"\n'
+            'embedding_cache_path: ""\n'
+            'chunk_max_tokens: 400\n'
+            'chunk_overlap_tokens: 50\n'
+            'hybrid_search: true\n'
+            'fast_layout: true\n'
+        )
+    return config_path
+
+
+def run_suite(pages_list: List[int], repeat: int = 3, llm_latency: float = 0.0) -> Dict[str, Any]:
+    """Runs every benchmark for a synthetic report of each size in `pages_list`."""
+    server = start_stub_llm(llm_latency)
+    llm_url = f"http://127.0.0.1:{server.server_port}"
+    previous_cwd = os.getcwd()
+    results: Dict[str, Any] = {}
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            # process_well_report reads config.yaml from the working directory.
+            os.chdir(workdir)
+            config_path = write_config(workdir, llm_url)
+
+            from main import process_well_report
+            from src.chunker import Chunker
+            from src.config import load_config
+            from src.database_manager import DatabaseManager
+            from src.llm_cache import get_default_cache
+            from src.specs_extractor import TechSpecsExtractor
+            from src.utils import PDFIngestor
+
+            config = load_config(config_path)
+            chunker = Chunker.from_config(config)
+            db = DatabaseManager(config_path=config_path)
+            specs_extractor = TechSpecsExtractor()
+
+            for pages in pages_list:
+                pdf_path = generate_report(os.path.join(workdir, f"report_{pages}.pdf"), pages=pages)
+
+                def parse(fast_layout: bool = False):
+                    ingestor = PDFIngestor(pdf_path, fast_layout=fast_layout)
+                    ingestor.parse(chunker=chunker)
+                    ingestor.close()
+
+                def fresh_database():
+                    db.reset_collection()
+                    get_default_cache().clear()
+
+                ingestor = PDFIngestor(pdf_path)
+                chunks = ingestor.parse(chunker=chunker)
+                ingestor.close()
+
+                results[f"parse[{pages}]"] = measure(parse, repeat)
+                results[f"parse_fast_layout[{pages}]"] = measure(lambda: parse(fast_layout=True), repeat)
+                results[f"extract_tables_to_markdown[{pages}]"] = measure(
+                    lambda: specs_extractor.extract_tables_to_markdown(pdf_path, ["Casing", "Mud"]), repeat
+                )
+                results[f"save_chunks[{pages}]"] = measure(lambda: db.save_chunks(chunks), repeat, fresh_database)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    db.save_chunks(chunks)
+                results[f"get_chunks[{pages}]"] = measure(
+                    lambda: [db.get_chunks(query, n_results=5) for query in QUERIES], repeat
+                )
+                results[f"process_well_report[{pages}]"] = measure(
+                    lambda: process_well_report(pdf_path), repeat, fresh_database
+                )
+    finally:
+        os.chdir(previous_cwd)
+        server.shutdown()
+
+    import fitz
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pymupdf": fitz.VersionBind,
+            "repeat": repeat,
+            "llm_latency_seconds": llm_latency
+        },
+        "benchmarks": results
+    }
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Benchmarks whose median is more than `threshold` (a fraction) slower than the baseline's."""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None or not previous["median_seconds"]:
+            continue
+        ratio = current["median_seconds"] / previous["median_seconds"]
+        if ratio > 1 + threshold:
+            regressions.append({
+                "benchmark": name,
+                "baseline_seconds": previous["median_seconds"],
+                "current_seconds": current["median_seconds"],
+                "ratio": round(ratio, 3)
+            })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the well report pipeline on synthetic reports.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100],
+                        help="Report sizes in pages (e.g. 10 100 2000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the median is compared.")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub LLM latency per request, in seconds.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--baseline", help="Baseline results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline, as a fraction (0.25 = 25%%).")
+    parser.add_argument("--update-baseline", metavar="PATH", help="Also write the results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.pages, repeat=args.repeat, llm_latency=args.llm_latency)
+    for path in filter(None, [args.output, args.update_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    for name, result in results["benchmarks"].items():
+        print(f"{name:45s} median {result['median_seconds']:9.4f}s  min {result['min_seconds']:9.4f}s")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']}: {regression['baseline_seconds']:.4f}s -> "
+                  f"{regression['current_seconds']:.4f}s ({regression['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
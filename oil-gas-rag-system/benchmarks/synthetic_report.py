@@ -0,0 +1,154 @@
+import random
+from typing import List, Tuple
+
+import fitz  # PyMuPDF
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 56
+FONT_SIZE = 9
+LINE_HEIGHT = 12
+
+# (heading, share of the report's pages). Headings follow the "4.0 Geology" numbering
+# that the section detection looks for.
+SECTIONS: List[Tuple[str, float]] = [
+    ("1.0 Introduction", 0.04),
+    ("2.0 Well Summary", 0.06),
+    ("3.0 Drilling Operations", 0.40),
+    ("4.0 Geology", 0.25),
+    ("5.0 Casing", 0.08),
+    ("6.0 Drilling Fluids", 0.08),
+    ("7.0 Formation Evaluation", 0.09),
+]
+
+CASING_STRINGS = [('30"', 150, 310.0), ('20"', 450, 133.0), ('13 3/8"', 1500, 68.0),
+                  ('9 5/8"', 3200, 53.5), ('7"', 4100, 29.0)]
+MUD_SYSTEMS = [("Spud Mud", 1.05), ("KCl Polymer", 1.25), ("Oil Based Mud", 1.45), ("Brine", 1.10)]
+LITHOLOGIES = ["sandstone", "shale", "claystone", "siltstone", "limestone", "marl", "dolomite", "anhydrite"]
+FORMATIONS = ["Nordland Group", "Hordaland Group", "Rogaland Group", "Shetland Group",
+              "Cromer Knoll Group", "Viking Group", "Brent Group", "Dunlin Group"]
+OPERATIONS = ["Drilled ahead", "Circulated bottoms up", "Pulled out of hole", "Ran in hole",
+              "Performed flow check", "Reamed tight spot", "Tested BOP", "Changed out bit"]
+
+
+def _draw_lines(page: fitz.Page, lines: List[str], top: float) -> float:
+    """Writes lines from `top` down and returns the y position after the last one."""
+    lines = lines[:max(0, int((PAGE_HEIGHT - MARGIN - top) // LINE_HEIGHT) + 1)]
+    if lines:
+        # One call per block: inserting line by line dominates generation time.
+        page.insert_text((MARGIN, top), "\n".join(lines), fontsize=FONT_SIZE,
+                         lineheight=LINE_HEIGHT / FONT_SIZE)
+    return top + LINE_HEIGHT * len(lines)
+
+
+def _draw_table(page: fitz.Page, rows: List[List[str]], top: float, column_width: float = 120) -> float:
+    """Draws a ruled table (which find_tables detects) and returns the y position below it."""
+    y = top
+    for row in rows:
+        x = MARGIN
+        for cell in row:
+            page.draw_rect(fitz.Rect(x, y, x + column_width, y + 16), width=0.5)
+            page.insert_text((x + 3, y + 11), cell, fontsize=FONT_SIZE)
+            x += column_width
+        y += 16
+    return y + LINE_HEIGHT
+
+
+def _header_lines(well_number: int) -> List[str]:
+    return [
+        "FINAL WELL REPORT",
+        "",
+        f"Well Name: Synthetic {well_number}",
+        "Operator: Benchmark Energy AS",
+        "Rig: Deepsea Synthetic",
+        "Field: Benchmark Field",
+        "Licence: PL 999",
+        "Spud Date: 2023-05-15",
+        "",
+    ]
+
+
+def _operations_lines(rng: random.Random, depth: int, count: int) -> Tuple[List[str], int]:
+    lines = []
+    for _ in range(count):
+        step = rng.randint(0, 4)
+        lines.append(f"{rng.choice(OPERATIONS)} from {depth} m to {depth + step} m in "
+                     f"{rng.uniform(0.5, 6.0):.1f} h, WOB {rng.randint(5, 25)} t, RPM {rng.randint(80, 180)}.")
+        depth += step
+    return lines, depth
+
+
+def _geology_lines(rng: random.Random, depth: int, count: int) -> Tuple[List[str], int]:
+    lines = []
+    for _ in range(count):
+        top = depth
+        depth += rng.randint(2, 10)
+        lines.append(f"Interval {top}-{depth} m MD: {rng.choice(LITHOLOGIES)} with traces of "
+                     f"{rng.choice(LITHOLOGIES)}, {rng.choice(FORMATIONS)}.")
+        lines.append(f"Total gas {rng.uniform(0.05, 4.5):.2f} % at {rng.randint(top, depth)} m, "
+                     f"background {rng.uniform(0.01, 0.3):.2f} %.")
+    return lines, depth
+
+
+def generate_report(path: str, pages: int = 10, seed: int = 0, well_number: int = 1) -> str:
+    """
+    Writes a synthetic final well report of `pages` pages to `path`.
+
+    The report has a header block on page 1, numbered sections sized in proportion to
+    SECTIONS, ruled casing and mud tables in their sections, bit-run tables every few
+    pages of the drilling operations, and lithology and gas descriptions in the geology
+    section. The same arguments always produce the same content.
+
+    Returns:
+        str: The path written.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+
+    # First page of each section, proportional to its share (at least one page each).
+    pages = max(pages, len(SECTIONS))
+    starts, cumulative = [], 0.0
+    for index, (_, share) in enumerate(SECTIONS):
+        start = round(cumulative * pages)
+        if starts:
+            start = max(start, starts[-1] + 1)
+        starts.append(min(start, pages - (len(SECTIONS) - index)))
+        cumulative += share
+    section_index = 0
+    depth = 150
+
+    for number in range(pages):
+        while section_index + 1 < len(SECTIONS) and number >= starts[section_index + 1]:
+            section_index += 1
+        heading = SECTIONS[section_index][0]
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        y = MARGIN + LINE_HEIGHT
+
+        if number == 0:
+            y = _draw_lines(page, _header_lines(well_number), y)
+        if number == starts[section_index]:
+            y = _draw_lines(page, [heading, ""], y)
+
+        if heading.endswith("Casing") and number == starts[section_index]:
+            rows = [["Casing Size", "Depth (m)", "Weight (lb/ft)"]]
+            rows += [[size, str(shoe), f"{weight:.1f}"] for size, shoe, weight in CASING_STRINGS]
+            y = _draw_table(page, rows, y)
+        elif heading.endswith("Drilling Fluids") and number == starts[section_index]:
+            rows = [["Mud Type", "Density (sg)"]] + [[name, f"{sg:.2f}"] for name, sg in MUD_SYSTEMS]
+            y = _draw_table(page, rows, y)
+        elif heading.endswith("Drilling Operations") and number % 5 == 0:
+            rows = [["Bit Run", "Depth In (m)", "Depth Out (m)", "ROP (m/h)"]]
+            for run in range(4):
+                rows.append([f"Run {run + 1}", str(depth + run * 100), str(depth + run * 100 + 95),
+                             f"{rng.uniform(5, 40):.1f}"])
+            y = _draw_table(page, rows, y)
+
+        remaining = int((PAGE_HEIGHT - MARGIN - y) // LINE_HEIGHT)
+        if heading.endswith("Geology"):
+            lines, depth = _geology_lines(rng, depth, remaining // 2)
+        else:
+            lines, depth = _operations_lines(rng, depth, remaining)
+        _draw_lines(page, lines, y)
+
+    doc.save(path)
+    doc.close()
+    return path
@@ -1,15 +1,26 @@
+import argparse
+import asyncio
 import json
 import os
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import TYPE_CHECKING, Optional
 
 # Add src to path if needed
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.database_manager import DatabaseManager
-from src.utils import PDFIngestor
-from src.metadata_extractor import MetadataExtractor
-from src.geology_extractor import GeologyExtractor
-from src.specs_extractor import TechSpecsExtractor
+from src.config import load_config
+from src.manifest import report_path
+from src.instrumentation import configure_instrumentation, report_trace, timer, write_metrics
+
+# Chroma, PyMuPDF and ollama take most of the start-up time, so they are
+# imported by the code paths that use them (see WellReportPipeline), not at import time.
+if TYPE_CHECKING:
+    from src.database_manager import DatabaseManager
+    from src.metadata_extractor import MetadataExtractor
+    from src.specs_extractor import TechSpecsExtractor
 
 # --- MOCKS for Colleague 1 (Ingestion) & Colleague 2 (Extraction) ---
 # We keep these as fallbacks or for testing without dependencies
@@ -39,78 +50,139 @@ def mock_parse_pdf(pdf_path: str):
 
 # --- Colleague 3: The Architect (Pipeline) ---
 
-def process_well_report(pdf_path: str) -> dict:
-    print(f"--- Starting Pipeline for {pdf_path} ---")
-    
-    # 0. Setup
-    db = DatabaseManager(config_path="config.yaml")
-    
+# Pages the extractors read back from the parsed document: the header pages (see
+# ParsedDocument.header_text), the geology section and the casing and mud sections
+# (or, without such a section, the pages with casing or mud tables).
+HEADER_PAGES = 3
+GEOLOGY_SECTION = "Geology"
+SPEC_KEYWORDS = ["Casing", "Mud"]
+
+def _stream_into_db(db: "DatabaseManager", pdf_path: str):
+    """
+    Parses the PDF page by page and streams the chunks into save_chunks, as
+    --ingest-folder does, so the chunk list of the whole report is never built. Returns
+    a ParsedDocument of the pages the extractors read (see extraction_filter) with the
+    outline built during the pass, and the report's GasLog, collected page by page.
+    """
+    from src.chunker import Chunker
+    from src.gas_log import GasLog
+    from src.utils import ParsedDocument, PDFIngestor, extraction_filter
+    chunker = Chunker.from_config(db.config)
+    ingestor = PDFIngestor(pdf_path, fast_layout=db.config.get("fast_layout", False))
+    keep = extraction_filter(HEADER_PAGES, [GEOLOGY_SECTION] + SPEC_KEYWORDS, SPEC_KEYWORDS)
+    kept = []
+    gas_logs = []
+    chunk_count = 0
+
+    def chunks():
+        nonlocal chunk_count
+        for page in ingestor.iter_pages():
+            if keep(page):
+                kept.append(page)
+            with timer("gas_log"):
+                gas_logs.append(GasLog.from_text(page.full_text))
+            for chunk in page.to_chunks(pdf_path, chunker):
+                chunk_count += 1
+                yield chunk
+
+    try:
+        db.save_chunks(chunks())
+        parsed_doc = ParsedDocument(pdf_path, kept, toc=ingestor.doc.get_toc(simple=True),
+                                    outline=ingestor.outline())
+    finally:
+        ingestor.close()
+    print(f"Parsed {chunk_count} chunks from PDF, keeping {len(kept)} pages for extraction.")
+    return parsed_doc, GasLog.concatenate(gas_logs)
+
+def _ingest_and_store(db: "DatabaseManager", pdf_path: str, allow_mock: bool = True):
+    """
+    Steps 1 and 2 of the pipeline. Returns (chunks, parsed_doc, gas_log, report_unchanged).
+    A PDF is streamed into the database while it is parsed: `chunks` is then empty,
+    `parsed_doc` holds only the pages the extractors read and `gas_log` the gas
+    readings of every page. `chunks` holds the mock chunks when the PDF is missing or
+    unreadable; without `allow_mock`, that raises instead. `parsed_doc` and `gas_log`
+    are None unless the PDF was parsed.
+    """
     # 1. Ingest (Colleague 1)
     print("[C1] Ingesting PDF...")
+    parsed_doc = None
+    gas_log = None
+    report_unchanged = False
+    chunks = []
     try:
-        if os.path.exists(pdf_path):
-            ingestor = PDFIngestor(pdf_path)
-            chunks = ingestor.parse()
-            ingestor.close()
-            print(f"Parsed {len(chunks)} chunks from PDF.")
+        if os.path.exists(pdf_path) and db.manifest.is_unchanged(pdf_path):
+            # Already ingested at this content: skip parsing, embedding and storing.
+            print("Report unchanged since last ingestion, skipping.")
+            report_unchanged = True
+        elif os.path.exists(pdf_path):
+            # 2. Store (Colleague 3), page by page as the PDF is parsed.
+            print("[C3] Streaming chunks into ChromaDB...")
+            parsed_doc, gas_log = _stream_into_db(db, pdf_path)
+            db.manifest.record(pdf_path)
+            db.manifest.save()
+        elif not allow_mock:
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
         else:
             print(f"PDF not found at {pdf_path}, using mock data.")
             chunks = mock_parse_pdf(pdf_path)
     except Exception as e:
+        if not allow_mock:
+            raise
         print(f"Error during ingestion: {e}. Using mock data.")
+        parsed_doc = None
+        gas_log = None
         chunks = mock_parse_pdf(pdf_path)
-    
-    # 2. Store (Colleague 3)
-    print("[C3] Storing chunks in ChromaDB...")
-    db.save_chunks(chunks)
-    
-    # 3. Retrieve & Extract (Colleague 3 & 2)
-    print("[C3] Retrieving and Extracting Data...")
-    
-    # A. Header / Metadata
+
+    if chunks:
+        print("[C3] Storing chunks in ChromaDB...")
+        db.save_chunks(chunks)
+
+    return chunks, parsed_doc, gas_log, report_unchanged
+
+def _report_source(pdf_path: str, chunks: list) -> str:
+    # The 'source' the report's chunks are stored under (the mock data uses the file name).
+    return chunks[0]["metadata"]["source"] if chunks else pdf_path
+
+def _retrieve_header_text(db: "DatabaseManager", chunks: list, parsed_doc=None, source: str = "") -> str:
     # Strategy: Get the first few pages for header info
-    header_chunks = db.get_chunks(where={"page": 1}, n_results=1) # Simplified: assume page 1 has header
+    if parsed_doc is not None:
+        return parsed_doc.header_text(HEADER_PAGES)
+    header_chunks = db.get_report_chunks(source, page=1, n_results=5) # Simplified: assume page 1 has header
     if not header_chunks:
         # Fallback if page metadata isn't int or query fails
-        header_text = chunks[0]['text'] if chunks else ""
-    else:
-        header_text = header_chunks[0]
-        
-    metadata_extractor = MetadataExtractor()
-    # Note: extract_header might fail if Ollama is down, handle gracefully?
-    # For now we assume it works or prints error
-    header_data = metadata_extractor.extract_header(header_text)
-    
-    # Computed Field: Duration
-    # We need an end date. Let's assume we find it or use current date.
-    # For this demo, we'll just use a fixed date or try to find 'TD Date'
-    spud_date = header_data.get('spud_date')
-    if spud_date:
-        header_data['duration_days'] = metadata_extractor.calculate_duration(spud_date, "2023-12-31")
-    else:
-        header_data['duration_days'] = 0
+        return chunks[0]['text'] if chunks else ""
+    # Page 1 may have been split into several chunks
+    return "\n".join(header_chunks)
 
+def _retrieve_geology_text(db: "DatabaseManager", geology_extractor, source: str, parsed_doc=None,
+                           report_unchanged: bool = False, fast_layout: bool = False) -> str:
+    # The geology section through the document outline, reading only its pages: from the
+    # parsed document, or from the PDF for a report stored earlier. Mock data has no PDF;
+    # its chunks are tagged with their section.
+    if parsed_doc is not None:
+        return geology_extractor.get_geology_section(parsed_doc)
+    if report_unchanged:
+        from src.utils import PDFIngestor
+        ingestor = PDFIngestor(source, fast_layout=fast_layout)
+        try:
+            return geology_extractor.get_geology_section(ingestor)
+        finally:
+            ingestor.close()
+    return "\n".join(db.get_report_chunks(source, section=GEOLOGY_SECTION))
 
-    # B. Geology
-    # Retrieve chunks tagged as "Geology"
-    geo_chunks = db.get_chunks(where={"section": "Geology"}, n_results=5)
-    geo_text = "\n".join(geo_chunks)
-    
-    geology_extractor = GeologyExtractor()
-    # summarize_problems expects text
-    geo_issues = geology_extractor.summarize_problems(geo_text)
-    
-    # C. Specs (Casing, etc.)
-    # Use TechSpecsExtractor to extract tables directly from PDF if available, 
+def _collect_spec_tables(specs_extractor: "TechSpecsExtractor", pdf_path: str,
+                         parsed_doc, report_unchanged: bool, fast_layout: bool = False) -> str:
+    # Use TechSpecsExtractor to collect the tables of the parsed PDF if available,
     # or use mock data if PDF is not present/readable.
-    specs_extractor = TechSpecsExtractor()
-    
-    if os.path.exists(pdf_path):
+    if parsed_doc is not None:
+        print("[C2] Extracting tables from parsed PDF...")
+        return specs_extractor.extract_tables_to_markdown(parsed_doc, SPEC_KEYWORDS)
+    if report_unchanged:
         print("[C2] Extracting tables from PDF...")
-        markdown_tables = specs_extractor.extract_tables_to_markdown(pdf_path, ["Casing", "Mud"])
-    else:
-        print("[C2] PDF not found, using mock markdown for specs...")
-        markdown_tables = """
+        return specs_extractor.extract_tables_to_markdown(pdf_path, SPEC_KEYWORDS, fast_layout)
+
+    print("[C2] PDF not found, using mock markdown for specs...")
+    return """
         | Casing Size | Depth (ft) | Weight (lb/ft) |
         |---|---|---|
         | 13 3/8" | 1500 | 54.5 |
@@ -120,31 +192,464 @@ def process_well_report(pdf_path: str) -> dict:
         |---|---|
         | Spud Mud | 8.5 |
         """
-    
-    specs_data = specs_extractor.parse_specs_with_llm(markdown_tables)
-
-    # 4. Assemble Final Result
-    well_data = {
-        "header": header_data,
-        "specs": specs_data,
-        "geology": {
-            "issues": [geo_issues], # summarize_problems returns a string
-            "gas_peak": "N/A" # Placeholder
-        }
-    }
-    
-    print("--- Pipeline Complete ---")
-    return well_data
+
+def _add_duration(metadata_extractor: "MetadataExtractor", header_data: dict):
+    # Computed Field: Duration
+    # We need an end date. Let's assume we find it or use current date.
+    # For this demo, we'll just use a fixed date or try to find 'TD Date'
+    spud_date = header_data.get('spud_date')
+    if spud_date:
+        header_data['duration_days'] = metadata_extractor.calculate_duration(spud_date, "2023-12-31")
+    else:
+        header_data['duration_days'] = 0
+
+def _report_gas_log(db: "DatabaseManager", source: str, gas_log=None):
+    # The gas readings collected while the report was streamed in; for a report stored
+    # earlier (or mock data), read back from its stored chunks a batch at a time.
+    if gas_log is not None:
+        return gas_log
+    from src.gas_log import GasLog
+    return GasLog.concatenate(GasLog.from_text(text) for text in db.iter_report_chunks(source))
+
+def _assemble_well_data(header_data: dict, specs_data: dict, geo_issues: str, gas_peak="N/A") -> dict:
+    # 4. Assemble Final Result (the same well_data shape the job runner produces)
+    from src.job_runner import assemble_well_data
+    return assemble_well_data(header_data, specs_data, geo_issues, gas_peak)
+
+def _setup_llm(config: dict):
+    # Shared Ollama client from the config; the warm-up loads the model while the PDF is parsed.
+    from src.llm_client import configure_llm_client, warm_up
+    configure_llm_client(config)
+    if config.get("llm_warm_up", False):
+        warm_up(background=True)
+
+def _print_cache_stats():
+    from src.llm_cache import get_default_cache
+    cache_stats = get_default_cache().stats()
+    print(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.")
+
+class WellReportPipeline:
+    """
+    The pipeline as a long-lived object. It owns the config, the DatabaseManager (Chroma
+    client, manifest and indexes), the extractors, the shared LLM client and the results
+    store for its whole lifetime. Each is created on first use, so only the first report
+    pays for the imports and client start-up; later reports reuse them.
+
+    Not thread-safe: process reports one at a time (the daemon mode serialises requests).
+    With `allow_mock` False, a missing or unreadable PDF raises FileNotFoundError (or the
+    parsing error) instead of being processed as the mock report.
+    """
+    def __init__(self, config_path: str = "config.yaml", allow_mock: bool = True):
+        self.config_path = config_path
+        self.allow_mock = allow_mock
+        self.config = load_config(config_path)
+        configure_instrumentation(self.config)
+        self.reports_processed = 0
+        self._db = None
+        self._extractors = None
+        self._results_store = None
+        self._llm_ready = False
+
+    @property
+    def db(self) -> "DatabaseManager":
+        if self._db is None:
+            from src.database_manager import DatabaseManager
+            self._db = DatabaseManager(config_path=self.config_path)
+        return self._db
+
+    @property
+    def extractors(self) -> tuple:
+        """(MetadataExtractor, GeologyExtractor, TechSpecsExtractor), built from the config once."""
+        if self._extractors is None:
+            from src.geology_extractor import GeologyExtractor
+            from src.llm_cache import get_default_cache
+            from src.metadata_extractor import MetadataExtractor
+            from src.specs_extractor import TechSpecsExtractor
+            # The process-wide LLM cache follows this pipeline's config if not created yet.
+            get_default_cache(self.config_path)
+            self._extractors = (MetadataExtractor.from_config(self.config),
+                                GeologyExtractor.from_config(self.config),
+                                TechSpecsExtractor.from_config(self.config))
+        return self._extractors
+
+    def setup_llm(self):
+        """Configures the shared LLM client (and starts the warm-up) on first call."""
+        if not self._llm_ready:
+            _setup_llm(self.config)
+            self._llm_ready = True
+
+    def store_results(self, results: list):
+        """Appends (pdf_path, well_data) pairs to the columnar results store, if configured."""
+        if self._results_store is None:
+            from src.results_store import ResultsStore
+            self._results_store = ResultsStore.from_config(self.config)
+            if self._results_store is None:
+                return
+        for pdf_path, well_data in results:
+            self._results_store.add(pdf_path, well_data)
+        # Flushed per call, so the results are queryable while the pipeline lives on.
+        self._results_store.flush()
+
+    def process(self, pdf_path: str) -> dict:
+        # One spelling of the path for the manifest, the chunks' source and the results.
+        pdf_path = report_path(pdf_path)
+        print(f"--- Starting Pipeline for {pdf_path} ---")
+        self.setup_llm()
+        db = self.db
+        metadata_extractor, geology_extractor, specs_extractor = self.extractors
+
+        with report_trace(pdf_path):
+            with timer("ingest"):
+                chunks, parsed_doc, gas_log, report_unchanged = _ingest_and_store(db, pdf_path, self.allow_mock)
+            source = _report_source(pdf_path, chunks)
+
+            # 3. Retrieve & Extract (Colleague 3 & 2)
+            print("[C3] Retrieving and Extracting Data...")
+
+            # A. Header / Metadata
+            header_text = _retrieve_header_text(db, chunks, parsed_doc, source)
+
+            # Note: extract_header might fail if Ollama is down, handle gracefully?
+            # For now we assume it works or prints error
+            with timer("header_extraction"):
+                header_data = metadata_extractor.extract_header(header_text)
+            _add_duration(metadata_extractor, header_data)
+
+            # B. Geology
+            geo_text = _retrieve_geology_text(db, geology_extractor, source, parsed_doc, report_unchanged,
+                                              self.config.get("fast_layout", False))
+
+            # summarize_problems expects text
+            with timer("geology_extraction"):
+                geo_issues = geology_extractor.summarize_problems(geo_text)
+            with timer("gas_extraction"):
+                gas_peak = geology_extractor.extract_gas_peak(_report_gas_log(db, source, gas_log))
+
+            # C. Specs (Casing, etc.)
+            with timer("specs_extraction"):
+                markdown_tables = _collect_spec_tables(specs_extractor, pdf_path, parsed_doc, report_unchanged,
+                                                       self.config.get("fast_layout", False))
+                specs_data = specs_extractor.parse_specs(markdown_tables)
+
+            well_data = _assemble_well_data(header_data, specs_data, geo_issues, gas_peak)
+
+        self.store_results([(pdf_path, well_data)])
+        self.reports_processed += 1
+        _print_cache_stats()
+        write_metrics()
+        print("--- Pipeline Complete ---")
+        return well_data
+
+    async def process_many(self, pdf_paths: list) -> list:
+        """Processes several reports concurrently (see process_well_report_async), in input order."""
+        from src.async_llm import configure_async_llm
+        configure_async_llm(self.config)
+        self.setup_llm()
+        pdf_paths = [report_path(pdf_path) for pdf_path in pdf_paths]
+        ingest_lock = asyncio.Lock()
+        results = await asyncio.gather(
+            *(process_well_report_async(pdf_path, self, ingest_lock) for pdf_path in pdf_paths)
+        )
+
+        self.store_results(list(zip(pdf_paths, results)))
+        self.reports_processed += len(pdf_paths)
+        _print_cache_stats()
+        write_metrics()
+        return list(results)
+
+    def close(self):
+        if self._results_store is not None:
+            self._results_store.close()
+            self._results_store = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+def process_well_report(pdf_path: str, pipeline: Optional[WellReportPipeline] = None) -> dict:
+    """
+    Runs the pipeline on one report. Without `pipeline`, one is set up for this report
+    alone; pass a WellReportPipeline (or use the --serve daemon) to reuse its resources.
+    """
+    if pipeline is not None:
+        return pipeline.process(pdf_path)
+    pipeline = WellReportPipeline()
+    try:
+        return pipeline.process(pdf_path)
+    finally:
+        pipeline.close()
+
+async def _timed(stage: str, awaitable):
+    with timer(stage):
+        return await awaitable
+
+async def process_well_report_async(pdf_path: str, pipeline: WellReportPipeline, ingest_lock: asyncio.Lock) -> dict:
+    """
+    Async variant of process_well_report. The header, specs and geology extractions
+    are independent and run concurrently; their LLM requests share the global
+    in-flight limit set by configure_async_llm.
+    """
+    pdf_path = report_path(pdf_path)
+    print(f"--- Starting Async Pipeline for {pdf_path} ---")
+    db = pipeline.db
+    metadata_extractor, geology_extractor, specs_extractor = pipeline.extractors
+
+    with report_trace(pdf_path):
+        # Parsing and storing run in a worker thread so other reports' LLM calls keep
+        # going; the lock serialises them because the manifest is shared.
+        async with ingest_lock:
+            with timer("ingest"):
+                chunks, parsed_doc, gas_log, report_unchanged = await asyncio.to_thread(
+                    _ingest_and_store, db, pdf_path, pipeline.allow_mock
+                )
+
+        print("[C3] Retrieving and Extracting Data...")
+        source = _report_source(pdf_path, chunks)
+        header_text = _retrieve_header_text(db, chunks, parsed_doc, source)
+        geo_text = await asyncio.to_thread(_retrieve_geology_text, db, geology_extractor, source, parsed_doc,
+                                           report_unchanged, pipeline.config.get("fast_layout", False))
+
+        markdown_tables = await asyncio.to_thread(
+            _collect_spec_tables, specs_extractor, pdf_path, parsed_doc, report_unchanged,
+            pipeline.config.get("fast_layout", False)
+        )
+
+        header_data, specs_data, geo_issues = await asyncio.gather(
+            _timed("header_extraction", metadata_extractor.extract_header_async(header_text)),
+            _timed("specs_extraction", specs_extractor.parse_specs_async(markdown_tables)),
+            _timed("geology_extraction", geology_extractor.summarize_problems_async(geo_text))
+        )
+        _add_duration(metadata_extractor, header_data)
+        with timer("gas_extraction"):
+            gas_peak = geology_extractor.extract_gas_peak(_report_gas_log(db, source, gas_log))
+
+    print(f"--- Async Pipeline Complete for {pdf_path} ---")
+    return _assemble_well_data(header_data, specs_data, geo_issues, gas_peak)
+
+async def process_reports_async(pdf_paths: list, config_path: str = "config.yaml") -> list:
+    """
+    Processes several reports concurrently. Results are returned in input order.
+    """
+    pipeline = WellReportPipeline(config_path)
+    try:
+        return await pipeline.process_many(pdf_paths)
+    finally:
+        pipeline.close()
+
+# --- Daemon mode: one pipeline kept warm, reports submitted over HTTP ---
+
+class _PipelineRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /process {"pdf_path": "..."}        -> {"well_data": {...}}
+    POST /process {"pdf_paths": ["...", ...]} -> {"results": [{...}, ...]} (processed concurrently)
+    GET  /health                             -> {"status": "ok", "reports_processed": N}
+
+    Paths that do not exist are rejected with 404; the service never uses the mock data.
+    """
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send_json(404, {"error": f"Unknown path {self.path}"})
+        self._send_json(200, {"status": "ok", "reports_processed": self.server.pipeline.reports_processed})
+
+    def do_POST(self):
+        if self.path != "/process":
+            return self._send_json(404, {"error": f"Unknown path {self.path}"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except json.JSONDecodeError as e:
+            return self._send_json(400, {"error": f"Invalid JSON: {e}"})
+        if not isinstance(request, dict) or not ("pdf_path" in request or "pdf_paths" in request):
+            return self._send_json(400, {"error": "Expected {\"pdf_path\": ...} or {\"pdf_paths\": [...]}"})
+
+        pdf_paths = list(request["pdf_paths"]) if "pdf_paths" in request else [request["pdf_path"]]
+        if not all(isinstance(path, str) for path in pdf_paths):
+            return self._send_json(400, {"error": "PDF paths must be strings"})
+        missing = [path for path in pdf_paths if not os.path.isfile(path)]
+        if missing:
+            return self._send_json(404, {"error": "PDF not found", "missing": missing})
+
+        pipeline = self.server.pipeline
+        try:
+            # One report (or batch) at a time: the pipeline's resources are not thread-safe.
+            with self.server.lock:
+                if "pdf_paths" in request:
+                    response = {"results": asyncio.run(pipeline.process_many(pdf_paths))}
+                else:
+                    response = {"well_data": pipeline.process(pdf_paths[0])}
+        except FileNotFoundError as e:
+            return self._send_json(404, {"error": str(e)})
+        except Exception as e:
+            return self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send_json(200, response)
+
+    def _send_json(self, status: int, response: dict):
+        payload = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+class _ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+def make_server(pipeline: WellReportPipeline, host: str = "127.0.0.1", port: int = 8765,
+                socket_path: Optional[str] = None):
+    """
+    HTTP server around `pipeline`, on a Unix socket if `socket_path` is given, else on
+    host:port. Call serve_forever() on the result.
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _ThreadingUnixHTTPServer(socket_path, _PipelineRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _PipelineRequestHandler)
+    # Requests name real reports: a PDF that cannot be read is an error, not mock data.
+    pipeline.allow_mock = False
+    server.pipeline = pipeline
+    server.lock = threading.Lock()
+    return server
+
+def serve(config_path: str = "config.yaml", host: Optional[str] = None, port: Optional[int] = None,
+          socket_path: Optional[str] = None):
+    """
+    Daemon entry point: keeps one WellReportPipeline for the life of the process and
+    processes the reports posted to it (see _PipelineRequestHandler). The address comes
+    from `service_socket`, or `service_host`/`service_port`, in the config unless given.
+    """
+    pipeline = WellReportPipeline(config_path, allow_mock=False)
+    socket_path = socket_path or pipeline.config.get("service_socket")
+    server = make_server(pipeline, host or pipeline.config.get("service_host", "127.0.0.1"),
+                         port or pipeline.config.get("service_port", 8765), socket_path)
+    address = socket_path or "http://%s:%d" % server.server_address[:2]
+    print(f"--- Pipeline service listening on {address} (POST /process, GET /health) ---")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pipeline.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def ingest_folder(folder: str = None, config_path: str = "config.yaml") -> int:
+    """
+    Batch entry point: parses every PDF in `folder` (defaults to `pdf_folder` from the
+    config) on a process pool and streams the merged chunks into the database.
+    Returns the number of chunks stored.
+    """
+    from src.batch_ingestor import BatchIngestor
+    from src.database_manager import DatabaseManager
+
+    db = DatabaseManager(config_path=config_path)
+    configure_instrumentation(db.config)
+    folder = folder or db.config.get("pdf_folder", "./data")
+    batch_ingestor = BatchIngestor.from_config(db.config)
+
+    all_paths = batch_ingestor.list_pdfs(folder)
+    # Unchanged reports are skipped without being opened.
+    pdf_paths = [path for path in all_paths if not db.manifest.is_unchanged(path)]
+    print(f"--- Batch ingestion of {len(pdf_paths)} PDFs from {folder} "
+          f"({len(all_paths) - len(pdf_paths)} unchanged) "
+          f"with {batch_ingestor.num_workers} workers ---")
+
+    # The chunk stream is consumed in batches while the workers keep parsing.
+    sources = set()
+    count = 0
+    def tracked(chunks):
+        nonlocal count
+        for chunk in chunks:
+            sources.add(chunk["metadata"]["source"])
+            count += 1
+            yield chunk
+
+    db.save_chunks(tracked(batch_ingestor.iter_chunks(pdf_paths)))
+    for path in sources:
+        db.manifest.record(path)
+    db.manifest.save()
+    write_metrics()
+    return count
+
+def _job_result(header_data: dict, specs_data: dict, geo_issues: str, gas_peak="N/A") -> dict:
+    from src.metadata_extractor import MetadataExtractor
+    _add_duration(MetadataExtractor(), header_data)
+    return _assemble_well_data(header_data, specs_data, geo_issues, gas_peak)
+
+def run_jobs(folder: str = None, config_path: str = "config.yaml", retry_failed: bool = False) -> dict:
+    """
+    Corpus entry point: queues every PDF in `folder` (defaults to `pdf_folder` from the
+    config) in the job store and processes the queue stage by stage. Re-running after
+    a crash resumes each report from its last completed stage; reports already queued
+    are not added twice. Returns the job status.
+    """
+    from src.batch_ingestor import BatchIngestor
+    from src.database_manager import DatabaseManager
+    from src.job_runner import JobRunner
+    from src.results_store import ResultsStore
+
+    db = DatabaseManager(config_path=config_path)
+    configure_instrumentation(db.config)
+    _setup_llm(db.config)
+    runner = JobRunner.from_config(db, assemble=_job_result, results_store=ResultsStore.from_config(db.config))
+    folder = folder or db.config.get("pdf_folder", "./data")
+
+    added = runner.store.enqueue(BatchIngestor.list_pdfs(folder))
+    if retry_failed:
+        added += runner.store.retry_failed()
+    print(f"--- Job runner: {added} reports queued from {folder} ---")
+    runner.run()
+    write_metrics()
+    status = runner.store.status()
+    runner.close()
+    return status
+
+def job_status(config_path: str = "config.yaml") -> dict:
+    """Progress and throughput of the job store configured in `config_path`."""
+    from src.job_runner import JobStore
+    store = JobStore(load_config(config_path).get("job_db_path", "./jobs.sqlite"))
+    status = store.status()
+    store.close()
+    return status
 
 if __name__ == "__main__":
-    # Example usage
-    # Ensure we have a dummy PDF or use the mock path
-    report_path = "data/mock_report.pdf"
-    
-    # Create a dummy PDF file if it doesn't exist to test the real ingestor?
-    # Or just rely on the mock fallback.
-    # Let's rely on the mock fallback for now if file doesn't exist.
-    
-    result = process_well_report(report_path)
-    print("\nFinal Result:")
-    print(json.dumps(result, indent=2))
+    parser = argparse.ArgumentParser(description="Extract well data from Oil & Gas well reports.")
+    # Example usage: rely on the mock fallback if the default report doesn't exist.
+    parser.add_argument("pdf_paths", nargs="*", default=["data/mock_report.pdf"],
+                        help="Path(s) to well report PDFs. Several reports are processed concurrently.")
+    parser.add_argument("--ingest-folder", nargs="?", const="", default=None, metavar="FOLDER",
+                        help="Ingest every PDF in FOLDER (defaults to pdf_folder in config.yaml).")
+    parser.add_argument("--run-jobs", nargs="?", const="", default=None, metavar="FOLDER",
+                        help="Queue every PDF in FOLDER (defaults to pdf_folder) and run the resumable job queue.")
+    parser.add_argument("--retry-failed", action="store_true", help="With --run-jobs, re-queue failed reports.")
+    parser.add_argument("--job-status", action="store_true", help="Show the job queue's progress and throughput.")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a daemon that keeps the pipeline loaded and processes reports posted to it.")
+    parser.add_argument("--port", type=int, default=None, help="With --serve, the TCP port (default: service_port).")
+    parser.add_argument("--socket", default=None, metavar="PATH",
+                        help="With --serve, listen on this Unix socket instead of TCP (default: service_socket).")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(port=args.port, socket_path=args.socket)
+    elif args.job_status:
+        from src.job_runner import format_status
+        print(format_status(job_status()))
+    elif args.run_jobs is not None:
+        from src.job_runner import format_status
+        print(format_status(run_jobs(args.run_jobs or None, retry_failed=args.retry_failed)))
+    elif args.ingest_folder is not None:
+        count = ingest_folder(args.ingest_folder or None)
+        print(f"Ingested {count} chunks.")
+    elif len(args.pdf_paths) > 1:
+        results = asyncio.run(process_reports_async(args.pdf_paths))
+        print("\nFinal Results:")
+        print(json.dumps(results, indent=2))
+    else:
+        result = process_well_report(args.pdf_paths[0])
+        print("\nFinal Result:")
+        print(json.dumps(result, indent=2))
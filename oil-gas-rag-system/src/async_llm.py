@@ -0,0 +1,75 @@
+import asyncio
+import weakref
+from typing import Dict, Any, List, Optional, Callable
+
+import ollama
+
+from .json_stream import astream_json_chat
+from .llm_client import make_async_client, keep_alive
+
+# Settings shared by all async LLM calls in the process (see configure_async_llm).
+_settings: Dict[str, Any] = {
+    "host": None,  # None: the shared client's host (llm_client.configure_llm_client)
+    "max_in_flight": 2,
+    "timeout": 120.0,
+}
+
+# One semaphore and one client per event loop: asyncio primitives and the underlying
+# httpx.AsyncClient must not be shared across loops.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ollama.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def configure_async_llm(config: Optional[Dict[str, Any]] = None, **overrides):
+    """
+    Sets the Ollama host, the global cap on in-flight requests and the per-call timeout
+    (seconds) from the config (`ollama_url`, `llm_max_in_flight`, `llm_timeout_seconds`)
+    and/or keyword overrides. Affects event loops that have not made a call yet.
+    """
+    config = config or {}
+    if "ollama_url" in config:
+        _settings["host"] = config["ollama_url"]
+    if "llm_max_in_flight" in config:
+        _settings["max_in_flight"] = config["llm_max_in_flight"]
+    if "llm_timeout_seconds" in config:
+        _settings["timeout"] = config["llm_timeout_seconds"]
+    _settings.update(overrides)
+    _semaphores.clear()
+    _clients.clear()
+
+
+def _loop_resources():
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(_settings["max_in_flight"])
+        _clients[loop] = make_async_client(_settings["host"])
+    return _semaphores[loop], _clients[loop]
+
+
+async def bounded_chat(model: str, messages: List[Dict[str, Any]], timeout: Optional[float] = None, **kwargs):
+    """
+    Awaits an Ollama chat request while holding the global in-flight semaphore.
+    Raises asyncio.TimeoutError if the request (excluding time spent waiting for a
+    slot) takes longer than `timeout` seconds.
+    """
+    semaphore, client = _loop_resources()
+    timeout = _settings["timeout"] if timeout is None else timeout
+    kwargs.setdefault("keep_alive", keep_alive())
+    async with semaphore:
+        return await asyncio.wait_for(client.chat(model=model, messages=messages, **kwargs), timeout)
+
+
+async def bounded_json_chat(model: str, messages: List[Dict[str, Any]], schema: Dict[str, Any],
+                            num_predict: Optional[int] = None, timeout: Optional[float] = None,
+                            on_partial: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    Like bounded_chat, but streams in JSON mode and stops at the first complete object
+    matching `schema` (see json_stream.stream_json_chat).
+    """
+    semaphore, client = _loop_resources()
+    timeout = _settings["timeout"] if timeout is None else timeout
+    async with semaphore:
+        return await asyncio.wait_for(
+            astream_json_chat(model, messages, schema, client, num_predict=num_predict, on_partial=on_partial),
+            timeout
+        )
@@ -0,0 +1,169 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from .chunker import Chunker
+from .instrumentation import collect_trace, configure_instrumentation, is_enabled, merge_trace
+from .manifest import report_path
+from .utils import PDFIngestor
+
+# Documents opened by the current worker process, keyed by path. Large reports are
+# split into several page-range tasks, so keeping the handle avoids re-opening the
+# same file for every range that lands on this worker.
+_OPEN_INGESTORS: Dict[str, PDFIngestor] = {}
+_MAX_OPEN_INGESTORS = 4
+
+
+def _get_ingestor(pdf_path: str, fast_layout: bool = False) -> PDFIngestor:
+    ingestor = _OPEN_INGESTORS.get(pdf_path)
+    if ingestor is None:
+        if len(_OPEN_INGESTORS) >= _MAX_OPEN_INGESTORS:
+            oldest = next(iter(_OPEN_INGESTORS))
+            _OPEN_INGESTORS.pop(oldest).close()
+        ingestor = PDFIngestor(pdf_path, fast_layout=fast_layout)
+        _OPEN_INGESTORS[pdf_path] = ingestor
+    return ingestor
+
+
+def _parse_range(task: Tuple[str, int, int], chunker: Optional[Chunker] = None,
+                 fast_layout: bool = False) -> List[Dict[str, Any]]:
+    """
+    Worker entry point: parses one page range of one PDF.
+    Ranges that do not start at the first page leave the section of the leading pages
+    as None; BatchIngestor fills it in from the previous range when merging.
+    """
+    pdf_path, start_page, end_page = task
+    ingestor = _get_ingestor(pdf_path, fast_layout)
+    initial_section = "Header" if start_page == 0 else None
+    return ingestor.parse(start_page=start_page, end_page=end_page, initial_section=initial_section,
+                          chunker=chunker)
+
+
+def _parse_range_in_worker(task: Tuple[str, int, int], chunker: Optional[Chunker] = None,
+                           fast_layout: bool = False, instrumented: bool = False):
+    """
+    Process pool entry point: _parse_range plus the timings and counters it recorded,
+    which would otherwise stay in the worker. Returns (chunks, trace dict or None).
+    """
+    # Workers do not write traces or metrics themselves; the parent merges and writes them.
+    configure_instrumentation(instrumentation=instrumented)
+    with collect_trace(task[0]) as trace:
+        chunks = _parse_range(task, chunker, fast_layout)
+    return chunks, trace.to_dict() if trace is not None else None
+
+
+class BatchIngestor:
+    """
+    Parses a whole folder of PDF reports on a process pool.
+    Files, and page ranges of very large files, are spread across the workers and the
+    results are merged back into a single chunk stream ordered by (file, page).
+    """
+    def __init__(self, num_workers: Optional[int] = None, pages_per_task: int = 200,
+                 chunker: Optional[Chunker] = None, fast_layout: bool = False):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task)
+        self.chunker = chunker
+        self.fast_layout = fast_layout
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BatchIngestor":
+        return cls(
+            num_workers=config.get("num_workers"),
+            pages_per_task=config.get("pages_per_task", 200),
+            chunker=Chunker.from_config(config),
+            fast_layout=config.get("fast_layout", False)
+        )
+
+    @staticmethod
+    def list_pdfs(folder: str) -> List[str]:
+        """Returns the PDF files in a folder (recursively) as report paths, in a stable order."""
+        pdf_paths = []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name.lower().endswith(".pdf"):
+                    pdf_paths.append(report_path(os.path.join(root, name)))
+        return sorted(pdf_paths)
+
+    def plan_tasks(self, pdf_paths: List[str]) -> List[Tuple[str, int, int]]:
+        """
+        Splits the reports into (pdf_path, start_page, end_page) tasks of at most
+        `pages_per_task` pages each. Unreadable files are reported and skipped.
+        """
+        tasks = []
+        for pdf_path in pdf_paths:
+            try:
+                ingestor = PDFIngestor(pdf_path)
+                page_count = ingestor.page_count
+                ingestor.close()
+            except Exception as e:
+                print(f"Skipping unreadable PDF {pdf_path}: {e}")
+                continue
+
+            for start in range(0, page_count, self.pages_per_task):
+                tasks.append((pdf_path, start, min(start + self.pages_per_task, page_count)))
+        return tasks
+
+    def iter_chunks(self, pdf_paths: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Parses the given reports in parallel and yields their chunks in
+        deterministic (file, page) order.
+        """
+        tasks = self.plan_tasks(pdf_paths)
+        if not tasks:
+            return
+
+        if self.num_workers == 1:
+            # Parsed in this process, so timings and counters are recorded directly.
+            parse = partial(_parse_range, chunker=self.chunker, fast_layout=self.fast_layout)
+            yield from self._merge(tasks, ((parse(task), None) for task in tasks))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            yield from self._merge(tasks, self._bounded_map(executor, tasks))
+
+    def _bounded_map(self, executor: ProcessPoolExecutor, tasks: List[Tuple[str, int, int]]):
+        """
+        Like executor.map, but keeps at most two tasks per worker in flight, so finished
+        results do not pile up in memory when the consumer (e.g. embedding) is slower
+        than parsing. Results are returned in submission order, whatever order the
+        workers finish in, which keeps the merged stream deterministic.
+        """
+        instrumented = is_enabled()
+        window = deque()
+        pending = iter(tasks)
+        for task in itertools.islice(pending, 2 * self.num_workers):
+            window.append(executor.submit(_parse_range_in_worker, task, self.chunker, self.fast_layout,
+                                          instrumented))
+        while window:
+            result = window.popleft().result()
+            for task in itertools.islice(pending, 1):
+                window.append(executor.submit(_parse_range_in_worker, task, self.chunker, self.fast_layout,
+                                              instrumented))
+            yield result
+
+    @staticmethod
+    def _merge(tasks: List[Tuple[str, int, int]], results) -> Iterator[Dict[str, Any]]:
+        """
+        Chains the (chunks, worker trace) results of the tasks in order, filling in the
+        sections left open at range starts and adding the workers' timings and counters
+        to this process's totals and current trace.
+        """
+        carried_section = "Header"
+        for (pdf_path, start_page, _), (chunks, worker_trace) in zip(tasks, results):
+            if worker_trace is not None:
+                merge_trace(worker_trace)
+            if start_page == 0:
+                carried_section = "Header"
+            for chunk in chunks:
+                metadata = chunk["metadata"]
+                if metadata.get("section") is None:
+                    metadata["section"] = carried_section
+                carried_section = metadata["section"]
+                yield chunk
+
+    def parse_folder(self, folder: str) -> List[Dict[str, Any]]:
+        """Parses every PDF in the folder and returns the merged, ordered chunk list."""
+        return list(self.iter_chunks(self.list_pdfs(folder)))
@@ -0,0 +1,160 @@
+import re
+from typing import List, Dict, Any, Optional
+
+from .outline import OutlineBuilder
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate (about four characters per token for English text with
+    llama-style tokenizers). Good enough for budgeting without loading a tokenizer.
+    """
+    return (len(text) + 3) // 4
+
+
+class Chunker:
+    """
+    Splits parsed pages into token-bounded pieces with overlap.
+
+    Text is packed line by line and a new piece is started at every section heading of
+    the page (found with the document outline, see ParsedPage.headings), so each piece
+    carries the section it belongs to. Markdown tables are chunked separately by whole
+    rows (a row is never split) and every continuation piece repeats the table header,
+    so each piece can be read on its own.
+    """
+    def __init__(self, max_tokens: int = 400, overlap_tokens: int = 50):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["Chunker"]:
+        """Returns a chunker, or None (one chunk per page) if `chunk_max_tokens` is not set."""
+        max_tokens = config.get("chunk_max_tokens")
+        if not max_tokens:
+            return None
+        return cls(max_tokens=max_tokens, overlap_tokens=config.get("chunk_overlap_tokens", 50))
+
+    def split_page(self, page, source: str) -> List[Dict[str, Any]]:
+        """
+        Splits a ParsedPage into chunks in the format expected by DatabaseManager.save_chunks.
+        Each chunk's metadata has the source, page, section and its index on the page.
+        """
+        pieces = []
+        section = page.initial_section
+        # Pages built without an outline get their headings from the same matcher.
+        headings = page.headings
+        if headings is None:
+            headings = OutlineBuilder().add_page(page.number, page.text)
+        for piece_section, text in self._split_text(page.text, section, headings):
+            pieces.append((piece_section, text))
+            section = piece_section
+        # Tables are appended after the page text, so they belong to the last section seen.
+        section = page.section if page.section is not None else section
+        for table_markdown in page.table_markdowns:
+            for text in self._split_table(table_markdown):
+                pieces.append((section, text))
+
+        return [
+            {
+                "text": text,
+                "metadata": {
+                    "source": source,
+                    "page": page.number,
+                    "section": piece_section,
+                    "chunk_index": index
+                }
+            }
+            for index, (piece_section, text) in enumerate(pieces)
+        ]
+
+    def _split_text(self, text: str, section: Optional[str], headings: list):
+        """Yields (section, text) pieces of the page text; `headings` are its OutlineEntry headings, in order."""
+        units: List[str] = []
+        unit_tokens: List[int] = []
+        total = 0
+
+        def flush(keep_overlap: bool):
+            nonlocal units, unit_tokens, total
+            piece = "\n".join(units).strip()
+            if keep_overlap:
+                kept, kept_tokens = [], []
+                budget = self.overlap_tokens
+                for unit, tokens in zip(reversed(units), reversed(unit_tokens)):
+                    if tokens > budget:
+                        break
+                    kept.insert(0, unit)
+                    kept_tokens.insert(0, tokens)
+                    budget -= tokens
+                units, unit_tokens = kept, kept_tokens
+            else:
+                units, unit_tokens = [], []
+            total = sum(unit_tokens)
+            return piece
+
+        pending = list(headings)
+        offset = 0
+        for line in text.split("\n"):
+            line_start = offset + len(line) - len(line.lstrip())
+            offset += len(line) + 1
+            if pending and pending[0].start_char <= line_start:
+                # A new section starts a new piece; no overlap across sections.
+                piece = flush(keep_overlap=False)
+                if piece:
+                    yield section, piece
+                while pending and pending[0].start_char <= line_start:
+                    section = pending.pop(0).title
+
+            for unit in self._split_long_line(line):
+                tokens = estimate_tokens(unit) + 1
+                if total + tokens > self.max_tokens and units:
+                    piece = flush(keep_overlap=True)
+                    if piece:
+                        yield section, piece
+                    # The overlap must leave room for the new unit.
+                    while units and total + tokens > self.max_tokens:
+                        total -= unit_tokens.pop(0)
+                        units.pop(0)
+                units.append(unit)
+                unit_tokens.append(tokens)
+                total += tokens
+
+        piece = flush(keep_overlap=False)
+        if piece:
+            yield section, piece
+
+    def _split_long_line(self, line: str) -> List[str]:
+        """Splits a line longer than the budget at word boundaries."""
+        if estimate_tokens(line) < self.max_tokens:
+            return [line]
+        parts, current = [], []
+        current_tokens = 0
+        for word in line.split(" "):
+            tokens = estimate_tokens(word) + 1
+            if current and current_tokens + tokens >= self.max_tokens:
+                parts.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(word)
+            current_tokens += tokens
+        if current:
+            parts.append(" ".join(current))
+        return parts
+
+    def _split_table(self, table_markdown: str) -> List[str]:
+        """Splits a Markdown table between rows, repeating the header in every piece."""
+        rows = [row for row in table_markdown.strip().split("\n") if row.strip()]
+        if estimate_tokens(table_markdown) <= self.max_tokens or len(rows) <= 2:
+            return [table_markdown.strip()] if rows else []
+
+        header = rows[:2] if re.match(r'^\|?\s*:?-{3,}', rows[1]) else rows[:1]
+        header_tokens = sum(estimate_tokens(row) + 1 for row in header)
+        pieces, current, total = [], [], header_tokens
+        for row in rows[len(header):]:
+            tokens = estimate_tokens(row) + 1
+            if current and total + tokens > self.max_tokens:
+                pieces.append("\n".join(header + current))
+                current, total = [], header_tokens
+            current.append(row)
+            total += tokens
+        if current:
+            pieces.append("\n".join(header + current))
+        return pieces
@@ -0,0 +1,13 @@
+import os
+import yaml
+
+def load_config(config_path: str = "config.yaml") -> dict:
+    """
+    Loads the YAML configuration. Returns an empty dict if the file is missing,
+    so every component falls back to its defaults.
+    """
+    if not os.path.exists(config_path):
+        # Fallback if config file is missing, though it should exist
+        return {}
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f) or {}
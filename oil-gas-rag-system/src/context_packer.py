@@ -0,0 +1,152 @@
+import re
+from typing import Dict, List, Optional, Iterable, Union
+
+from .chunker import estimate_tokens
+
+# Relevance terms (regular expressions, matched case-insensitively on word boundaries)
+# and their weights, per extraction task.
+HEADER_TERMS: Dict[str, float] = {
+    r'well\s*(name|no\.?|number)?': 3.0, r'operator': 3.0, r'operated\s+by': 3.0, r'company': 1.5,
+    r'licen[cs]e': 1.0, r'field': 1.0, r'rig': 1.0, r'spud(ded)?': 1.0, r'final\s+well\s+report': 1.0,
+    r'location': 0.5, r'block': 0.5,
+}
+GEOLOGY_TERMS: Dict[str, float] = {
+    r'gas\s+peak': 3.0, r'total\s+gas': 2.0, r'(trip|connection)\s+gas': 2.0, r'kick': 3.0, r'influx': 3.0,
+    r'(mud\s+)?loss(es)?': 3.0, r'lost\s+circulation': 3.0, r'stuck(\s+pipe)?': 3.0, r'h2s': 3.0,
+    r'tight(\s+hole|\s+spot)?': 2.0, r'overpull': 2.0, r'washout': 2.0, r'cavings?': 2.0,
+    r'unstable': 2.0, r'swelling': 1.5, r'shows?': 1.5, r'fluorescence': 1.0, r'background': 0.5,
+    r'formation\s+tops?': 1.0, r'group|formation': 0.5,
+}
+SPECS_TERMS: Dict[str, float] = {
+    r'casing|liner|csg': 3.0, r'shoe': 2.0, r'mud(\s+(type|weight|system))?': 3.0, r'fluid': 1.5,
+    r'density|ppg|sg|s\.g\.': 2.0, r'(lb/ft|ppf|weight|wt)': 1.5, r'size|od': 1.0, r'depth|md|tvd': 1.0,
+}
+
+# Text lines with no extraction value: page furniture (page numbers and footers such as
+# "Page 4 of 120", "4 / 120" or "- 4 -"), legal notices and rules. Other lines of digits
+# and punctuation are kept: they can be header values, e.g. "2023-05-15" or "6507/7-2".
+BOILERPLATE_PATTERN = re.compile(
+    r'^(page\s+\d+(\s+of\s+\d+)?|\d+\s*(/|of)\s*\d+|[-\u2013\s]*\d{1,4}[-\u2013\s]*|confidential.*|'
+    r'all\s+rights\s+reserved.*|this\s+page\s+(is\s+)?intentionally\s+left\s+blank|[\W_]*)$',
+    re.IGNORECASE
+)
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$')
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?;])\s+(?=[A-Z0-9(])')
+NUMBER_PATTERN = re.compile(r'\d')
+
+# Small bonus for units carrying numbers: depths, densities and dates are what gets extracted.
+NUMBER_BONUS = 0.25
+
+
+class _Unit:
+    __slots__ = ("text", "order", "tokens", "score", "table")
+
+    def __init__(self, text: str, order: int, table: Optional[int] = None):
+        self.text = text
+        self.order = order
+        self.tokens = estimate_tokens(text) + 1  # + the newline
+        self.score = 0.0
+        self.table = table
+
+
+class ContextPacker:
+    """
+    Builds LLM prompt context within a token budget.
+
+    The input texts (retrieved chunks, a section, extracted tables) are split into
+    sentences and Markdown table rows. Boilerplate and repeated units (page headers
+    repeated on every page, rows repeated by chunk overlap) are dropped, every unit is
+    scored by the task's relevance terms, and units are taken in order of score (then
+    position) while they fit the budget. The selected units are emitted in reading
+    order; table rows keep their table's header row, whose tokens are charged once.
+    Table rows also score with their header, so a casing table's rows rank together.
+
+    Token counts use the same fast local estimate as the Chunker.
+    """
+    def __init__(self, terms: Dict[str, float], max_tokens: int):
+        self.terms = [(re.compile(rf'\b(?:{term})\b', re.IGNORECASE), weight) for term, weight in terms.items()]
+        self.max_tokens = max_tokens
+
+    def score(self, text: str) -> float:
+        score = sum(weight for pattern, weight in self.terms if pattern.search(text))
+        return score + (NUMBER_BONUS if NUMBER_PATTERN.search(text) else 0.0)
+
+    def pack(self, texts: Union[str, Iterable[str]]) -> str:
+        """Returns the most relevant content of `texts` that fits in max_tokens."""
+        if isinstance(texts, str):
+            texts = [texts]
+        units, table_headers = self._split(texts)
+
+        header_scores = {table: self.score(header) for table, header in table_headers.items()}
+        for unit in units:
+            unit.score = self.score(unit.text) + header_scores.get(unit.table, 0.0)
+
+        remaining = self.max_tokens
+        selected, charged_tables = [], set()
+        for unit in sorted(units, key=lambda unit: (-unit.score, unit.order)):
+            cost = unit.tokens
+            if unit.table is not None and unit.table not in charged_tables:
+                cost += estimate_tokens(table_headers[unit.table]) + 1
+            if cost > remaining:
+                continue
+            remaining -= cost
+            selected.append(unit)
+            if unit.table is not None:
+                charged_tables.add(unit.table)
+
+        lines, current_table = [], None
+        for unit in sorted(selected, key=lambda unit: unit.order):
+            if unit.table is not None and unit.table != current_table:
+                if lines:
+                    lines.append("")
+                lines.append(table_headers[unit.table])
+            elif unit.table is None and current_table is not None:
+                lines.append("")
+            current_table = unit.table
+            lines.append(unit.text)
+        return "\n".join(lines)
+
+    def _split(self, texts: Iterable[str]):
+        """Sentences and table rows of the texts, minus boilerplate and duplicates."""
+        units: List[_Unit] = []
+        table_headers: Dict[int, str] = {}
+        header_ids: Dict[str, int] = {}
+        seen = set()
+
+        for text in texts:
+            lines = text.split("\n")
+            table = None
+            for index, line in enumerate(lines):
+                line = line.strip()
+                if line.startswith("|"):
+                    following = lines[index + 1].strip() if index + 1 < len(lines) else ""
+                    if TABLE_SEPARATOR_PATTERN.match(line):
+                        continue
+                    if TABLE_SEPARATOR_PATTERN.match(following):
+                        # A header row: the same header (e.g. a table continued across
+                        # chunks) maps to the same table, so its rows are packed together.
+                        header = f"{line}\n{following}"
+                        table = header_ids.setdefault(header, len(header_ids))
+                        table_headers[table] = header
+                        continue
+                    pieces = [line]
+                else:
+                    table = None
+                    pieces = [piece for piece in SENTENCE_PATTERN.split(line)
+                              if not BOILERPLATE_PATTERN.match(piece.strip())]
+
+                for piece in pieces:
+                    piece = piece.strip()
+                    if not piece:
+                        continue
+                    key = (table, re.sub(r'\s+', ' ', piece.lower()))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    units.append(_Unit(piece, len(units), table if piece.startswith("|") else None))
+        return units, table_headers
+
+
+def pack_context(texts: Union[str, Iterable[str]], terms: Dict[str, float], max_tokens: int) -> str:
+    """Convenience wrapper: ContextPacker(terms, max_tokens).pack(texts)."""
+    return ContextPacker(terms, max_tokens).pack(texts)
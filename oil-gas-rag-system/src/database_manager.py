@@ -1,95 +1,409 @@
 import chromadb
 from chromadb.config import Settings
-import yaml
+import contextvars
+import json
 import os
-from typing import List, Dict, Any
-import uuid
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import hashlib
+import queue
+import threading
+
+from .config import load_config
+from .embeddings import get_embedder
+from .instrumentation import timer, count
+from .lexical_index import BM25Index
+from .manifest import IngestManifest
+from .report_index import ReportIndex
+from .shards import ShardedCollection, check_layout
+
+def chunk_id(text: str, metadata: Dict[str, Any]) -> str:
+    """
+    Content-addressed chunk id: the same page content of the same report always gets
+    the same id, so re-ingesting a report overwrites its chunks instead of duplicating them.
+    The report is identified by its source path rather than its file hash so that, when
+    a report changes, its unchanged pages keep their ids and are not re-embedded.
+    """
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    key = f"{metadata.get('source', '')}:{metadata.get('page', '')}:{content_hash}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
 
 class DatabaseManager:
     def __init__(self, config_path: str = "config.yaml"):
         self.config = self._load_config(config_path)
         self.client = chromadb.PersistentClient(path=self.config.get("chroma_db_path", "./chroma_db"))
-        self.collection = self.client.get_or_create_collection(name=self.config.get("collection_name", "well_reports"))
+        # Chunks and queries are embedded here rather than by Chroma's implicit
+        # embedding function, so batching and caching are under our control.
+        self.embedder = get_embedder(self.config)
+        # With shard_count > 1, chunks are partitioned over several collections (see ShardedCollection).
+        try:
+            check_layout(self.config, self.client, self.embedder.model_id)
+        except ValueError:
+            self.embedder.close()
+            raise
+        if (self.config.get("shard_count") or 1) > 1:
+            self.collection = ShardedCollection.open(self.config, self.client)
+        else:
+            self.collection = self.client.get_or_create_collection(name=self.config.get("collection_name", "well_reports"))
+        manifest_path = self.config.get(
+            "manifest_path",
+            os.path.join(self.config.get("chroma_db_path", "./chroma_db"), "ingest_manifest.json")
+        )
+        self.manifest = IngestManifest(manifest_path)
+        self.lexical_index = None
+        if self.config.get("hybrid_search", True):
+            self.lexical_index = BM25Index(os.path.join(
+                self.config.get("chroma_db_path", "./chroma_db"),
+                f"bm25_{self.config.get('collection_name', 'well_reports')}"
+            ))
+        self.report_index = ReportIndex(os.path.join(
+            self.config.get("chroma_db_path", "./chroma_db"),
+            f"report_index_{self.config.get('collection_name', 'well_reports')}.sqlite"
+        ))
 
     def _load_config(self, config_path: str) -> dict:
-        if not os.path.exists(config_path):
-            # Fallback if config file is missing, though it should exist
-            return {}
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        return load_config(config_path)
 
-    def save_chunks(self, chunks: List[Dict[str, Any]]):
+    def save_chunks(self, chunks: Iterable[Dict[str, Any]], replace_sources: bool = True,
+                    batch_size: Optional[int] = None):
         """
         Stores chunks into ChromaDB.
         Expected format for chunks:
         [
             {"text": "...", "metadata": {"section": "Geology", "page": 5, "source": "report.pdf"}}
         ]
+
+        Chunk ids are derived from the report, page and content (see chunk_id) and written
+        with upserts, so saving the same report twice is idempotent. Chunks already in the
+        collection are not re-embedded.
+
+        `chunks` can be any iterable, including a generator such as PDFIngestor.iter_chunks.
+        It is consumed in batches of `batch_size` chunks (config `write_batch_size`, capped
+        at Chroma's maximum batch size); each batch is embedded and written on a background
+        thread while the next one is being produced, and at most two batches are buffered,
+        so memory stays flat however long the document is.
+
+        Args:
+            chunks: The chunks to store.
+            replace_sources: The chunks are the complete content of their reports; chunks
+                of those reports that are not part of this call (pages that changed or
+                disappeared) are deleted.
+            batch_size: Number of chunks per write.
         """
-        if not chunks:
+        batch_size = min(
+            batch_size or self.config.get("write_batch_size", 256),
+            self.client.get_max_batch_size()
+        )
+
+        seen_ids = set()
+        ids_by_source: Dict[str, set] = {}
+        batches: queue.Queue = queue.Queue(maxsize=2)
+        counts = {"saved": 0, "unchanged": 0}
+        errors: List[BaseException] = []
+
+        def writer():
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                if errors:
+                    continue
+                try:
+                    saved, unchanged = self._write_batch(*batch)
+                    counts["saved"] += saved
+                    counts["unchanged"] += unchanged
+                except BaseException as e:
+                    errors.append(e)
+
+        # The writer runs in a copy of this context, so it records into the same report trace.
+        writer_thread = threading.Thread(target=contextvars.copy_context().run, args=(writer,), daemon=True)
+        writer_thread.start()
+
+        documents, metadatas, ids = [], [], []
+        try:
+            for chunk in chunks:
+                if errors:
+                    break
+                text = chunk.get("text", "")
+                metadata = chunk.get("metadata", {})
+                
+                # Ensure metadata values are strings, ints, floats, or bools (Chroma requirement)
+                # We might need to flatten or clean metadata if it's complex
+                clean_metadata = {k: v for k, v in metadata.items() if isinstance(v, (str, int, float, bool))}
+
+                doc_id = chunk_id(text, clean_metadata)
+                ids_by_source.setdefault(clean_metadata.get("source", ""), set()).add(doc_id)
+                if doc_id in seen_ids:
+                    continue
+                seen_ids.add(doc_id)
+
+                documents.append(text)
+                metadatas.append(clean_metadata)
+                ids.append(doc_id)
+
+                if len(ids) >= batch_size:
+                    batches.put((ids, documents, metadatas))
+                    documents, metadatas, ids = [], [], []
+
+            if ids and not errors:
+                batches.put((ids, documents, metadatas))
+        finally:
+            batches.put(None)
+            writer_thread.join()
+
+        if errors:
+            raise errors[0]
+        if not seen_ids:
             return
 
-        documents = []
-        metadatas = []
-        ids = []
-
-        for chunk in chunks:
-            text = chunk.get("text", "")
-            metadata = chunk.get("metadata", {})
-            
-            # Ensure metadata values are strings, ints, floats, or bools (Chroma requirement)
-            # We might need to flatten or clean metadata if it's complex
-            clean_metadata = {k: v for k, v in metadata.items() if isinstance(v, (str, int, float, bool))}
-
-            documents.append(text)
-            metadatas.append(clean_metadata)
-            ids.append(str(uuid.uuid4()))
-
-        if documents:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"Saved {len(documents)} chunks to database.")
+        if replace_sources:
+            self._delete_stale_chunks(ids_by_source)
+        if self.lexical_index is not None:
+            self.lexical_index.save()
+        if isinstance(self.collection, ShardedCollection) and self.config.get("shard_max_chunks"):
+            largest = max(self.collection.counts())
+            if largest > self.config["shard_max_chunks"]:
+                print(f"Warning: a shard holds {largest} chunks (shard_max_chunks is "
+                      f"{self.config['shard_max_chunks']}); consider a larger shard_count for a new database.")
+
+        print(f"Saved {counts['saved']} chunks to database ({counts['unchanged']} unchanged).")
+
+    def _write_batch(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """Embeds and upserts the chunks of one batch that are not stored yet."""
+        # Only embed chunks whose content is not stored yet.
+        with timer("chroma_read"):
+            existing = set(self.collection.get(ids=ids, include=[])["ids"])
+        new_rows = [(i, d, m) for i, d, m in zip(ids, documents, metadatas) if i not in existing]
+
+        if new_rows:
+            new_documents = [d for _, d, _ in new_rows]
+            with timer("embedding"):
+                embeddings = self.embedder.embed(new_documents)
+            with timer("chroma_write"):
+                self.collection.upsert(
+                    documents=new_documents,
+                    embeddings=embeddings,
+                    metadatas=[m for _, _, m in new_rows],
+                    ids=[i for i, _, _ in new_rows]
+                )
+        with timer("index_write"):
+            if self.lexical_index is not None:
+                # Also catches chunks stored before the lexical index existed.
+                unindexed = [(i, d) for i, d in zip(ids, documents) if i not in self.lexical_index]
+                self.lexical_index.add([i for i, _ in unindexed], [d for _, d in unindexed])
+            self.report_index.add(ids, metadatas)
+        count("chunks", len(ids))
+        count("chunks_embedded", len(new_rows))
+        count("chunk_chars_embedded", sum(len(d) for _, d, _ in new_rows))
+        return len(new_rows), len(existing)
+
+    def _delete_stale_chunks(self, ids_by_source: Dict[str, set]):
+        """Deletes stored chunks of the given sources that are not in the new id sets."""
+        for source, keep_ids in ids_by_source.items():
+            if not source:
+                continue
+            stored = self.collection.get(where={"source": source}, include=[])["ids"]
+            stale = [doc_id for doc_id in stored if doc_id not in keep_ids]
+            if stale:
+                self.collection.delete(ids=stale, where={"source": source})
+                if self.lexical_index is not None:
+                    self.lexical_index.remove(stale)
+                self.report_index.remove(stale)
 
     def get_chunks(self, query_text: str = "", n_results: int = 5, where: Dict[str, Any] = None) -> List[str]:
         """
         Retrieves chunks based on semantic search or metadata filtering.
+        With `hybrid_search` enabled, semantic results are fused with BM25 keyword
+        results (reciprocal rank fusion), which finds exact drilling terms such as
+        "13-3/8", "LOT" or formation names that embeddings match poorly.
         
         Args:
-            query_text: The text to search for (semantic search).
+            query_text: The text to search for (semantic and keyword search).
             n_results: Number of results to return.
             where: Metadata filter (e.g., {"section": "Geology"}).
         
         Returns:
             List of text chunks.
         """
-        if not query_text and not where:
-            return []
+        return self.get_chunks_many([(query_text, where, n_results)])[0]
 
-        # If query_text is empty but we have a filter, we might want to fetch by filter only.
-        # ChromaDB query requires query_embeddings or query_texts usually.
-        # If we just want to filter by metadata without semantic search, we can use `get`.
-        
-        if not query_text and where:
+    def get_chunks_many(self, requests: List[Tuple[str, Optional[Dict[str, Any]], int]]) -> List[List[str]]:
+        """
+        Batched get_chunks: runs many retrievals (e.g. header, geology, casing and mud
+        for every well of a batch run) with as few round trips as possible.
+
+        All query texts are embedded in one batch, requests sharing a metadata filter go
+        to Chroma in a single `collection.query`, and identical requests are only run
+        once. Chunks returned for several requests are fetched once.
+
+        Args:
+            requests: (query_text, where, n_results) tuples, as for get_chunks.
+
+        Returns:
+            One list of text chunks per request, in request order.
+        """
+        results: List[List[str]] = [[] for _ in requests]
+        positions: Dict[Tuple[str, str, int], List[int]] = {}
+        for position, (query_text, where, n_results) in enumerate(requests):
+            key = (query_text or "", json.dumps(where, sort_keys=True), n_results)
+            positions.setdefault(key, []).append(position)
+
+        # Requests with a query are grouped by filter; filter-only ones are plain gets.
+        # If query_text is empty but we have a filter, we fetch by filter only.
+        groups: Dict[str, List[Tuple[str, int, List[int]]]] = {}
+        for (query_text, where_key, n_results), request_positions in positions.items():
+            where = json.loads(where_key) or None
+            if query_text:
+                groups.setdefault(where_key, []).append((query_text, n_results, request_positions))
+            elif where:
+                fetched = self.collection.get(where=where, limit=n_results)
+                for position in request_positions:
+                    results[position] = fetched['documents'] if fetched['documents'] else []
+
+        if not groups:
+            return results
+
+        query_texts = list({query_text for group in groups.values() for query_text, _, _ in group})
+        with timer("query_embedding"):
+            embeddings = dict(zip(query_texts, self.embedder.embed(query_texts)))
+        documents: Dict[str, str] = {}
+
+        for where_key, group in groups.items():
+            where = json.loads(where_key) or None
+            with timer("chroma_query"):
+                response = self.collection.query(
+                    query_embeddings=[embeddings[query_text] for query_text, _, _ in group],
+                    n_results=max(n_results for _, n_results, _ in group),
+                    where=where
+                )
+            # response['ids'] / ['documents'] hold one list per query embedding
+            vector_rankings = []
+            for (_, n_results, _), ids, texts in zip(group, response['ids'], response['documents']):
+                documents.update(zip(ids, texts))
+                vector_rankings.append(ids[:n_results])
+
+            if self.lexical_index is None:
+                rankings = vector_rankings
+            else:
+                with timer("lexical_search"):
+                    rankings = self._fuse_with_lexical(group, where, vector_rankings, documents)
+
+            for (_, _, request_positions), ranking in zip(group, rankings):
+                for position in request_positions:
+                    results[position] = [documents[doc_id] for doc_id in ranking]
+
+        return results
+
+    def _fuse_with_lexical(self, group: List[Tuple[str, int, List[int]]], where: Optional[Dict[str, Any]],
+                           vector_rankings: List[List[str]], documents: Dict[str, str]) -> List[List[str]]:
+        """
+        Reciprocal rank fusion of the vector rankings of a group of queries sharing a
+        filter with their BM25 rankings. The BM25 search only ranks the chunks matching the
+        filter; the hits not fetched yet are fetched in one get.
+        """
+        allowed = None
+        if where:
+            with timer("lexical_filter"):
+                allowed = set(self.collection.get(where=where, include=[])['ids'])
+        lexical_rankings = [
+            [doc_id for doc_id, _ in self.lexical_index.search(query_text, k=n_results, allowed=allowed)]
+            for query_text, n_results, _ in group
+        ]
+        missing = list({doc_id for ranking in lexical_rankings for doc_id in ranking} - documents.keys())
+        if missing:
+            # The filter routes the fetch to the right shard when sharded by its key.
+            fetched = self.collection.get(ids=missing, where=where, include=["documents"])
+            documents.update(zip(fetched['ids'], fetched['documents']))
+
+        rrf_k = self.config.get("rrf_k", 60)
+        fused = []
+        for (_, n_results, _), vector_ids, lexical_ids in zip(group, vector_rankings, lexical_rankings):
+            scores: Dict[str, float] = {}
+            for ranking in (vector_ids, [doc_id for doc_id in lexical_ids if doc_id in documents]):
+                for rank, doc_id in enumerate(ranking):
+                    scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank + 1)
+            fused.append(sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)[:n_results])
+        return fused
+
+    def get_report_chunks(self, source: str, page: Optional[int] = None, section: Optional[str] = None,
+                          n_results: Optional[int] = None) -> List[str]:
+        """
+        Retrieves the chunks of a single report, e.g. page 1 of a report or its Geology
+        section, in reading order.
+
+        The chunk ids come from the report index maintained by save_chunks and are then
+        fetched from Chroma by id, so the lookup does not filter the whole collection.
+        Sections are matched ignoring numbering and case ("Geology" finds "4.0 Geology").
+
+        Args:
+            source: The report (chunk metadata 'source', i.e. the PDF path it was parsed from).
+            page: Only chunks of this page (1-based).
+            section: Only chunks of this section.
+            n_results: Maximum number of chunks to return.
+
+        Returns:
+            List of text chunks.
+        """
+        if not self.report_index.has_source(source):
+            # Stored before the report index existed: fall back to a metadata filter.
+            conditions = [{"source": source}]
+            if page is not None:
+                conditions.append({"page": page})
+            if section is not None:
+                conditions.append({"section": section})
+            where = conditions[0] if len(conditions) == 1 else {"$and": conditions}
             results = self.collection.get(where=where, limit=n_results)
             return results['documents'] if results['documents'] else []
 
-        results = self.collection.query(
-            query_texts=[query_text],
-            n_results=n_results,
-            where=where
-        )
-        
-        # results['documents'] is a list of lists (one list per query)
-        return results['documents'][0] if results['documents'] else []
+        ids = self.report_index.lookup(source, page=page, section=section, limit=n_results)
+        if not ids:
+            return []
+        # The filter routes the lookup to the report's shard when sharded by source.
+        results = self.collection.get(ids=ids, where={"source": source}, include=["documents"])
+        documents = dict(zip(results['ids'], results['documents']))
+        return [documents[doc_id] for doc_id in ids if doc_id in documents]
+
+    def iter_report_chunks(self, source: str, batch_size: Optional[int] = None) -> Iterator[str]:
+        """
+        Yields the chunks of a single report in reading order, like get_report_chunks,
+        but fetches them `batch_size` at a time (config `write_batch_size`), so reading a
+        whole report back does not hold all of its text at once.
+        """
+        if not self.report_index.has_source(source):
+            # Stored before the report index existed: no ids to page through.
+            yield from self.get_report_chunks(source)
+            return
+        batch_size = batch_size or self.config.get("write_batch_size", 256)
+        ids = self.report_index.lookup(source)
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            results = self.collection.get(ids=batch, where={"source": source}, include=["documents"])
+            documents = dict(zip(results['ids'], results['documents']))
+            for doc_id in batch:
+                if doc_id in documents:
+                    yield documents[doc_id]
 
     def get_all_documents(self):
         """Helper to inspect DB content"""
         return self.collection.get()
 
+    def close(self):
+        """Closes the embedder and the lexical and report indexes (the Chroma client needs no closing)."""
+        self.embedder.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+        self.report_index.close()
+        if isinstance(self.collection, ShardedCollection):
+            self.collection.close()
+
     def reset_collection(self):
         """Clears the collection (useful for testing)"""
-        self.client.delete_collection(self.config.get("collection_name", "well_reports"))
-        self.collection = self.client.get_or_create_collection(name=self.config.get("collection_name", "well_reports"))
+        if isinstance(self.collection, ShardedCollection):
+            self.collection.reset()
+        else:
+            self.client.delete_collection(self.config.get("collection_name", "well_reports"))
+            self.collection = self.client.get_or_create_collection(name=self.config.get("collection_name", "well_reports"))
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
+        self.report_index.clear()
+        # The stored reports are gone, so none of them may be skipped as unchanged.
+        self.manifest.clear()
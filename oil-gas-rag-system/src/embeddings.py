@@ -0,0 +1,206 @@
+import abc
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+
+class EmbeddingProvider(abc.ABC):
+    """
+    Interface of the embedding backends used by DatabaseManager.
+    `model_id` identifies the model (and its settings) in the embedding cache.
+    """
+    model_id = "base"
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Returns one embedding per text, in order."""
+
+    def close(self):
+        """Releases the provider's connections and threads."""
+
+
+class HashingEmbedder(EmbeddingProvider):
+    """
+    Deterministic, dependency-free embedder for offline tests and benchmarks.
+    Hashes lowercase word tokens (and word bigrams) into `dimensions` signed buckets
+    and L2-normalises the result, so texts sharing terms end up close together.
+    """
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.model_id = f"hashing-{dimensions}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = re.findall(r'[a-z0-9]+(?:[-/.][a-z0-9]+)*', text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dimensions
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+
+class OllamaEmbedder(EmbeddingProvider):
+    """Embeds with an Ollama embedding model (e.g. nomic-embed-text), one request per batch."""
+    def __init__(self, model: str = "nomic-embed-text", host: Optional[str] = None):
+        import ollama
+        self.client = ollama.Client(host=host)
+        self.model = model
+        self.model_id = f"ollama-{model}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embed(model=self.model, input=texts)
+        return [list(vector) for vector in response["embeddings"]]
+
+
+class ChromaDefaultEmbedder(EmbeddingProvider):
+    """Chroma's built-in default embedding function (all-MiniLM-L6-v2, ONNX)."""
+    model_id = "chroma-default"
+
+    def __init__(self):
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        self.function = DefaultEmbeddingFunction()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [[float(v) for v in vector] for vector in self.function(texts)]
+
+
+class CachedEmbedder(EmbeddingProvider):
+    """
+    Wraps a provider with a persistent SQLite cache keyed by model id and text hash, so
+    text that repeats across chunks and reports (boilerplate, disclaimers, standard
+    tables) is only ever embedded once. Misses are embedded in batches of `batch_size`,
+    using up to `threads` concurrent batches.
+    """
+    def __init__(self, provider: EmbeddingProvider, cache_path: str, batch_size: int = 64,
+                 threads: int = 1):
+        self.provider = provider
+        self.model_id = provider.model_id
+        self.batch_size = max(1, batch_size)
+        self.threads = max(1, threads)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Created on the first call that has several batches to embed.
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit.
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(part))})",
+                    [self.model_id, *part]
+                )
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+        return found
+
+    def _store(self, items: List[tuple]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model_id, text_hash, array("f", vector).tobytes()) for text_hash, vector in items]
+            )
+            self._conn.commit()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        hashes = [self.text_hash(text) for text in texts]
+        vectors = self._lookup(list(set(hashes)))
+
+        # Each distinct missing text is embedded once, however often it repeats.
+        missing: Dict[str, str] = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in vectors:
+                missing.setdefault(text_hash, text)
+        self.hits += len(texts) - sum(1 for h in hashes if h in missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing_hashes = list(missing)
+            batches = [missing_hashes[i:i + self.batch_size] for i in range(0, len(missing_hashes), self.batch_size)]
+
+            def embed_batch(batch):
+                return list(zip(batch, self.provider.embed([missing[h] for h in batch])))
+
+            if self.threads > 1 and len(batches) > 1:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+                results = [item for batch in self._executor.map(embed_batch, batches) for item in batch]
+            else:
+                results = [item for batch in batches for item in embed_batch(batch)]
+
+            self._store(results)
+            vectors.update(results)
+
+        return [vectors[text_hash] for text_hash in hashes]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._conn.close()
+        self.provider.close()
+
+
+def get_embedder(config: Dict[str, Any]) -> EmbeddingProvider:
+    """
+    Builds the embedding provider configured in config.yaml (`embedding_provider`:
+    default | ollama | hashing), wrapped in the persistent embedding cache unless
+    `embedding_cache_path` is empty.
+    """
+    provider_name = config.get("embedding_provider", "default")
+    if provider_name == "hashing":
+        provider = HashingEmbedder(config.get("embedding_dimensions", 256))
+    elif provider_name == "ollama":
+        provider = OllamaEmbedder(config.get("embedding_model", "nomic-embed-text"), config.get("ollama_url"))
+    elif provider_name == "default":
+        provider = ChromaDefaultEmbedder()
+    else:
+        raise ValueError(f"Unknown embedding_provider: {provider_name}")
+
+    cache_path = config.get("embedding_cache_path", "./embedding_cache.sqlite")
+    if not cache_path:
+        return provider
+    return CachedEmbedder(
+        provider,
+        cache_path,
+        batch_size=config.get("embedding_batch_size", 64),
+        threads=config.get("embedding_threads", 1)
+    )
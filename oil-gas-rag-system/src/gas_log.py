@@ -0,0 +1,310 @@
+import re
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .table_parser import DEPTH_UNITS, header_name_and_unit, normalise_unit, parse_numbers, split_markdown_tables
+
+# Gas columns of mud-log tables, tried in order like table_parser.COLUMN_PATTERNS.
+# iC4/nC4 and iC5/nC5 columns are added up into c4 and c5.
+GAS_COLUMN_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("depth", re.compile(r'depth|\bmd\b|\btvd\b')),
+    ("total_gas", re.compile(r'total\s*gas|^tg$|^gas$')),
+    ("c1", re.compile(r'^c1$|methane')),
+    ("c2", re.compile(r'^c2$|ethane')),
+    ("c3", re.compile(r'^c3$|propane')),
+    ("c4", re.compile(r'^[in]?c4$|butane')),
+    ("c5", re.compile(r'^[in]?c5$|pentane')),
+    ("formation", re.compile(r'formation|lithology|^fm$')),
+]
+COMPONENTS = ("c1", "c2", "c3", "c4", "c5")
+
+# Gas readings are kept in percent; ppm columns are converted.
+GAS_UNITS = {"%": 1.0, "pct": 1.0, "percent": 1.0, "ppm": 1e-4}
+
+# Readings in prose: "Total gas 2.31 % at 1234 m", "Gas peak 4.2 % at 1900 m".
+GAS_SENTENCE = re.compile(
+    r'\b(?:total\s+gas|gas\s+peak|peak\s+gas|max(?:imum)?\s+gas)\b\D{0,20}?(\d+(?:\.\d+)?)\s*%'
+    r'[^.\d]{0,20}?\b(?:at|@)\s*(\d[\d,]*(?:\.\d+)?)\s*(m|ft|feet)\b',
+    re.IGNORECASE
+)
+# Lithology descriptions: "Interval 1200-1210 m MD: sandstone with traces of shale, Viking Group."
+INTERVAL_SENTENCE = re.compile(
+    r'(\d[\d,]*(?:\.\d+)?)\s*-\s*(\d[\d,]*(?:\.\d+)?)\s*(m|ft|feet)\b[^:\n]{0,10}:\s*([^\n]+?)(?:\.\s|\.$|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def _column_unit_factor(unit: Optional[str], units: Dict[str, float], default: float = 1.0) -> Optional[float]:
+    """Factor of a column in `unit` (default if the header names none), None if the unit is unknown."""
+    return units.get(normalise_unit(unit)) if unit else default
+
+
+class GasLog:
+    """
+    Depth-indexed gas readings of one report as NumPy arrays: depth in metres, total gas
+    and the C1-C5 components in percent (NaN where a row has no value), plus optional
+    formation context. Rows are sorted by depth and exact duplicates (e.g. the same
+    sentence in two overlapping chunks) are dropped.
+
+    Peaks and anomalous intervals are found with vectorised operations against a rolling
+    median background, so thousands of readings per report cost milliseconds.
+    """
+    def __init__(self, depth_m: np.ndarray, total_gas: np.ndarray,
+                 components: Optional[Dict[str, np.ndarray]] = None,
+                 formations: Optional[List[Tuple[float, float, str]]] = None,
+                 row_formations: Optional[np.ndarray] = None):
+        depth_m = np.asarray(depth_m, dtype=np.float64)
+        total_gas = np.asarray(total_gas, dtype=np.float64)
+        components = {name: np.asarray(values, dtype=np.float64) for name, values in (components or {}).items()}
+        keep = np.isfinite(depth_m) & np.isfinite(total_gas)
+
+        table = np.column_stack([depth_m[keep], total_gas[keep]] + [components[name][keep] for name in components])
+        _, unique = np.unique(np.nan_to_num(table, nan=-1.0), axis=0, return_index=True)
+        order = unique[np.argsort(table[unique, 0], kind="stable")]
+
+        self.depth_m = table[order, 0]
+        self.total_gas = table[order, 1]
+        self.components = {name: table[order, 2 + i] for i, name in enumerate(components)}
+        self.row_formations = row_formations[keep][order] if row_formations is not None else None
+        # (top_m, base_m, description) intervals, sorted by top.
+        self.formations = sorted(formations or [])
+
+    def __len__(self) -> int:
+        return len(self.depth_m)
+
+    @classmethod
+    def from_text(cls, text: str) -> "GasLog":
+        """
+        Collects the readings of every mud-log table (Markdown, as produced by
+        PDFIngestor) and gas sentence in `text`, with the lithology intervals described
+        in the text as formation context.
+        """
+        depths, totals, row_formations = [], [], []
+        components: Dict[str, List[np.ndarray]] = {name: [] for name in COMPONENTS}
+        for rows in split_markdown_tables(text):
+            parsed = _parse_gas_table(rows)
+            if parsed is None:
+                continue
+            depth, total, table_components, formation = parsed
+            depths.append(depth)
+            totals.append(total)
+            for name in COMPONENTS:
+                components[name].append(table_components.get(name, np.full(len(depth), np.nan)))
+            row_formations.append(formation)
+
+        matches = GAS_SENTENCE.findall(text)
+        if matches:
+            depths.append(np.array([float(depth.replace(",", "")) * DEPTH_UNITS[unit.lower()]
+                                    for _, depth, unit in matches]))
+            totals.append(np.array([float(percent) for percent, _, _ in matches]))
+            for name in COMPONENTS:
+                components[name].append(np.full(len(matches), np.nan))
+            row_formations.append(np.full(len(matches), None, dtype=object))
+
+        formations = [(float(top.replace(",", "")) * DEPTH_UNITS[unit.lower()],
+                       float(base.replace(",", "")) * DEPTH_UNITS[unit.lower()], description.strip())
+                      for top, base, unit, description in INTERVAL_SENTENCE.findall(text)]
+        if not depths:
+            return cls(np.empty(0), np.empty(0), formations=formations)
+        present = {name: np.concatenate(values) for name, values in components.items()
+                   if any(np.isfinite(array).any() for array in values)}
+        return cls(np.concatenate(depths), np.concatenate(totals), present, formations,
+                   np.concatenate(row_formations))
+
+    @classmethod
+    def concatenate(cls, logs: Iterable["GasLog"]) -> "GasLog":
+        """
+        One log from the logs of parts of a report (its pages or stored chunks), so a
+        report can be read piece by piece instead of as one string. Readings repeated
+        across parts (e.g. in overlapping chunks) are dropped like any duplicate.
+        """
+        logs = [log for log in logs if len(log) or log.formations]
+        formations = [formation for log in logs for formation in log.formations]
+        logs = [log for log in logs if len(log)]
+        if not logs:
+            return cls(np.empty(0), np.empty(0), formations=formations)
+        names = [name for name in COMPONENTS if any(name in log.components for log in logs)]
+        components = {name: np.concatenate([log.components.get(name, np.full(len(log), np.nan)) for log in logs])
+                      for name in names}
+        row_formations = np.concatenate([log.row_formations if log.row_formations is not None
+                                         else np.full(len(log), None, dtype=object) for log in logs])
+        return cls(np.concatenate([log.depth_m for log in logs]), np.concatenate([log.total_gas for log in logs]),
+                   components, formations, row_formations)
+
+    def background(self, window: int = 25) -> np.ndarray:
+        """Rolling median of the total gas over `window` readings, centred on each reading."""
+        if len(self) == 0:
+            return self.total_gas.copy()
+        window = min(window, len(self))
+        padded = np.pad(self.total_gas, (window // 2, window - window // 2 - 1), mode="edge")
+        return np.median(sliding_window_view(padded, window), axis=1)
+
+    def formation_at(self, depths: np.ndarray) -> List[Optional[str]]:
+        """Formation context of each depth: the table's formation column, else the described interval."""
+        depths = np.asarray(depths, dtype=np.float64)
+        context: List[Optional[str]] = [None] * len(depths)
+        if self.formations:
+            tops = np.array([top for top, _, _ in self.formations])
+            bases = np.array([base for _, base, _ in self.formations])
+            index = np.searchsorted(tops, depths, side="right") - 1
+            inside = (index >= 0) & (depths <= bases[np.maximum(index, 0)])
+            for position in np.flatnonzero(inside):
+                context[position] = self.formations[index[position]][2]
+        if self.row_formations is not None:
+            positions = np.searchsorted(self.depth_m, depths)
+            for position, row in enumerate(positions):
+                if row < len(self) and self.row_formations[row]:
+                    context[position] = self.row_formations[row]
+        return context
+
+    def peaks(self, ratio: float = 3.0, window: int = 25, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Local maxima of the total gas that reach `ratio` times the background, highest
+        first (at most `limit`), each with its depth, background and formation context.
+        """
+        if len(self) == 0:
+            return []
+        gas, background = self.total_gas, self.background(window)
+        left = np.concatenate(([-np.inf], gas[:-1]))
+        right = np.concatenate((gas[1:], [-np.inf]))
+        is_peak = (gas > left) & (gas >= right) & (gas >= ratio * background) & (gas > 0)
+        rows = np.flatnonzero(is_peak)
+        rows = rows[np.argsort(-gas[rows], kind="stable")][:limit]
+        return self._describe(rows, background)
+
+    def anomalies(self, ratio: float = 3.0, window: int = 25, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Intervals of consecutive readings at or above `ratio` times the background, in
+        depth order, each with its top, base and highest reading. With `limit`, only
+        the intervals with the highest readings are kept.
+        """
+        if len(self) == 0:
+            return []
+        gas, background = self.total_gas, self.background(window)
+        anomalous = (gas >= ratio * background) & (gas > 0)
+        edges = np.diff(np.concatenate(([0], anomalous.astype(np.int8), [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+        if len(starts) == 0:
+            return []
+        # Highest reading of each run: maxima over [start, next start) with the gaps masked.
+        run_max = np.maximum.reduceat(np.where(anomalous, gas, -np.inf), starts)
+        run_of_row = np.cumsum(edges[:-1] == 1) - 1
+        is_max = anomalous & (gas == run_max[np.maximum(run_of_row, 0)])
+        max_rows = np.flatnonzero(is_max)
+        first_max = max_rows[np.unique(run_of_row[max_rows], return_index=True)[1]]
+        if limit is not None and len(starts) > limit:
+            strongest = np.sort(np.argsort(-gas[first_max], kind="stable")[:limit])
+            starts, ends, first_max = starts[strongest], ends[strongest], first_max[strongest]
+
+        context = self.formation_at(self.depth_m[first_max])
+        return [{
+            "top_m": round(float(self.depth_m[start]), 2),
+            "base_m": round(float(self.depth_m[end]), 2),
+            "readings": int(end - start + 1),
+            "max_percent": round(float(gas[row]), 3),
+            "max_depth_m": round(float(self.depth_m[row]), 2),
+            "formation": formation,
+        } for start, end, row, formation in zip(starts, ends, first_max, context)]
+
+    def _describe(self, rows: np.ndarray, background: np.ndarray) -> List[Dict[str, Any]]:
+        context = self.formation_at(self.depth_m[rows])
+        peaks = []
+        for row, formation in zip(rows, context):
+            peak = {
+                "depth_m": round(float(self.depth_m[row]), 2),
+                "percent": round(float(self.total_gas[row]), 3),
+                "background_percent": round(float(background[row]), 3),
+                "ratio": round(float(self.total_gas[row] / background[row]), 2) if background[row] > 0 else None,
+                "formation": formation,
+            }
+            components = {name: round(float(values[row]), 4) for name, values in self.components.items()
+                          if np.isfinite(values[row])}
+            if components:
+                peak["components"] = components
+            peaks.append(peak)
+        return peaks
+
+    def summary(self, ratio: float = 3.0, window: int = 25, max_peaks: int = 5) -> Union[Dict[str, Any], str]:
+        """
+        The well's gas log summary for well_data["geology"]["gas_log"]: the highest
+        reading (percent, depth, formation), and the `max_peaks` strongest peaks above
+        background and anomalous intervals. "N/A" if the report has no gas readings.
+        """
+        if len(self) == 0:
+            return "N/A"
+        highest = int(np.argmax(self.total_gas))
+        return {
+            "percent": round(float(self.total_gas[highest]), 3),
+            "depth_m": round(float(self.depth_m[highest]), 2),
+            "formation": self.formation_at(self.depth_m[[highest]])[0],
+            "readings": len(self),
+            "peaks": self.peaks(ratio, window, max_peaks),
+            "anomalies": self.anomalies(ratio, window, max_peaks),
+        }
+
+
+def describe_gas_peak(summary: Union[Dict[str, Any], str]) -> str:
+    """
+    The one-line gas peak of well_data["geology"]["gas_peak"] for a GasLog.summary,
+    e.g. "4.2 % at 1215 m (Brent Group)"; "N/A" stays "N/A".
+    """
+    if not isinstance(summary, dict):
+        return str(summary)
+    text = f"{summary['percent']:g} % at {summary['depth_m']:g} m"
+    return f"{text} ({summary['formation']})" if summary.get("formation") else text
+
+
+def _parse_gas_table(rows: List[List[str]]) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], np.ndarray]]:
+    """
+    (depth_m, total_gas, components, formation) columns of a mud-log table, None if it is
+    not one. Gas columns in units other than percent or ppm (e.g. "gas units") are skipped.
+    """
+    if len(rows) < 2:
+        return None
+    columns: Dict[str, List[Tuple[int, float]]] = {}
+    for index, cell in enumerate(rows[0]):
+        name, unit = header_name_and_unit(cell)
+        for field, pattern in GAS_COLUMN_PATTERNS:
+            if pattern.search(name) and (field in ("c4", "c5") or field not in columns):
+                if field == "depth":
+                    factor = _column_unit_factor(unit, DEPTH_UNITS)
+                elif field == "formation":
+                    factor = 1.0
+                else:
+                    factor = _column_unit_factor(unit, GAS_UNITS)
+                if factor is None:
+                    # e.g. "Total Gas (units)": gas units are not percent and have no conversion.
+                    print(f"Skipping gas log column '{cell}': unknown unit '{unit}'.")
+                else:
+                    columns.setdefault(field, []).append((index, factor))
+                break
+    gas_fields = [field for field in ("total_gas",) + COMPONENTS if field in columns]
+    if "depth" not in columns or not gas_fields:
+        return None
+
+    body = rows[1:]
+
+    def values(index: int, factor: float) -> np.ndarray:
+        cells = [row[index] if index < len(row) else "" for row in body]
+        return np.array(parse_numbers(cells), dtype=np.float64) * factor
+
+    depth = values(*columns["depth"][0])
+    components = {}
+    for name in COMPONENTS:
+        if name in columns:
+            # np.nansum would turn rows without any value into 0.
+            stacked = np.vstack([values(index, factor) for index, factor in columns[name]])
+            components[name] = np.where(np.isnan(stacked).all(axis=0), np.nan, np.nansum(stacked, axis=0))
+    if "total_gas" in columns:
+        total = values(*columns["total_gas"][0])
+    else:
+        # Without a total gas column, the components add up to it.
+        stacked = np.vstack(list(components.values()))
+        total = np.where(np.isnan(stacked).all(axis=0), np.nan, np.nansum(stacked, axis=0))
+    formation = np.full(len(body), None, dtype=object)
+    if "formation" in columns:
+        index = columns["formation"][0][0]
+        formation[:] = [row[index] if index < len(row) and row[index] else None for row in body]
+    return depth, total, components, formation
@@ -1,33 +1,142 @@
+from typing import Dict, Any, List, Optional, Union
+
+from .async_llm import bounded_chat
+from .context_packer import ContextPacker, GEOLOGY_TERMS
+from .gas_log import GasLog
+from .llm_cache import LLMCache, get_default_cache
+from .llm_client import default_model, chat
+from .outline import outline_from_pages
+from .utils import ParsedDocument, PDFIngestor
+
 class GeologyExtractor:
-    def get_geology_section(self, full_text: str) -> str:
+    def __init__(self, model: Optional[str] = None, cache: Optional[LLMCache] = None,
+                 raise_errors: bool = False, context_tokens: int = 1000, num_predict: int = 192,
+                 gas_peak_ratio: float = 3.0, gas_background_window: int = 25, gas_max_peaks: int = 5):
+        self.model = model or default_model()
+        self.cache = cache or get_default_cache()
+        # The prompt gets the sentences most likely to report drilling problems.
+        self.packer = ContextPacker(GEOLOGY_TERMS, context_tokens)
+        # Cap on generated tokens: the summary is at most three sentences.
+        self.num_predict = num_predict
+        # Re-raise LLM failures instead of falling back (the job runner retries them).
+        self.raise_errors = raise_errors
+        # Gas peaks: readings at least gas_peak_ratio times the rolling median background.
+        self.gas_peak_ratio = gas_peak_ratio
+        self.gas_background_window = gas_background_window
+        self.gas_max_peaks = gas_max_peaks
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs) -> "GeologyExtractor":
+        kwargs.setdefault("model", config.get("llm_model"))
+        return cls(context_tokens=config.get("geology_context_tokens", 1000),
+                   num_predict=config.get("geology_num_predict", 192),
+                   gas_peak_ratio=config.get("gas_peak_ratio", 3.0),
+                   gas_background_window=config.get("gas_background_window", 25),
+                   gas_max_peaks=config.get("gas_max_peaks", 5), **kwargs)
+
+    def get_geology_section(self, source: Union[str, ParsedDocument, PDFIngestor]) -> str:
         """
-        Extracts the geology section from the full text of the well report.
+        Extracts the geology section of the well report.
         
-        This method looks for the substring starting with "4. Geology" and ending at "5.0".
+        The section runs from its heading to the next heading of the same or a higher
+        level, and is found through the document outline, so numbering variants such as
+        "4. Geology", "4.0 Geology" or "4 GEOLOGY" are all recognised. Given a
+        PDFIngestor or ParsedDocument, only the pages of the section are read.
         
         Args:
-            full_text (str): The complete text of the well report.
+            source: The complete text of the well report, a parsed document or an
+                ingestor of the PDF.
         
         Returns:
-            str: The extracted geology section.
+            str: The extracted geology section, or an empty string if there is none.
+        """
+        if isinstance(source, (ParsedDocument, PDFIngestor)):
+            return source.section_text("Geology")
+        outline = outline_from_pages([(1, source)], page_count=1)
+        return outline.section_text("Geology", lambda _: source)
+
+    def extract_gas_peak(self, source: Union[str, ParsedDocument, GasLog]) -> Union[Dict[str, Any], str]:
         """
-        start_index = full_text.find("4. Geology")
-        end_index = full_text.find("5.0", start_index)
-        if start_index != -1 and end_index != -1:
-            return full_text[start_index:end_index].strip()
-        return ""
+        Finds the well's gas peak in its mud-log tables and gas readings, without an
+        LLM call (see GasLog).
+
+        Args:
+            source: The report text (pages with their Markdown tables), a parsed document,
+                or a GasLog already collected from the report page by page.
+
+        Returns:
+            The highest total gas reading (percent, depth_m, formation) with the strongest
+            peaks above background and the anomalous intervals, or "N/A" if the report
+            has no gas readings.
+        """
+        if isinstance(source, ParsedDocument):
+            source = GasLog.concatenate(GasLog.from_text(page.full_text) for page in source.pages)
+        elif not isinstance(source, GasLog):
+            source = GasLog.from_text(source)
+        return source.summary(self.gas_peak_ratio, self.gas_background_window, self.gas_max_peaks)
 
     def summarize_problems(self, section_text: str) -> str:
         """
         Summarizes drilling problems from the geology section.
         
-        This method mocks a call to ollama.chat to ask about drilling problems.
+        This method asks the LLM (through the shared response cache) about drilling
+        problems such as gas peaks, losses, kicks and unstable formations.
         
         Args:
             section_text (str): The text of the geology section.
         
         Returns:
-            str: A mock response indicating drilling problems.
+            str: A short summary of the drilling problems, or an empty string if the
+                text is empty or the LLM call fails.
+        """
+        if not section_text.strip():
+            return ""
+
+        messages = self._problems_messages(section_text)
+        options = {"num_predict": self.num_predict}
+        try:
+            response = self.cache.chat(
+                self.model, messages,
+                lambda: chat(self.model, messages, options=options),
+                options=options
+            )
+            return response['message']['content'].strip()
+        except Exception as e:
+            if self.raise_errors:
+                raise
+            print(f"Error calling Ollama: {e}")
+            return ""
+
+    async def summarize_problems_async(self, section_text: str, timeout: Optional[float] = None) -> str:
+        """
+        Async variant of summarize_problems for the concurrent pipeline. Returns an
+        empty string on timeout or error, like summarize_problems.
+        """
+        if not section_text.strip():
+            return ""
+
+        messages = self._problems_messages(section_text)
+        options = {"num_predict": self.num_predict}
+        try:
+            response = await self.cache.achat(
+                self.model, messages,
+                lambda: bounded_chat(self.model, messages, timeout=timeout, options=options),
+                options=options
+            )
+            return response['message']['content'].strip()
+        except Exception as e:
+            if self.raise_errors:
+                raise
+            print(f"Error calling Ollama: {e!r}")
+            return ""
+
+    def _problems_messages(self, section_text: str) -> List[Dict[str, str]]:
+        prompt = f"""
+        You are a Drilling Geologist. Summarize the drilling problems reported in the geology section below
+        (e.g. gas peaks, losses, kicks, stuck pipe, unstable formations) in at most three sentences.
+        Mention depths and formations where given. If no problems are reported, answer "No drilling problems reported."
+
+        Text:
+        {self.packer.pack(section_text)}
         """
-        # Mocking the call to ollama.chat
-        return "Mock response: Drilling problems identified include issues with gas peaks and unstable formations."
\ No newline at end of file
+        return [{'role': 'user', 'content': prompt}]
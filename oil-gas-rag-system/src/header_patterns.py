@@ -0,0 +1,74 @@
+import re
+from typing import Dict, List, Tuple
+
+# Label alternatives per header field.
+FIELD_LABELS: Dict[str, str] = {
+    "well_name": r'well\s*(?:name|id|no\.?|number)?|borehole(?:\s*name)?',
+    "operator": r'operator|operating\s+company|operated\s+by|company',
+    "rig": r'(?:drilling\s+)?rig(?:\s*name)?|contractor\s+rig',
+    "field": r'field(?:\s*name)?',
+    "licence": r'licen[cs]e(?:\s*(?:no\.?|number))?|permit(?:\s*(?:no\.?|number))?|concession',
+    "spud_date": r'spud\s*date|date\s+spudded',
+}
+
+# Layouts the labels appear in, with the confidence of a match in that layout.
+# "Label: value" on one line is the most reliable; a label alone on a line followed by
+# the value on the next line (common in PDF text extraction of header boxes) less so.
+LAYOUTS: List[Tuple[str, float]] = [
+    (r'^[ \t]*(?:{label})[ \t]*[:=][ \t]*(?P<value>[^\n|]+?)[ \t]*$', 0.95),
+    (r'^[ \t]*\|[ \t]*(?:{label})[ \t]*:?[ \t]*\|[ \t]*(?P<value>[^\n|]+?)[ \t]*\|', 0.9),
+    (r'^[ \t]*(?:{label})[ \t]*:?[ \t]*\n[ \t]*(?P<value>[^\n:|]+?)[ \t]*$', 0.7),
+]
+
+FIELD_PATTERNS: Dict[str, List[Tuple[re.Pattern, float]]] = {
+    field: [
+        (re.compile(layout.format(label=label), re.IGNORECASE | re.MULTILINE), confidence)
+        for layout, confidence in LAYOUTS
+    ]
+    for field, label in FIELD_LABELS.items()
+}
+
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}')
+
+
+def _plausibility(field: str, value: str) -> float:
+    """Scales the layout confidence down for values that do not look like the field."""
+    if field == "spud_date":
+        return 1.0 if DATE_PATTERN.fullmatch(value) else 0.0
+    if not re.search(r'[A-Za-z0-9]', value):
+        return 0.0
+    if len(value) > 60 or value.lower() in ("n/a", "na", "-", "tbd", "unknown"):
+        return 0.3
+    if field == "well_name" and not re.search(r'\d', value):
+        # Well names almost always carry a number (e.g. "Deep Earth 1", "NLW-GT-01").
+        return 0.8
+    return 1.0
+
+
+def extract_header_fields(text: str) -> Dict[str, Tuple[str, float]]:
+    """
+    Extracts header fields (well_name, operator, rig, field, licence, spud_date) with
+    compiled label patterns.
+
+    Returns:
+        Dict[str, Tuple[str, float]]: field -> (value, confidence in [0, 1]) for each field
+            found; the most confident match wins.
+    """
+    fields: Dict[str, Tuple[str, float]] = {}
+    for field, patterns in FIELD_PATTERNS.items():
+        best = None
+        for pattern, confidence in patterns:
+            for match in pattern.finditer(text):
+                value = match.group("value").strip().strip(",;")
+                if field == "spud_date":
+                    date_match = DATE_PATTERN.search(value)
+                    value = date_match.group(0) if date_match else value
+                score = confidence * _plausibility(field, value)
+                if score > 0 and (best is None or score > best[1]):
+                    best = (value, score)
+            if best is not None and best[1] >= confidence:
+                # No later (less reliable) layout can beat this match.
+                break
+        if best is not None:
+            fields[field] = (best[0], round(best[1], 2))
+    return fields
@@ -0,0 +1,257 @@
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# Module-level switch: when False, timer() returns a shared no-op context manager and
+# count() returns immediately, so instrumented code pays one global lookup per call.
+_enabled = False
+_settings = {"trace_dir": "", "metrics_path": ""}
+
+# Ollama response fields recorded for every (uncached) LLM call.
+OLLAMA_STATS = ("prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration", "total_duration")
+
+
+class Trace:
+    """Stage timings (count, total and max seconds) and counters of one report or of the process."""
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def add_count(self, name: str, value: float):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: Dict[str, Any]):
+        """Adds the stages and counters of another trace's to_dict()."""
+        with self._lock:
+            for stage, added in other["stages"].items():
+                entry = self.stages.setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+                entry["count"] += added["count"]
+                entry["seconds"] += added["seconds"]
+                entry["max_seconds"] = max(entry["max_seconds"], added["max_seconds"])
+            for name, value in other["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "started": self.started,
+                "wall_seconds": round(time.time() - self.started, 6),
+                "stages": {stage: dict(entry) for stage, entry in self.stages.items()},
+                "counters": dict(self.counters)
+            }
+
+
+# Totals of the whole process (exported to Prometheus) and the trace of the report
+# being processed in the current thread or asyncio task.
+_process = Trace("process")
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("instrumentation_trace", default=None)
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        _process.add_time(self.stage, seconds)
+        trace = _current.get()
+        if trace is not None:
+            trace.add_time(self.stage, seconds)
+        return False
+
+
+def configure_instrumentation(config: Optional[Dict[str, Any]] = None, **overrides):
+    """
+    Enables or disables instrumentation from config.yaml (`instrumentation`,
+    `trace_dir`, `metrics_path`); keyword arguments override the config values.
+    """
+    global _enabled
+    config = dict(config or {})
+    config.update(overrides)
+    _enabled = bool(config.get("instrumentation", False))
+    _settings["trace_dir"] = config.get("trace_dir", "") or ""
+    _settings["metrics_path"] = config.get("metrics_path", "") or ""
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def timer(stage: str):
+    """
+    Times a stage: `with timer("find_tables"): ...`. Nested and repeated stages are
+    all recorded; a stage's count is the number of times it ran.
+    """
+    if not _enabled:
+        return _NOOP
+    return _Timer(stage)
+
+
+def timed(stage: str):
+    """Decorator form of timer()."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1):
+    """Adds `value` to a counter (pages, tables, chunks, prompt_chars, ...)."""
+    if not _enabled:
+        return
+    _process.add_count(name, value)
+    trace = _current.get()
+    if trace is not None:
+        trace.add_count(name, value)
+
+
+def record_llm_response(response: Dict[str, Any], prompt_chars: int = 0):
+    """Counts an LLM call with Ollama's own token counts and durations (in nanoseconds)."""
+    if not _enabled:
+        return
+    count("llm_calls")
+    count("prompt_chars", prompt_chars)
+    for field in OLLAMA_STATS:
+        value = response.get(field)
+        if value:
+            count(f"ollama_{field}", value)
+
+
+@contextmanager
+def report_trace(name: str):
+    """
+    Collects the timings and counters of everything run inside the block (including
+    asyncio tasks and threads started with asyncio.to_thread from it) into a per-report
+    trace, written as JSON to `trace_dir` when the block ends. Yields None when disabled.
+    """
+    with collect_trace(name) as trace:
+        try:
+            yield trace
+        finally:
+            if trace is not None and _settings["trace_dir"]:
+                write_trace(trace, _settings["trace_dir"])
+
+
+@contextmanager
+def collect_trace(name: str):
+    """
+    Like report_trace, but the trace is not written: e.g. a worker process collects the
+    timings and counters of one task and returns trace.to_dict() to the parent, which
+    adds them with merge_trace(). Yields None when disabled.
+    """
+    if not _enabled:
+        yield None
+        return
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def merge_trace(other: Dict[str, Any]):
+    """Adds timings and counters recorded elsewhere (a trace's to_dict()) to the process totals and current trace."""
+    if not _enabled:
+        return
+    _process.merge(other)
+    trace = _current.get()
+    if trace is not None:
+        trace.merge(other)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def write_trace(trace: Trace, directory: str) -> str:
+    """
+    Writes a trace as `<report file name>.<hash>.trace.json` and returns its path. The
+    short hash of the full report path keeps same-named reports in different folders apart.
+    """
+    os.makedirs(directory, exist_ok=True)
+    suffix = hashlib.sha256(os.path.abspath(trace.name).encode("utf-8")).hexdigest()[:8]
+    path = os.path.join(directory, f"{os.path.basename(trace.name)}.{suffix}.trace.json")
+    with open(path, 'w') as f:
+        json.dump(trace.to_dict(), f, indent=2)
+    return path
+
+
+def _metric_name(name: str) -> str:
+    return "wellrag_" + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def prometheus_text() -> str:
+    """Process totals in the Prometheus text exposition format."""
+    snapshot = _process.to_dict()
+    lines = [
+        "# HELP wellrag_stage_seconds Time spent per pipeline stage.",
+        "# TYPE wellrag_stage_seconds summary",
+    ]
+    for stage, entry in sorted(snapshot["stages"].items()):
+        lines.append(f'wellrag_stage_seconds_sum{{stage="{stage}"}} {entry["seconds"]:.6f}')
+        lines.append(f'wellrag_stage_seconds_count{{stage="{stage}"}} {entry["count"]}')
+    for name, value in sorted(snapshot["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Optional[str] = None):
+    """Writes prometheus_text() to `path` (default: config `metrics_path`), if enabled and set."""
+    path = path or _settings["metrics_path"]
+    if not _enabled or not path:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def reset():
+    """Clears the process totals (useful for testing)."""
+    global _process
+    _process = Trace("process")
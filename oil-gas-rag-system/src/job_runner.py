@@ -0,0 +1,481 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Callable, Iterable
+
+from .chunker import Chunker
+from .llm_cache import LLMCache
+from .manifest import report_path
+
+# Chroma, PyMuPDF and the LLM client are only imported once a runner is created, so
+# reading the queue status (JobStore) stays fast.
+if TYPE_CHECKING:
+    from .database_manager import DatabaseManager
+    from .results_store import ResultsStore
+
+# Pipeline stages of a report, in the order they run.
+STAGES = ("ingested", "embedded", "header", "specs", "geology", "gas")
+
+# Pages the 'ingested' stage keeps for extraction: the header pages, the geology section
+# and the casing and mud sections or tables (as in main.py).
+HEADER_PAGES = 3
+GEOLOGY_SECTION = "Geology"
+SPEC_KEYWORDS = ["Casing", "Mud"]
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+def assemble_well_data(header: Dict[str, Any], specs: Dict[str, Any], issues: str,
+                       gas_peak: Any = "N/A") -> Dict[str, Any]:
+    """
+    The well_data result (schemas/well_data.json) of a report from its stage outputs:
+    the geology summary and the GasLog summary of extract_gas_peak.
+    """
+    from .gas_log import describe_gas_peak
+    return {
+        "header": header,
+        "specs": specs,
+        "geology": {
+            "issues": [issues],  # summarize_problems returns a string
+            "gas_peak": describe_gas_peak(gas_peak),  # e.g. "4.2 % at 1215 m (Brent Group)", or "N/A"
+            "gas_log": gas_peak if isinstance(gas_peak, dict) else None  # peaks and intervals (GasLog.summary)
+        }
+    }
+
+
+class JobStore:
+    """
+    Local SQLite queue of report jobs and the status of each of their stages.
+
+    Every stage's output is stored as JSON when it completes, so a job interrupted by a
+    crash resumes from its last completed stage. Stages left 'running' by a crashed
+    process are returned to 'pending' when the store is opened (the interrupted attempt
+    still counts towards the retry limit). One runner per store is assumed.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " report TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " started REAL,"
+            " finished REAL,"
+            " result TEXT,"
+            " error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stages ("
+            " report TEXT NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt REAL NOT NULL DEFAULT 0,"
+            " started REAL,"
+            " finished REAL,"
+            " output TEXT,"
+            " error TEXT,"
+            " PRIMARY KEY (report, stage))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created)")
+        self._conn.execute("UPDATE stages SET status = ? WHERE status = ?", (PENDING, RUNNING))
+        self._conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (PENDING, RUNNING))
+        self._conn.commit()
+
+    def enqueue(self, reports: Iterable[str]) -> int:
+        """Adds a job for each report (by its report_path) not queued yet. Returns the number added."""
+        now = time.time()
+        added = 0
+        with self._lock:
+            for report in map(report_path, reports):
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO jobs (report, status, created) VALUES (?, ?, ?)",
+                    (report, PENDING, now)
+                )
+                if cursor.rowcount:
+                    added += 1
+                    self._conn.executemany(
+                        "INSERT INTO stages (report, stage, position, status) VALUES (?, ?, ?, ?)",
+                        [(report, stage, position, PENDING) for position, stage in enumerate(STAGES)]
+                    )
+            self._conn.commit()
+        return added
+
+    def retry_failed(self) -> int:
+        """Re-queues failed jobs (their failed stages start over with a fresh attempt count)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE stages SET status = ?, attempts = 0, next_attempt = 0, error = NULL "
+                "WHERE status = ?", (PENDING, FAILED)
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL WHERE status = ?", (PENDING, FAILED)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def next_job(self, now: Optional[float] = None) -> Optional[str]:
+        """The oldest unfinished job whose next stage is due, or None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT j.report FROM jobs j JOIN stages s ON s.report = j.report "
+                "WHERE j.status = ? AND s.status = ? AND s.next_attempt <= ? "
+                "AND s.position = (SELECT MIN(position) FROM stages WHERE report = j.report AND status != ?) "
+                "ORDER BY j.created, j.report LIMIT 1",
+                (PENDING, PENDING, now, DONE)
+            ).fetchone()
+        return row[0] if row else None
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest retry of an unfinished job is due; None if no job is pending."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(s.next_attempt) FROM stages s JOIN jobs j ON s.report = j.report "
+                "WHERE j.status = ? AND s.status = ?", (PENDING, PENDING)
+            ).fetchone()
+        return row[0]
+
+    def stages(self, report: str) -> List[Dict[str, Any]]:
+        """The report's stages in pipeline order, with their status, attempts and output."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, status, attempts, next_attempt, output, error FROM stages "
+                "WHERE report = ? ORDER BY position", (report,)
+            ).fetchall()
+        return [
+            {"stage": stage, "status": status, "attempts": attempts, "next_attempt": next_attempt,
+             "output": json.loads(output) if output is not None else None, "error": error}
+            for stage, status, attempts, next_attempt, output, error in rows
+        ]
+
+    def start_stage(self, report: str, stage: str) -> int:
+        """Marks the stage running and returns its attempt number (1-based)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE stages SET status = ?, attempts = attempts + 1, started = ? WHERE report = ? AND stage = ?",
+                (RUNNING, now, report, stage)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started = COALESCE(started, ?) WHERE report = ?",
+                (RUNNING, now, report)
+            )
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT attempts FROM stages WHERE report = ? AND stage = ?", (report, stage)
+            ).fetchone()[0]
+
+    def complete_stage(self, report: str, stage: str, output: Any):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE stages SET status = ?, finished = ?, output = ?, error = NULL WHERE report = ? AND stage = ?",
+                (DONE, time.time(), json.dumps(output), report, stage)
+            )
+            self._conn.commit()
+
+    def fail_stage(self, report: str, stage: str, error: str, retry_at: Optional[float] = None):
+        """
+        Records a failed attempt. With `retry_at` the stage is retried from then on;
+        without it the stage and its job are marked failed.
+        """
+        with self._lock:
+            if retry_at is not None:
+                self._conn.execute(
+                    "UPDATE stages SET status = ?, next_attempt = ?, error = ? WHERE report = ? AND stage = ?",
+                    (PENDING, retry_at, error, report, stage)
+                )
+                self._conn.execute("UPDATE jobs SET status = ? WHERE report = ?", (PENDING, report))
+            else:
+                self._conn.execute(
+                    "UPDATE stages SET status = ?, finished = ?, error = ? WHERE report = ? AND stage = ?",
+                    (FAILED, time.time(), error, report, stage)
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished = ?, error = ? WHERE report = ?",
+                    (FAILED, time.time(), f"{stage}: {error}", report)
+                )
+            self._conn.commit()
+
+    def pause_job(self, report: str):
+        """Returns a job to the queue between stages (e.g. when the runner is stopped)."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ? WHERE report = ? AND status = ?",
+                               (PENDING, report, RUNNING))
+            self._conn.commit()
+
+    def finish_job(self, report: str, result: Any):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, result = ?, error = NULL WHERE report = ?",
+                (DONE, time.time(), json.dumps(result), report)
+            )
+            self._conn.commit()
+
+    def result(self, report: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE report = ?", (report,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Progress of the corpus: job counts by status, stage counts by status, the mean
+        duration of each completed stage, and the throughput in finished reports per
+        hour (since the first job started).
+        """
+        with self._lock:
+            jobs = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            stage_rows = self._conn.execute(
+                "SELECT stage, status, COUNT(*), AVG(CASE WHEN status = ? THEN finished - started END) "
+                "FROM stages GROUP BY stage, status", (DONE,)
+            ).fetchall()
+            first_start = self._conn.execute("SELECT MIN(started) FROM jobs").fetchone()[0]
+            last_finish, finished = self._conn.execute(
+                "SELECT MAX(finished), COUNT(*) FROM jobs WHERE status = ?", (DONE,)
+            ).fetchone()
+
+        stages: Dict[str, Dict[str, int]] = {stage: {} for stage in STAGES}
+        stage_seconds: Dict[str, float] = {}
+        for stage, status, number, mean_seconds in stage_rows:
+            stages.setdefault(stage, {})[status] = number
+            if status == DONE and mean_seconds is not None:
+                stage_seconds[stage] = round(mean_seconds, 3)
+
+        elapsed = last_finish - first_start if finished else 0.0
+        return {
+            "jobs": {status: jobs.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED)},
+            "total": sum(jobs.values()),
+            "stages": stages,
+            "stage_seconds": stage_seconds,
+            "elapsed_seconds": round(elapsed, 3),
+            "reports_per_hour": round(finished * 3600 / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+class JobRunner:
+    """
+    Runs queued report jobs stage by stage (see STAGES), checkpointing each stage's
+    output in the JobStore. A failed stage is retried with exponential backoff
+    (`backoff_seconds`, doubled on each attempt up to `max_backoff_seconds`) while the
+    runner moves on to other reports; after `max_attempts` the job is marked failed.
+    LLM failures count as stage failures, since the extractors are created with
+    raise_errors=True.
+    """
+    def __init__(self, db: "DatabaseManager", store: JobStore, max_attempts: int = 3,
+                 backoff_seconds: float = 30, max_backoff_seconds: float = 600,
+                 assemble: Optional[Callable[[Dict[str, Any], Dict[str, Any], str, Any], Any]] = None,
+                 cache: Optional[LLMCache] = None, results_store: Optional["ResultsStore"] = None):
+        from .geology_extractor import GeologyExtractor
+        from .metadata_extractor import MetadataExtractor
+        from .specs_extractor import TechSpecsExtractor
+
+        self.db = db
+        self.store = store
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        # Builds the job result from the header, specs, geology and gas outputs.
+        self.assemble = assemble or assemble_well_data
+        # Finished results are also appended here for cross-well queries.
+        self.results_store = results_store
+        self.fast_layout = db.config.get("fast_layout", False)
+        self.metadata_extractor = MetadataExtractor.from_config(db.config, cache=cache, raise_errors=True)
+        self.specs_extractor = TechSpecsExtractor.from_config(db.config, cache=cache, raise_errors=True)
+        self.geology_extractor = GeologyExtractor.from_config(db.config, cache=cache, raise_errors=True)
+
+    @classmethod
+    def from_config(cls, db: "DatabaseManager", store: Optional[JobStore] = None, **kwargs) -> "JobRunner":
+        config = db.config
+        return cls(
+            db, store or JobStore(config.get("job_db_path", "./jobs.sqlite")),
+            max_attempts=config.get("job_max_attempts", 3),
+            backoff_seconds=config.get("job_backoff_seconds", 30),
+            max_backoff_seconds=config.get("job_max_backoff_seconds", 600),
+            **kwargs
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retrying after the given (1-based) failed attempt."""
+        return min(self.backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds)
+
+    def run(self, max_jobs: Optional[int] = None, wait: bool = True) -> int:
+        """
+        Processes queued jobs until none is left (or `max_jobs` have been run). When
+        only jobs waiting for a retry remain, sleeps until the first is due, unless
+        `wait` is False. Returns the number of jobs that finished.
+        """
+        finished = 0
+        runs = 0
+        while max_jobs is None or runs < max_jobs:
+            report = self.store.next_job()
+            if report is None:
+                due = self.store.next_due()
+                if due is None or not wait:
+                    break
+                time.sleep(max(0.0, due - time.time()))
+                continue
+            runs += 1
+            if self.run_job(report):
+                finished += 1
+        if self.results_store is not None:
+            self.results_store.flush()
+        return finished
+
+    def close(self):
+        self.store.close()
+        if self.results_store is not None:
+            self.results_store.close()
+
+    def run_job(self, report: str) -> bool:
+        """
+        Runs the report's remaining stages in order. Returns True if the job finished,
+        False if a stage failed (it is then either scheduled for a retry or failed).
+        """
+        outputs = {}
+        for stage in self.store.stages(report):
+            if stage["status"] == DONE:
+                outputs[stage["stage"]] = stage["output"]
+                continue
+            if stage["next_attempt"] > time.time():
+                self.store.pause_job(report)
+                return False
+
+            attempt = self.store.start_stage(report, stage["stage"])
+            print(f"[Jobs] {report}: {stage['stage']} (attempt {attempt})")
+            try:
+                output = getattr(self, f"_run_{stage['stage']}")(report, outputs)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if attempt < self.max_attempts:
+                    delay = self.backoff(attempt)
+                    print(f"[Jobs] {report}: {stage['stage']} failed ({error}), retrying in {delay:.0f}s")
+                    self.store.fail_stage(report, stage["stage"], error, retry_at=time.time() + delay)
+                else:
+                    print(f"[Jobs] {report}: {stage['stage']} failed after {attempt} attempts ({error})")
+                    self.store.fail_stage(report, stage["stage"], error)
+                return False
+            self.store.complete_stage(report, stage["stage"], output)
+            outputs[stage["stage"]] = output
+
+        # Jobs queued before the gas stage existed have no gas output.
+        result = self.assemble(outputs["header"], outputs["specs"], outputs["geology"], outputs.get("gas", "N/A"))
+        self.store.finish_job(report, result)
+        if self.results_store is not None:
+            self.results_store.add(report, result)
+        return True
+
+    # --- Stages: each returns a JSON-serialisable output, available to later stages ---
+
+    def _run_ingested(self, report: str, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        if not os.path.exists(report):
+            raise FileNotFoundError(report)
+        if self.db.manifest.is_unchanged(report):
+            # Already stored at this content: the header comes from the stored chunks and
+            # the geology section is read from its pages only.
+            header_chunks = self.db.get_report_chunks(report, page=1, n_results=5)
+            return {
+                "unchanged": True,
+                "header_text": "\n".join(header_chunks),
+                "spec_tables": self.specs_extractor.extract_tables_to_markdown(
+                    report, SPEC_KEYWORDS, self.fast_layout
+                ),
+                "geology_text": self._geology_text(report)
+            }
+        from .utils import PDFIngestor, extraction_filter
+        ingestor = PDFIngestor(report, fast_layout=self.fast_layout)
+        try:
+            # Only the pages the extractors read are kept, so memory does not grow with the report.
+            parsed_doc = ingestor.parse_document(
+                keep=extraction_filter(HEADER_PAGES, [GEOLOGY_SECTION] + SPEC_KEYWORDS, SPEC_KEYWORDS)
+            )
+            page_count = ingestor.page_count
+        finally:
+            ingestor.close()
+        return {
+            "unchanged": False,
+            "pages": page_count,
+            "header_text": parsed_doc.header_text(HEADER_PAGES),
+            "spec_tables": self.specs_extractor.extract_tables_to_markdown(parsed_doc, SPEC_KEYWORDS),
+            "geology_text": self.geology_extractor.get_geology_section(parsed_doc)
+        }
+
+    def _geology_text(self, report: str) -> str:
+        """The geology section of the PDF, reading only the section's pages."""
+        from .utils import PDFIngestor
+        ingestor = PDFIngestor(report, fast_layout=self.fast_layout)
+        try:
+            return self.geology_extractor.get_geology_section(ingestor)
+        finally:
+            ingestor.close()
+
+    def _run_embedded(self, report: str, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        if outputs["ingested"]["unchanged"]:
+            return {"chunks": 0}
+        from .utils import PDFIngestor
+        ingestor = PDFIngestor(report, fast_layout=self.fast_layout)
+        chunk_count = 0
+
+        def counted(chunks):
+            nonlocal chunk_count
+            for chunk in chunks:
+                chunk_count += 1
+                yield chunk
+
+        try:
+            # Streamed page by page into save_chunks, so the report's chunk list is never built.
+            self.db.save_chunks(counted(ingestor.iter_chunks(Chunker.from_config(self.db.config))))
+        finally:
+            ingestor.close()
+        self.db.manifest.record(report)
+        self.db.manifest.save()
+        return {"chunks": chunk_count}
+
+    def _run_header(self, report: str, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.metadata_extractor.extract_header(outputs["ingested"]["header_text"])
+
+    def _run_specs(self, report: str, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.specs_extractor.parse_specs(outputs["ingested"]["spec_tables"])
+
+    def _run_geology(self, report: str, outputs: Dict[str, Any]) -> str:
+        geo_text = outputs["ingested"].get("geology_text")
+        if geo_text is None:
+            # Checkpointed before the ingested stage recorded the geology section.
+            geo_text = self._geology_text(report)
+        return self.geology_extractor.summarize_problems(geo_text)
+
+    def _run_gas(self, report: str, outputs: Dict[str, Any]) -> Any:
+        # Numeric only (no LLM call): gas readings from the report's stored text and
+        # tables, read back a batch of chunks at a time.
+        from .gas_log import GasLog
+        gas_log = GasLog.concatenate(GasLog.from_text(text) for text in self.db.iter_report_chunks(report))
+        return self.geology_extractor.extract_gas_peak(gas_log)
+
+
+def format_status(status: Dict[str, Any]) -> str:
+    """Human-readable summary of JobStore.status()."""
+    jobs = status["jobs"]
+    lines = [
+        f"Reports: {status['total']} total, {jobs[DONE]} done, {jobs[PENDING]} pending, "
+        f"{jobs[RUNNING]} running, {jobs[FAILED]} failed",
+        f"Throughput: {status['reports_per_hour']:.2f} reports/hour over {status['elapsed_seconds']:.0f}s"
+    ]
+    for stage in STAGES:
+        counts = status["stages"].get(stage, {})
+        mean = status["stage_seconds"].get(stage)
+        lines.append(
+            f"  {stage:10s} done {counts.get(DONE, 0):5d}  pending {counts.get(PENDING, 0):5d}  "
+            f"failed {counts.get(FAILED, 0):5d}" + (f"  mean {mean:.2f}s" if mean is not None else "")
+        )
+    return "\n".join(lines)
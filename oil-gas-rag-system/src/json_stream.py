@@ -0,0 +1,184 @@
+import json
+from typing import Dict, Any, List, Optional, Callable
+
+from .llm_cache import response_to_dict
+from .llm_client import get_llm_client, keep_alive
+
+# Expected top-level keys of each extractor's JSON answer and their types (None: any).
+HEADER_SCHEMA: Dict[str, Any] = {"well_name": None, "operator": None}
+SPECS_SCHEMA: Dict[str, Any] = {"casing_data": list, "mud_data": list}
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object out of streamed LLM output as it arrives.
+
+    Text before the first '{' is skipped. Braces are tracked outside strings, so the
+    parser knows the moment the top-level object closes; if that object does not match
+    `schema` (all keys present, values of the given types), it is discarded and the
+    next object is awaited. `partial()` returns the fields completed so far.
+    """
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.result: Optional[Dict[str, Any]] = None
+        self.text = ""
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # End offset of the last complete top-level field (at its separating comma).
+        self._last_field_end: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, text: str) -> bool:
+        """Consumes the next piece of output. Returns True once a valid object is complete."""
+        if self.done:
+            return True
+        offset = len(self.text)
+        self.text += text
+        for index in range(offset, len(self.text)):
+            char = self.text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._start is not None:
+                    self._in_string = True
+            elif char in "{[":
+                if self._start is None:
+                    if char != "{":
+                        continue
+                    self._start = index
+                self._depth += 1
+            elif char in "}]" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close(index)
+                    if self.done:
+                        return True
+            elif char == "," and self._depth == 1:
+                self._last_field_end = index
+        return False
+
+    def _close(self, end: int):
+        candidate = self.text[self._start:end + 1]
+        self._start, self._last_field_end = None, None
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            return
+        if self.validate(value):
+            self.result = value
+
+    def validate(self, value: Any) -> bool:
+        if not isinstance(value, dict):
+            return False
+        for key, expected in self.schema.items():
+            if key not in value or (expected is not None and not isinstance(value[key], expected)):
+                return False
+        return True
+
+    def partial(self) -> Dict[str, Any]:
+        """The completed fields of the object being streamed (the whole result once done)."""
+        if self.done:
+            return self.result
+        if self._start is None or self._last_field_end is None:
+            return {}
+        try:
+            value = json.loads(self.text[self._start:self._last_field_end] + "}")
+        except json.JSONDecodeError:
+            return {}
+        return value if isinstance(value, dict) else {}
+
+
+class _StreamState:
+    """Feeds streamed chat parts to the parser and reports newly completed fields."""
+    def __init__(self, parser: IncrementalJSONParser, on_partial: Optional[Callable[[Dict[str, Any]], None]]):
+        self.parser = parser
+        self.on_partial = on_partial
+        self.last: Dict[str, Any] = {}
+        self.chunks = 0
+        self._fields = 0
+
+    def feed(self, part: Any) -> bool:
+        """Returns True once the object is complete."""
+        self.last = response_to_dict(part)
+        self.chunks += 1
+        self.parser.feed((self.last.get("message") or {}).get("content") or "")
+        if self.on_partial is not None:
+            partial = self.parser.partial()
+            if len(partial) > self._fields:
+                self._fields = len(partial)
+                self.on_partial(partial)
+        return self.parser.done
+
+
+def _json_response(model: str, state: _StreamState) -> Dict[str, Any]:
+    """The stream as one non-streaming chat response (the shape LLMCache stores)."""
+    parser, last = state.parser, state.last
+    if not parser.done:
+        raise ValueError(f"No valid JSON object with keys {sorted(parser.schema)} in the LLM output: "
+                         f"{parser.text[:200]!r}")
+    response = {
+        "model": model,
+        "message": {"role": "assistant", "content": json.dumps(parser.result)},
+        "done": True,
+        # Stopped early: the final part (with Ollama's token counts) never arrived.
+        "early_stop": not last.get("done", False),
+        "eval_count": last.get("eval_count") or state.chunks,
+    }
+    for key in ("prompt_eval_count", "prompt_eval_duration", "eval_duration", "total_duration"):
+        if last.get(key) is not None:
+            response[key] = last[key]
+    return response
+
+
+def stream_json_chat(model: str, messages: List[Dict[str, Any]], schema: Dict[str, Any],
+                     num_predict: Optional[int] = None, on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     client: Any = None) -> Dict[str, Any]:
+    """
+    Streams a chat request in Ollama's JSON mode and stops generation (by closing the
+    stream) as soon as a complete object matching `schema` has arrived. `num_predict`
+    caps the tokens generated; `on_partial` is called with the fields parsed so far
+    each time another one completes.
+
+    Returns a response dict like a non-streaming ollama.chat call, whose message
+    content is the validated JSON object. Raises ValueError if the output holds none.
+    Uses the shared client (llm_client.get_llm_client) unless `client` is given.
+    """
+    state = _StreamState(IncrementalJSONParser(schema), on_partial)
+    options = {"num_predict": num_predict} if num_predict else None
+    client = client or get_llm_client()
+    stream = client.chat(model=model, messages=messages, stream=True, format="json", options=options,
+                         keep_alive=keep_alive())
+    try:
+        for part in stream:
+            if state.feed(part):
+                break
+    finally:
+        stream.close()
+    return _json_response(model, state)
+
+
+async def astream_json_chat(model: str, messages: List[Dict[str, Any]], schema: Dict[str, Any],
+                            client: Any, num_predict: Optional[int] = None,
+                            on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Async variant of stream_json_chat for an ollama.AsyncClient."""
+    state = _StreamState(IncrementalJSONParser(schema), on_partial)
+    options = {"num_predict": num_predict} if num_predict else None
+    stream = await client.chat(model=model, messages=messages, stream=True, format="json", options=options,
+                               keep_alive=keep_alive())
+    try:
+        async for part in stream:
+            if state.feed(part):
+                break
+    finally:
+        await stream.aclose()
+    return _json_response(model, state)
@@ -0,0 +1,325 @@
+import json
+import mmap
+import os
+import re
+import threading
+from array import array
+from typing import List, Dict, Tuple, Iterable, Optional
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[-/.][a-z0-9]+)*')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens that keep drilling notation intact ("13-3/8", "1.2", "lot"),
+    plus the dash-separated parts of compound tokens so "13-3/8" also matches "13 3/8".
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if "-" in token:
+            tokens.extend(part for part in token.split("-") if part)
+    return tokens
+
+
+class _Segment:
+    """
+    One immutable on-disk segment: a term dictionary (term -> [offset, count] in JSON)
+    and a postings file of little-endian uint32 (doc_index, term_frequency) pairs that
+    is memory-mapped rather than read into memory.
+    """
+    def __init__(self, terms_path: str, postings_path: str):
+        with open(terms_path, 'r') as f:
+            self.terms: Dict[str, List[int]] = json.load(f)
+        self.postings_path = postings_path
+        self._file = open(postings_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def postings(self, term: str) -> memoryview:
+        entry = self.terms.get(term)
+        if entry is None or self._mmap is None:
+            return memoryview(b"").cast("I")
+        offset, count = entry
+        return memoryview(self._mmap)[offset * 8:(offset + count) * 8].cast("I")
+
+    def posting_array(self, term: str) -> np.ndarray:
+        """The term's postings as an (n, 2) array of (doc_index, term_frequency), copied out of the mmap."""
+        return np.frombuffer(self.postings(term), dtype=np.uint32).reshape(-1, 2).copy()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+class BM25Index:
+    """
+    BM25 inverted index kept next to the Chroma collection, for keyword-heavy lookups
+    ("13-3/8", "LOT", "kick", formation names) that embeddings match poorly.
+
+    Layout of the index directory:
+        docs.ids      chunk ids, one per line, in doc-index order (appended to)
+        docs.len      uint32 token count per doc (appended to)
+        deleted.json  doc indexes of removed or replaced chunks
+        seg_N.terms / seg_N.post   immutable segments (see _Segment)
+
+    Additions are buffered in memory and written as a new segment by save(); segments
+    are merged once there are more than MAX_SEGMENTS. The merge also compacts the doc
+    table: deleted docs are dropped and the live ones renumbered, so docs.ids, docs.len
+    and deleted.json do not grow with every replaced chunk.
+
+    Searches score each query term's postings as NumPy arrays, and deleted docs count
+    neither towards a term's document frequency nor in the results.
+    """
+    MAX_SEGMENTS = 8
+
+    def __init__(self, directory: str, k1: float = 1.2, b: float = 0.75):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        self._recover_compaction()
+        self.ids: List[str] = []
+        self.lengths = array("I")
+        self.deleted = set()
+        self.segments: List[_Segment] = []
+        self._pending: Dict[str, List[Tuple[int, int]]] = {}
+        self._saved_docs = 0
+
+        if os.path.exists(self._path("docs.ids")):
+            with open(self._path("docs.ids"), 'r') as f:
+                self.ids = f.read().split("\n")[:-1]
+            with open(self._path("docs.len"), 'rb') as f:
+                self.lengths.frombytes(f.read())
+        if os.path.exists(self._path("deleted.json")):
+            with open(self._path("deleted.json"), 'r') as f:
+                self.deleted = set(json.load(f))
+        for number in sorted(self._segment_numbers()):
+            self.segments.append(_Segment(self._path(f"seg_{number}.terms"), self._path(f"seg_{number}.post")))
+
+        self._saved_docs = len(self.ids)
+        self.id_to_index = {doc_id: index for index, doc_id in enumerate(self.ids) if index not in self.deleted}
+        self.total_length = sum(self.lengths[i] for i in self.id_to_index.values())
+        # (lengths, live mask) arrays for scoring, rebuilt after the doc table changes.
+        self._doc_arrays = None
+
+    def _segment_numbers(self) -> List[int]:
+        return [int(name[4:-6]) for name in os.listdir(self.directory)
+                if name.startswith("seg_") and name.endswith(".terms")]
+
+    def __len__(self) -> int:
+        return len(self.id_to_index)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.id_to_index
+
+    def add(self, ids: Iterable[str], texts: Iterable[str]):
+        """Indexes chunks; a chunk id that is already indexed is replaced."""
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                self._remove(doc_id)
+                tokens = tokenize(text)
+                index = len(self.ids)
+                self.ids.append(doc_id)
+                self.lengths.append(len(tokens))
+                self._doc_arrays = None
+                self.id_to_index[doc_id] = index
+                self.total_length += len(tokens)
+
+                frequencies: Dict[str, int] = {}
+                for token in tokens:
+                    frequencies[token] = frequencies.get(token, 0) + 1
+                for token, frequency in frequencies.items():
+                    self._pending.setdefault(token, []).append((index, frequency))
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        index = self.id_to_index.pop(doc_id, None)
+        if index is not None:
+            self.deleted.add(index)
+            self.total_length -= self.lengths[index]
+            self._doc_arrays = None
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._doc_arrays is None:
+            lengths = np.array(self.lengths, dtype=np.float64)
+            live = np.ones(len(self.ids), dtype=bool)
+            if self.deleted:
+                live[np.fromiter(self.deleted, dtype=np.int64, count=len(self.deleted))] = False
+            self._doc_arrays = (lengths, live)
+        return self._doc_arrays
+
+    def search(self, query: str, k: int = 10, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Returns the top-k (chunk id, BM25 score) pairs for the query. With `allowed`, only
+        those chunk ids are ranked (e.g. the chunks matching a metadata filter); term
+        statistics still cover the whole index.
+        """
+        with self._lock:
+            live_docs = len(self.id_to_index)
+            if not live_docs or k <= 0:
+                return []
+            average_length = self.total_length / live_docs
+            lengths, live = self._arrays()
+            candidates = None
+            if allowed is not None:
+                candidates = np.zeros(len(self.ids), dtype=bool)
+                candidates[np.fromiter((self.id_to_index[doc_id] for doc_id in allowed if doc_id in self.id_to_index),
+                                       dtype=np.int64)] = True
+            matched_docs, matched_scores = [], []
+
+            for term in set(tokenize(query)):
+                postings = [segment.posting_array(term) for segment in self.segments]
+                postings.append(np.array(self._pending.get(term, []), dtype=np.uint32).reshape(-1, 2))
+                postings = np.concatenate(postings)
+                postings = postings[live[postings[:, 0]]]
+                document_frequency = len(postings)
+                if not document_frequency:
+                    continue
+                idf = np.log(1 + (live_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+                if candidates is not None:
+                    postings = postings[candidates[postings[:, 0]]]
+                docs, frequencies = postings[:, 0], postings[:, 1].astype(np.float64)
+                norm = self.k1 * (1 - self.b + self.b * lengths[docs] / average_length)
+                matched_docs.append(docs)
+                matched_scores.append(idf * frequencies * (self.k1 + 1) / (frequencies + norm))
+
+            if not matched_docs:
+                return []
+            docs, positions = np.unique(np.concatenate(matched_docs), return_inverse=True)
+            scores = np.bincount(positions, weights=np.concatenate(matched_scores))
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self.ids[docs[i]], float(scores[i])) for i in top]
+
+    def save(self):
+        """Writes buffered additions as a new segment and persists the doc table."""
+        with self._lock:
+            # The doc table goes first, so a segment never references unknown docs.
+            with open(self._path("docs.ids"), 'a') as f:
+                f.write("".join(doc_id + "\n" for doc_id in self.ids[self._saved_docs:]))
+            with open(self._path("docs.len"), 'ab') as f:
+                f.write(self.lengths[self._saved_docs:].tobytes())
+            self._saved_docs = len(self.ids)
+            self._write_json("deleted.json", sorted(self.deleted))
+
+            if self._pending:
+                numbers = self._segment_numbers()
+                number = max(numbers) + 1 if numbers else 0
+                self._write_segment(number, self._pending)
+                self.segments.append(_Segment(self._path(f"seg_{number}.terms"), self._path(f"seg_{number}.post")))
+                self._pending = {}
+
+            if len(self.segments) > self.MAX_SEGMENTS:
+                self._merge_segments()
+
+    def _write_segment(self, number: int, postings: Dict[str, List[Tuple[int, int]]], terms_suffix: str = ""):
+        terms = {}
+        data = array("I")
+        for term in sorted(postings):
+            terms[term] = [len(data) // 2, len(postings[term])]
+            for index, frequency in postings[term]:
+                data.append(index)
+                data.append(frequency)
+        with open(self._path(f"seg_{number}.post"), 'wb') as f:
+            f.write(data.tobytes())
+        # The term dictionary is written last: a segment without one is ignored.
+        self._write_json(f"seg_{number}.terms{terms_suffix}", terms)
+
+    def _write_json(self, name: str, value):
+        tmp_path = self._path(name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, self._path(name))
+
+    def _merge_segments(self):
+        """
+        Merges all segments into one and compacts the doc table: postings and docs of
+        deleted chunks are dropped and the live docs renumbered in order.
+
+        The new segment and doc table are written under .compact names first; writing
+        compaction.json is the commit point, after which _finish_compaction swaps them
+        in. An interrupted swap is finished by the next _load.
+        """
+        live = [index for index in range(len(self.ids)) if index not in self.deleted]
+        renumbered = np.full(len(self.ids), -1, dtype=np.int64)
+        renumbered[live] = np.arange(len(live))
+
+        merged: Dict[str, List[Tuple[int, int]]] = {}
+        for segment in self.segments:
+            for term in segment.terms:
+                postings = segment.posting_array(term)
+                new_indexes = renumbered[postings[:, 0]]
+                kept = new_indexes >= 0
+                merged.setdefault(term, []).extend(zip(new_indexes[kept].tolist(), postings[kept, 1].tolist()))
+
+        old_numbers = self._segment_numbers()
+        number = max(old_numbers) + 1
+        ids = [self.ids[index] for index in live]
+        lengths = array("I", (self.lengths[index] for index in live))
+        self._write_segment(number, merged, terms_suffix=".compact")
+        with open(self._path("docs.ids.compact"), 'w') as f:
+            f.write("".join(doc_id + "\n" for doc_id in ids))
+        with open(self._path("docs.len.compact"), 'wb') as f:
+            f.write(lengths.tobytes())
+        self._write_json("compaction.json", {"segment": number, "replaces": old_numbers})
+
+        for segment in self.segments:
+            segment.close()
+        self._finish_compaction()
+
+        self.ids, self.lengths, self.deleted = ids, lengths, set()
+        self._saved_docs = len(ids)
+        self.id_to_index = {doc_id: index for index, doc_id in enumerate(ids)}
+        self._doc_arrays = None
+        self.segments = [_Segment(self._path(f"seg_{number}.terms"), self._path(f"seg_{number}.post"))]
+
+    def _finish_compaction(self):
+        """Swaps in the segment and doc table of a committed compaction (see _merge_segments)."""
+        with open(self._path("compaction.json"), 'r') as f:
+            compaction = json.load(f)
+        for old in compaction["replaces"]:
+            for name in (f"seg_{old}.terms", f"seg_{old}.post"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+        for name in ("docs.ids", "docs.len", f"seg_{compaction['segment']}.terms"):
+            if os.path.exists(self._path(name + ".compact")):
+                os.replace(self._path(name + ".compact"), self._path(name))
+        self._write_json("deleted.json", [])
+        os.remove(self._path("compaction.json"))
+
+    def _recover_compaction(self):
+        if os.path.exists(self._path("compaction.json")):
+            self._finish_compaction()
+            return
+        # Files of a compaction interrupted before its commit point.
+        for name in os.listdir(self.directory):
+            if name.endswith(".compact"):
+                os.remove(self._path(name))
+
+    def clear(self):
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
+            for name in os.listdir(self.directory):
+                os.remove(self._path(name))
+            self._load()
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
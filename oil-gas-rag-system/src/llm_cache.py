@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from .config import load_config
+from .instrumentation import timer, count, record_llm_response
+
+def response_to_dict(response: Any) -> Dict[str, Any]:
+    """Converts an ollama response (dict or pydantic model) into a JSON-serialisable dict."""
+    if hasattr(response, "model_dump"):
+        return response.model_dump(mode="json")
+    return dict(response)
+
+
+def _prompt_chars(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(message.get("content", "")) for message in messages)
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM responses stored in SQLite.
+
+    Entries are keyed by model name, prompt hash and generation options, so any change
+    to a prompt (or to the model or options) is a miss, while re-running the pipeline
+    with unchanged prompts makes no LLM calls at all. Entries older than `max_age_days`
+    are dropped, and the least recently used ones are evicted once the cache exceeds
+    `max_entries` or `max_size_mb`.
+    """
+    # Eviction runs every this many writes rather than on each one.
+    EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int = 50000, max_size_mb: float = 512,
+                 max_age_days: float = 90):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.commit()
+        self.evict()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LLMCache":
+        return cls(
+            path=config.get("llm_cache_path", "./llm_cache.sqlite"),
+            max_entries=config.get("llm_cache_max_entries", 50000),
+            max_size_mb=config.get("llm_cache_max_size_mb", 512),
+            max_age_days=config.get("llm_cache_max_age_days", 90)
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None) -> str:
+        prompt_hash = hashlib.sha256(
+            json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        options_json = json.dumps(options or {}, sort_keys=True)
+        return hashlib.sha256(f"{model}\0{prompt_hash}\0{options_json}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, model: str, response: Dict[str, Any]):
+        payload = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, payload, len(payload), now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            evict = self._writes % self.EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def chat(self, model: str, messages: List[Dict[str, Any]], call: Callable[[], Any],
+             options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Returns the cached response for this request, or runs `call` (the actual
+        ollama.chat request) and caches its response.
+        """
+        key = self.make_key(model, messages, options)
+        cached = self.get(key)
+        if cached is not None:
+            count("llm_cache_hits")
+            return cached
+
+        with timer("llm"):
+            response = response_to_dict(call())
+        record_llm_response(response, _prompt_chars(messages))
+        self.put(key, model, response)
+        return response
+
+    async def achat(self, model: str, messages: List[Dict[str, Any]], call: Callable[[], Awaitable[Any]],
+                    options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of chat: `call` returns an awaitable LLM request."""
+        key = self.make_key(model, messages, options)
+        cached = self.get(key)
+        if cached is not None:
+            count("llm_cache_hits")
+            return cached
+
+        with timer("llm"):
+            response = response_to_dict(await call())
+        record_llm_response(response, _prompt_chars(messages))
+        self.put(key, model, response)
+        return response
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until within the limits."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.max_age_seconds,))
+            entries, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+            if entries > self.max_entries or total_size > self.max_size_bytes:
+                # Walk from the most recently used entry and keep as many as fit.
+                kept, kept_size, cutoff = 0, 0, None
+                for last_access, size in self._conn.execute(
+                    "SELECT last_access, size FROM responses ORDER BY last_access DESC"
+                ):
+                    if kept + 1 > self.max_entries or kept_size + size > self.max_size_bytes:
+                        cutoff = last_access
+                        break
+                    kept += 1
+                    kept_size += size
+                if cutoff is not None:
+                    self._conn.execute("DELETE FROM responses WHERE last_access <= ?", (cutoff,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "size_bytes": total_size}
+
+    def clear(self):
+        """Drops all entries (useful for testing and benchmarks)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+_default_cache: Optional[LLMCache] = None
+
+def get_default_cache(config_path: str = "config.yaml") -> LLMCache:
+    """Returns the process-wide cache shared by all extractors, created from the config on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCache.from_config(load_config(config_path))
+    return _default_cache
@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import httpx
+import ollama
+
+from .instrumentation import timer
+
+# Settings of the shared Ollama client (see configure_llm_client).
+_settings: Dict[str, Any] = {
+    "host": None,           # None: OLLAMA_HOST or Ollama's default
+    "model": "llama3.1",
+    "keep_alive": "30m",    # how long Ollama keeps the model loaded after a request
+    "pool_size": 4,         # pooled keep-alive HTTP connections
+}
+
+_client: Optional[ollama.Client] = None
+_lock = threading.Lock()
+
+
+def configure_llm_client(config: Optional[Dict[str, Any]] = None, **overrides):
+    """
+    Sets the Ollama host, default model, keep_alive and connection pool size from the
+    config (`ollama_url`, `llm_model`, `llm_keep_alive`, `llm_pool_size`) and/or keyword
+    overrides. The shared client is recreated on next use if any setting changed.
+    """
+    global _client
+    config = config or {}
+    updates = dict(overrides)
+    for key, setting in (("ollama_url", "host"), ("llm_model", "model"),
+                         ("llm_keep_alive", "keep_alive"), ("llm_pool_size", "pool_size")):
+        if config.get(key) is not None and setting not in updates:
+            updates[setting] = config[key]
+    with _lock:
+        if any(_settings.get(key) != value for key, value in updates.items()):
+            _settings.update(updates)
+            _client = None
+
+
+def default_model() -> str:
+    """The configured model (`llm_model`), used by every extractor not given one explicitly."""
+    return _settings["model"]
+
+
+def keep_alive() -> Any:
+    return _settings["keep_alive"]
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=_settings["pool_size"],
+                        max_keepalive_connections=_settings["pool_size"], keepalive_expiry=300)
+
+
+def get_llm_client() -> ollama.Client:
+    """
+    The process-wide Ollama client. Its HTTP connections are pooled and kept alive, so
+    only the first request of the process pays for connection setup.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = ollama.Client(host=_settings["host"], limits=_limits())
+        return _client
+
+
+def make_async_client(host: Optional[str] = None) -> ollama.AsyncClient:
+    """An AsyncClient with the same settings (one is needed per event loop)."""
+    return ollama.AsyncClient(host=host or _settings["host"], limits=_limits())
+
+
+def chat(model: str, messages: List[Dict[str, Any]], **kwargs):
+    """ollama.chat through the shared client, keeping the model loaded between reports."""
+    kwargs.setdefault("keep_alive", keep_alive())
+    return get_llm_client().chat(model=model, messages=messages, **kwargs)
+
+
+def warm_up(model: Optional[str] = None, background: bool = False) -> Optional[threading.Thread]:
+    """
+    Loads the model into Ollama's memory (a chat request without messages) so the first
+    report does not pay the model load time. With `background`, the request runs in a
+    daemon thread, overlapping with PDF parsing, and the thread is returned.
+    """
+    model = model or default_model()
+
+    def load():
+        start = time.perf_counter()
+        try:
+            with timer("llm_warm_up"):
+                chat(model, [])
+            print(f"LLM {model} loaded in {time.perf_counter() - start:.1f}s.")
+        except Exception as e:
+            print(f"LLM warm-up failed: {e!r}")
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, name="llm-warm-up", daemon=True)
+    thread.start()
+    return thread
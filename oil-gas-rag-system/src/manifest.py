@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional
+
+
+def report_path(file_path: str) -> str:
+    """
+    The one spelling of a report's path (absolute and normalised) that its manifest
+    entry, chunk ids and 'source' metadata use. Entry points apply it once, so
+    "data/a.pdf" and "./data/../data/a.pdf" are the same report.
+    """
+    return os.path.abspath(file_path)
+
+
+class IngestManifest:
+    """
+    Sidecar record of the reports already stored in the database: their content hash,
+    size and modification time. It lets re-ingestion skip unchanged reports without
+    opening them (size and mtime match) or after a single hash pass (file was touched
+    but its content is the same).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """SHA-256 of the file content, read in blocks."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return report_path(file_path)
+
+    def is_unchanged(self, file_path: str) -> bool:
+        """
+        Returns True if the report was already ingested and has not changed since.
+        Only stats the file unless its size or mtime differ from the recorded ones.
+        """
+        entry = self.entries.get(self._key(file_path))
+        if entry is None:
+            return False
+
+        stat = os.stat(file_path)
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if entry["size"] != stat.st_size:
+            return False
+
+        # Touched but possibly identical: compare content hashes.
+        if self.file_hash(file_path) == entry["sha256"]:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def record(self, file_path: str, file_hash: Optional[str] = None):
+        """Marks the report as ingested at its current content."""
+        stat = os.stat(file_path)
+        self.entries[self._key(file_path)] = {
+            "sha256": file_hash or self.file_hash(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+
+    def clear(self):
+        """Forgets every report and saves, so all of them are ingested again."""
+        self.entries = {}
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
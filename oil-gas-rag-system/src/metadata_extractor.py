@@ -1,30 +1,140 @@
 import re
 import json
-import ollama
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from .async_llm import bounded_json_chat
+from .context_packer import ContextPacker, HEADER_TERMS
+from .header_patterns import extract_header_fields
+from .json_stream import stream_json_chat, HEADER_SCHEMA
+from .llm_cache import LLMCache, get_default_cache
+from .llm_client import default_model
 
 class MetadataExtractor:
-    def __init__(self, model: str = "llama3.1"):
-        self.model = model
+    # Fields the LLM is asked for when the patterns do not find them confidently.
+    LLM_FIELDS = ("well_name", "operator")
+    # Confidence given to values returned by the LLM.
+    LLM_CONFIDENCE = 0.6
+
+    def __init__(self, model: Optional[str] = None, cache: Optional[LLMCache] = None,
+                 min_confidence: float = 0.8, raise_errors: bool = False, context_tokens: int = 750,
+                 num_predict: int = 128):
+        self.model = model or default_model()
+        self.cache = cache or get_default_cache()
+        self.min_confidence = min_confidence
+        # The prompt gets the header lines most likely to name the well and operator.
+        self.packer = ContextPacker(HEADER_TERMS, context_tokens)
+        # Cap on generated tokens; the streamed answer is cut as soon as it is complete anyway.
+        self.num_predict = num_predict
+        # Re-raise LLM failures instead of falling back (the job runner retries them).
+        self.raise_errors = raise_errors
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs) -> "MetadataExtractor":
+        kwargs.setdefault("model", config.get("llm_model"))
+        return cls(context_tokens=config.get("header_context_tokens", 750),
+                   num_predict=config.get("header_num_predict", 128), **kwargs)
 
     def extract_header(self, header_text: str) -> Dict[str, Any]:
         """
-        Extracts well header information (Well Name, Operator) using Llama 3.1
-        and dates using Regex.
+        Extracts well header information. Labelled fields (Well Name, Operator, Rig,
+        Field, Licence, Spud Date) are read with compiled patterns first; Llama 3.1 is
+        only asked for Well Name / Operator when they are missing or low-confidence.
         
         Args:
             header_text (str): The text content from the first few pages of the PDF.
         
         Returns:
-            Dict[str, Any]: A dictionary containing well_name, operator, and spud_date.
+            Dict[str, Any]: A dictionary containing well_name, operator, and spud_date,
+                rig, field and licence where present, and a field_confidence score per field.
         """
+        fields = extract_header_fields(header_text)
+        llm_values = {}
+
+        if self._needs_llm(fields):
+            messages = self._header_messages(header_text)
+            try:
+                response = self.cache.chat(
+                    self.model, messages,
+                    lambda: stream_json_chat(self.model, messages, HEADER_SCHEMA, num_predict=self.num_predict),
+                    options=self._llm_options()
+                )
+                llm_values = dict(zip(self.LLM_FIELDS, self._parse_header_response(response)))
+            except Exception as e:
+                if self.raise_errors:
+                    raise
+                print(f"Error calling Ollama or parsing JSON: {e}")
+
+        return self._build_header(header_text, fields, llm_values)
+
+    async def extract_header_async(self, header_text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async variant of extract_header for the concurrent pipeline. The LLM request is
+        bounded by the global in-flight limit; on timeout or error the same "Unknown"
+        fallback as extract_header is returned.
+        """
+        fields = extract_header_fields(header_text)
+        llm_values = {}
+
+        if self._needs_llm(fields):
+            messages = self._header_messages(header_text)
+            try:
+                response = await self.cache.achat(
+                    self.model, messages,
+                    lambda: bounded_json_chat(self.model, messages, HEADER_SCHEMA,
+                                              num_predict=self.num_predict, timeout=timeout),
+                    options=self._llm_options()
+                )
+                llm_values = dict(zip(self.LLM_FIELDS, self._parse_header_response(response)))
+            except Exception as e:
+                if self.raise_errors:
+                    raise
+                print(f"Error calling Ollama or parsing JSON: {e!r}")
+
+        return self._build_header(header_text, fields, llm_values)
+
+    def _llm_options(self) -> Dict[str, Any]:
+        # Part of the cache key: answers generated under other settings are not reused.
+        return {"format": "json", "num_predict": self.num_predict}
+
+    def _needs_llm(self, fields: Dict[str, Tuple[str, float]]) -> bool:
+        return any(fields.get(field, ("", 0.0))[1] < self.min_confidence for field in self.LLM_FIELDS)
+
+    def _build_header(self, header_text: str, fields: Dict[str, Tuple[str, float]],
+                      llm_values: Dict[str, str]) -> Dict[str, Any]:
+        header: Dict[str, Any] = {}
+        confidence: Dict[str, float] = {}
+
+        for field in self.LLM_FIELDS:
+            value, score = fields.get(field, ("Unknown", 0.0))
+            llm_value = llm_values.get(field, "Unknown")
+            if score < self.min_confidence and llm_value not in (None, "", "Unknown"):
+                value, score = llm_value, self.LLM_CONFIDENCE
+            header[field] = value
+            confidence[field] = score
+
+        spud_date = self._extract_spud_date(header_text)
+        if spud_date:
+            confidence["spud_date"] = 1.0
+        elif "spud_date" in fields:
+            spud_date, confidence["spud_date"] = fields["spud_date"]
+        header["spud_date"] = spud_date
+
+        for field in ("rig", "field", "licence"):
+            if field in fields:
+                header[field], confidence[field] = fields[field]
+
+        header["field_confidence"] = confidence
+        return header
+
+    def _extract_spud_date(self, header_text: str) -> Optional[str]:
         # 1. Regex for Spud Date (Priority: Regex)
         # Patterns: YYYY-MM-DD, DD-MM-YYYY, DD/MM/YYYY
         date_pattern = r'(?i)spud date[:\s]+(\d{4}-\d{2}-\d{2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'
         spud_match = re.search(date_pattern, header_text)
-        spud_date = spud_match.group(1) if spud_match else None
+        return spud_match.group(1) if spud_match else None
 
+    def _header_messages(self, header_text: str) -> List[Dict[str, str]]:
         # 2. LLM for Text Extraction (Well Name, Operator)
         # We use the LLM because these fields are often formatted inconsistently.
         prompt = f"""
@@ -32,37 +142,23 @@ class MetadataExtractor:
         Return ONLY a valid JSON object with keys "operator" and "well_name". Do not add any markdown formatting or explanation.
 
         Text:
-        {header_text[:3000]}
+        {self.packer.pack(header_text)}
         """
+        return [{'role': 'user', 'content': prompt}]
 
-        well_name = "Unknown"
-        operator = "Unknown"
-
-        try:
-            response = ollama.chat(model=self.model, messages=[
-                {'role': 'user', 'content': prompt}
-            ])
-            content = response['message']['content'].strip()
-            
-            # Attempt to parse JSON
-            # Find the first '{' and last '}' to handle potential chatty output
-            start_idx = content.find('{')
-            end_idx = content.rfind('}')
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = content[start_idx:end_idx+1]
-                data = json.loads(json_str)
-                well_name = data.get("well_name", "Unknown")
-                operator = data.get("operator", "Unknown")
-            
-        except Exception as e:
-            print(f"Error calling Ollama or parsing JSON: {e}")
-
-        return {
-            "well_name": well_name,
-            "operator": operator,
-            "spud_date": spud_date
-        }
+    def _parse_header_response(self, response: Dict[str, Any]) -> Tuple[str, str]:
+        content = response['message']['content'].strip()
+        
+        # Attempt to parse JSON
+        # Find the first '{' and last '}' to handle potential chatty output
+        start_idx = content.find('{')
+        end_idx = content.rfind('}')
+        
+        if start_idx != -1 and end_idx != -1:
+            json_str = content[start_idx:end_idx+1]
+            data = json.loads(json_str)
+            return data.get("well_name", "Unknown"), data.get("operator", "Unknown")
+        return "Unknown", "Unknown"
 
     def calculate_duration(self, start_date: str, end_date: str) -> int:
         """
@@ -0,0 +1,296 @@
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, List, Optional, Iterable, Tuple, Callable
+
+from .report_index import section_key
+
+# PyMuPDF is only needed to read a document (build_outline); the heading matchers are
+# also used by the chunker, which should stay cheap to import.
+if TYPE_CHECKING:
+    import fitz
+
+# Numbered headings: "4.0 Geology", "4. Geology", "4 GEOLOGY", "4.2 Casing Design".
+# Section numbers have at most two digits per part, so "1200 Balder Formation" is not one.
+HEADING_PATTERN = re.compile(r'^(\d{1,2}(?:\.\d{1,2})*)\.?\s+([A-Z][A-Za-z&/,\- ]*[A-Za-z])$')
+# Depth and formation lines that look like headings: "12 MD Heather", "15 Brent Group".
+NOT_A_TITLE = re.compile(r'^(m|ft|feet|md|tvd|rkb|mmd|mtvd|ftmd)\b|\b(formation|fm|group|gp|member|mbr)$',
+                         re.IGNORECASE)
+MAX_HEADING_WORDS = 6
+# Lines at least this much larger than the body text are headings even without numbering.
+HEADING_SIZE_RATIO = 1.2
+
+
+class OutlineEntry:
+    """
+    One section of a document: its pages (1-based, inclusive) and the character range
+    within them. `start_char` is the offset of the heading in the first page's text;
+    `end_char` is where the next section starts on the last page (None: end of page).
+    """
+    def __init__(self, title: str, level: int, start_page: int, start_char: int = 0):
+        self.title = title
+        self.key = section_key(title)
+        self.level = level
+        self.start_page = start_page
+        self.start_char = start_char
+        self.end_page = start_page
+        self.end_char: Optional[int] = None
+
+    @property
+    def pages(self) -> List[int]:
+        return list(range(self.start_page, self.end_page + 1))
+
+    def __repr__(self) -> str:
+        return f"OutlineEntry({self.title!r}, level={self.level}, pages={self.start_page}-{self.end_page})"
+
+
+class DocumentOutline:
+    """
+    Map of a document's sections to pages and character ranges, built once per document
+    (see build_outline) so extractors can read only the pages of the section they need.
+    Section names are matched ignoring numbering and case, so "Geology" finds
+    "4.0 Geology" and "4 GEOLOGY".
+    """
+    def __init__(self, entries: List[OutlineEntry], page_count: int, origin: str):
+        self.entries = entries
+        self.page_count = page_count
+        # "toc" (embedded bookmarks), "fonts" or "numbering" (heuristics)
+        self.origin = origin
+        _close_ranges(entries, page_count)
+
+    def find(self, name: str) -> Optional[OutlineEntry]:
+        """The section called `name`: an exact key match first, then the first key starting with it."""
+        key = section_key(name)
+        if not key:
+            return None
+        for entry in self.entries:
+            if entry.key == key:
+                return entry
+        for entry in self.entries:
+            if entry.key.startswith(key + " "):
+                return entry
+        return None
+
+    def pages(self, name: str) -> List[int]:
+        """Pages (1-based) of the section called `name`; empty if there is no such section."""
+        entry = self.find(name)
+        return entry.pages if entry is not None else []
+
+    def section_text(self, name: str, page_text: Callable[[int], str]) -> str:
+        """
+        Text of the section called `name`, reading only its pages through
+        `page_text(page_number)`. Empty if there is no such section.
+        """
+        entry = self.find(name)
+        if entry is None:
+            return ""
+        parts = []
+        for number in entry.pages:
+            text = page_text(number)
+            start = entry.start_char if number == entry.start_page else 0
+            end = entry.end_char if number == entry.end_page else None
+            parts.append(text[start:end])
+        return "".join(part if part.endswith("\n") else part + "\n" for part in parts).strip()
+
+
+def _close_ranges(entries: List[OutlineEntry], page_count: int):
+    """Each section ends where the next section of the same or a higher level starts."""
+    for index, entry in enumerate(entries):
+        entry.end_page, entry.end_char = page_count, None
+        for following in entries[index + 1:]:
+            if following.level <= entry.level:
+                if following.start_char == 0 and following.start_page > entry.start_page:
+                    # Starts at the top of its page: this section ends on the page before.
+                    entry.end_page = following.start_page - 1
+                else:
+                    entry.end_page, entry.end_char = following.start_page, following.start_char
+                break
+
+
+def heading_level(numbering: str) -> int:
+    """"4" and "4.0" are level 1, "4.2" is level 2, "4.2.1" level 3."""
+    parts = numbering.split(".")
+    while len(parts) > 1 and parts[-1].strip("0") == "":
+        parts.pop()
+    return len(parts)
+
+
+def match_heading(line: str) -> Optional[Tuple[str, int]]:
+    """Returns (title, level) if the line is a numbered heading."""
+    line = line.strip()
+    match = HEADING_PATTERN.match(line)
+    if not match or len(match.group(2).split()) > MAX_HEADING_WORDS or NOT_A_TITLE.search(match.group(2)):
+        return None
+    return f"{match.group(1)} {match.group(2)}", heading_level(match.group(1))
+
+
+def _numbering(title: str) -> Tuple[int, ...]:
+    """(4, 2) for "4.2 Casing Design"."""
+    return tuple(int(part) for part in title.split()[0].split("."))
+
+
+class _NumberingSequence:
+    """
+    Section numbers increase through a document; a numbered line that does not follow
+    the previous heading (e.g. "3 Heather" after "4.0 Geology") is body text.
+    """
+    def __init__(self):
+        self.last: Optional[Tuple[int, ...]] = None
+
+    def accept(self, title: str) -> bool:
+        numbering = _numbering(title)
+        if self.last is not None and numbering <= self.last:
+            return False
+        self.last = numbering
+        return True
+
+
+def _line_offsets(text: str) -> Iterable[Tuple[int, str]]:
+    offset = 0
+    for line in text.split("\n"):
+        yield offset, line
+        offset += len(line) + 1
+
+
+class OutlineBuilder:
+    """
+    Builds a document's outline while its pages are parsed in order, so a streaming
+    parse (PDFIngestor.iter_pages) finds the section headings in the same pass. Headings
+    come from the PDF's TOC when it has one, located in the page text; otherwise from
+    the heading numbering (match_heading, numbers increasing through the document).
+    Offsets are those of the text passed to add_page.
+    """
+    def __init__(self, toc: Optional[List[list]] = None):
+        self.entries: List[OutlineEntry] = []
+        self._toc: dict = {}
+        for level, title, page in toc or []:
+            if page >= 1:
+                self._toc.setdefault(page, []).append((level, title.strip()))
+        self.origin = "toc" if self._toc else "numbering"
+        self._sequence = _NumberingSequence()
+
+    def add_page(self, number: int, text: str) -> List[OutlineEntry]:
+        """Finds the headings on the next page (1-based `number`) and returns them in order."""
+        found = []
+        if self._toc:
+            for level, title in self._toc.get(number, []):
+                entry = OutlineEntry(title, level, number)
+                entry.start_char = _locate(text, entry.key)
+                found.append(entry)
+        else:
+            for offset, line in _line_offsets(text):
+                heading = match_heading(line)
+                if heading is not None and self._sequence.accept(heading[0]):
+                    found.append(OutlineEntry(heading[0], heading[1], number,
+                                              offset + len(line) - len(line.lstrip())))
+        self.entries.extend(found)
+        return found
+
+    def outline(self, page_count: int) -> DocumentOutline:
+        return DocumentOutline(self.entries, page_count, self.origin)
+
+
+class SectionPages:
+    """
+    Tells, page by page while a document is parsed in order, whether a page holds part
+    of one of the named sections, by the rule DocumentOutline uses: a section runs from
+    its heading to the next heading of the same or a higher level. Lets a streaming
+    parse keep only the pages an extractor reads.
+    """
+    def __init__(self, names: List[str]):
+        self.keys = [section_key(name) for name in names]
+        self._open_level: Optional[int] = None
+
+    def _matches(self, entry: OutlineEntry) -> bool:
+        return any(key and (entry.key == key or entry.key.startswith(key + " ")) for key in self.keys)
+
+    def accept(self, headings: List[OutlineEntry]) -> bool:
+        """`headings`: the headings found on the page (see OutlineBuilder.add_page)."""
+        inside = self._open_level is not None
+        for entry in headings:
+            if self._matches(entry):
+                if self._open_level is None or entry.level < self._open_level:
+                    self._open_level = entry.level
+                inside = True
+            elif self._open_level is not None and entry.level <= self._open_level:
+                self._open_level = None
+                if entry.start_char == 0:
+                    # Ends at the top of the page: the section ended on the page before.
+                    inside = False
+        return inside
+
+
+def outline_from_pages(pages: Iterable[Tuple[int, str]], page_count: int) -> DocumentOutline:
+    """Numbering heuristic over already extracted (page number, text) pairs."""
+    builder = OutlineBuilder()
+    for number, text in pages:
+        builder.add_page(number, text)
+    return builder.outline(page_count)
+
+
+def outline_from_toc(toc: List[list], page_count: int, page_text: Callable[[int], str]) -> DocumentOutline:
+    """
+    Outline from the PDF's embedded table of contents ([level, title, page] rows).
+    Each heading is located on its page (read through `page_text`) to get its offset.
+    """
+    entries = []
+    for level, title, page in toc:
+        if page < 1:
+            continue
+        entry = OutlineEntry(title.strip(), level, page)
+        entry.start_char = _locate(page_text(page), entry.key)
+        entries.append(entry)
+    return DocumentOutline(entries, page_count, "toc")
+
+
+def _locate(text: str, key: str) -> int:
+    """Offset of the first line of `text` whose section key matches `key`; 0 if none does."""
+    for offset, line in _line_offsets(text):
+        if line.strip() and section_key(line) == key:
+            return offset + len(line) - len(line.lstrip())
+    return 0
+
+
+def _outline_from_fonts(doc: "fitz.Document") -> DocumentOutline:
+    """
+    Heading heuristic for PDFs without a TOC: numbered headings, plus short lines set
+    noticeably larger than the body text. Uses the same text flags as page.get_text(),
+    so offsets are valid in the plain page text.
+    """
+    import fitz  # PyMuPDF
+    pages = []
+    sizes: Counter = Counter()
+    for page in doc:
+        lines = []
+        for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+            for line in block.get("lines", []):
+                text = "".join(span["text"] for span in line["spans"])
+                size = max((span["size"] for span in line["spans"]), default=0)
+                lines.append((text, size))
+                sizes[round(size, 1)] += len(text)
+        pages.append(lines)
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+
+    entries = []
+    sequence = _NumberingSequence()
+    for number, lines in enumerate(pages, start=1):
+        offset = 0
+        for text, size in lines:
+            heading = match_heading(text)
+            if heading is not None and not sequence.accept(heading[0]):
+                heading = None
+            stripped = text.strip()
+            if heading is None and body_size and size >= body_size * HEADING_SIZE_RATIO and stripped[:1].isupper() \
+                    and not stripped.endswith(".") and len(stripped.split()) <= MAX_HEADING_WORDS:
+                heading = (stripped, 1)
+            if heading is not None:
+                entries.append(OutlineEntry(heading[0], heading[1], number, offset + len(text) - len(text.lstrip())))
+            offset += len(text) + 1
+    return DocumentOutline(entries, doc.page_count, "fonts")
+
+
+def build_outline(doc: "fitz.Document") -> DocumentOutline:
+    """Outline from the embedded TOC when the PDF has one, otherwise from font size and numbering."""
+    toc = doc.get_toc(simple=True)
+    if toc:
+        return outline_from_toc(toc, doc.page_count, lambda number: doc[number - 1].get_text())
+    return _outline_from_fonts(doc)
@@ -0,0 +1,122 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+
+def section_key(section: Optional[str]) -> str:
+    """
+    Normalised section name for lookups: numbering and case are ignored, so
+    "4.0 Geology", "4. Geology" and "Geology" share the key "geology".
+    """
+    if not section:
+        return ""
+    name = re.sub(r'^\s*\d+(\.\d+)*\.?\s*', '', section)
+    return re.sub(r'\s+', ' ', name).strip().lower()
+
+
+class ReportIndex:
+    """
+    Sidecar index of the stored chunks by report: source, section and page mapped to
+    chunk ids, in a SQLite table with (source, page) and (source, section) indexes.
+
+    Lookups such as "page 1 of report X" or "Geology section of report X" are B-tree
+    range scans over that one report's rows, so their cost does not depend on how many
+    reports the collection holds.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " chunk_id TEXT PRIMARY KEY,"
+            " source TEXT NOT NULL,"
+            " section TEXT,"
+            " section_key TEXT NOT NULL,"
+            " page INTEGER,"
+            " chunk_index INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS chunks_by_page ON chunks (source, page, chunk_index);"
+            "CREATE INDEX IF NOT EXISTS chunks_by_section ON chunks (source, section_key, page, chunk_index);"
+        )
+        self._conn.commit()
+
+    def add(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Indexes chunks by their metadata; chunks without a source are skipped."""
+        rows = [
+            (
+                doc_id,
+                metadata["source"],
+                metadata.get("section"),
+                section_key(metadata.get("section")),
+                metadata.get("page") if isinstance(metadata.get("page"), int) else None,
+                metadata.get("chunk_index", 0)
+            )
+            for doc_id, metadata in zip(ids, metadatas)
+            if metadata.get("source")
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, source, section, section_key, page, chunk_index)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(doc_id,) for doc_id in ids])
+            self._conn.commit()
+
+    def has_source(self, source: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM chunks WHERE source = ? LIMIT 1", (source,)).fetchone()
+        return row is not None
+
+    def lookup(self, source: str, page: Optional[int] = None, section: Optional[str] = None,
+               limit: Optional[int] = None) -> List[str]:
+        """
+        Returns the chunk ids of one report, in page and reading order.
+
+        Args:
+            source: The report (chunk metadata 'source').
+            page: Only chunks of this page (1-based).
+            section: Only chunks of this section, matched by section_key.
+            limit: Maximum number of ids.
+        """
+        query = "SELECT chunk_id FROM chunks WHERE source = ?"
+        params: List[Any] = [source]
+        if page is not None:
+            query += " AND page = ?"
+            params.append(page)
+        if section is not None:
+            query += " AND section_key = ?"
+            params.append(section_key(section))
+        query += " ORDER BY page, chunk_index"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def sections(self, source: str) -> List[Tuple[str, int, int]]:
+        """Returns (section, first page, last page) of each section of a report, in page order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT MIN(section), MIN(page), MAX(page) FROM chunks WHERE source = ?"
+                " GROUP BY section_key ORDER BY MIN(page)",
+                (source,)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
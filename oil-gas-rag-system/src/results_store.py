@@ -0,0 +1,276 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .table_parser import parse_quantity, parse_size_inches, NUMBER_PATTERN
+
+# Columns of each table and their NumPy dtype in query results. Numeric columns are
+# stored in canonical units: depth in metres, casing size in inches, casing weight in
+# lb/ft, mud density in sg.
+WELL_COLUMNS: List[Tuple[str, str, Any]] = [
+    ("well_id", "INTEGER PRIMARY KEY", np.int64),
+    ("report", "TEXT NOT NULL UNIQUE", object),
+    ("well_name", "TEXT", object),
+    ("operator", "TEXT", object),
+    ("rig", "TEXT", object),
+    ("field", "TEXT", object),
+    ("licence", "TEXT", object),
+    ("spud_date", "TEXT", object),
+    ("duration_days", "INTEGER", np.float64),
+    ("mud_weight_sg", "REAL", np.float64),
+    ("gas_peak_percent", "REAL", np.float64),
+    ("issues", "TEXT", object),
+]
+CASING_COLUMNS: List[Tuple[str, str, Any]] = [
+    ("well_id", "INTEGER NOT NULL", np.int64),
+    ("size_in", "REAL", np.float64),
+    ("depth_m", "REAL", np.float64),
+    ("weight_lbft", "REAL", np.float64),
+]
+MUD_COLUMNS: List[Tuple[str, str, Any]] = [
+    ("well_id", "INTEGER NOT NULL", np.int64),
+    ("mud_type", "TEXT", object),
+    ("density_sg", "REAL", np.float64),
+]
+TABLES = {"wells": WELL_COLUMNS, "casing": CASING_COLUMNS, "mud": MUD_COLUMNS}
+
+# Casing sizes are stored rounded to this many decimals, so 9.625 and 9 5/8" compare equal.
+SIZE_DECIMALS = 3
+
+
+def normalise_well_data(well_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[tuple], List[tuple]]:
+    """
+    Flattens one process_well_report result into a wells row and its casing and mud
+    rows (without well_id), with numeric values in canonical units (None where a value
+    is missing or cannot be read).
+
+    Depths, weights and densities must be unit-normalised: numbers in canonical units,
+    as TechSpecsExtractor.parse_specs returns them, or text naming its unit ("4500 ft").
+    Bare numeric text is stored as None, since its unit is unknown.
+    """
+    header = well_data.get("header") or {}
+    specs = well_data.get("specs") or {}
+    geology = well_data.get("geology") or {}
+
+    casing = []
+    for entry in specs.get("casing_data") or []:
+        size = entry.get("size")
+        size_in = float(size) if isinstance(size, (int, float)) else parse_size_inches(str(size or ""))
+        casing.append((round(size_in, SIZE_DECIMALS) if size_in is not None else None,
+                       parse_quantity(entry.get("depth"), "depth"),
+                       parse_quantity(entry.get("weight"), "weight")))
+    mud = [(entry.get("type"), parse_quantity(entry.get("density"), "density"))
+           for entry in specs.get("mud_data") or []]
+    densities = [density for _, density in mud if density is not None]
+
+    gas_peak = geology.get("gas_peak")
+    if isinstance(geology.get("gas_log"), dict):
+        gas_peak = geology["gas_log"].get("percent")
+    gas_match = NUMBER_PATTERN.search(str(gas_peak)) if gas_peak is not None else None
+
+    duration = header.get("duration_days")
+    well = {
+        "well_name": _text(header.get("well_name")),
+        "operator": _text(header.get("operator")),
+        "rig": _text(header.get("rig")),
+        "field": _text(header.get("field")),
+        "licence": _text(header.get("licence")),
+        "spud_date": _text(header.get("spud_date")),
+        "duration_days": int(duration) if isinstance(duration, (int, float)) else None,
+        "mud_weight_sg": max(densities) if densities else None,
+        "gas_peak_percent": float(gas_match.group(0)) if gas_match else None,
+        "issues": json.dumps(geology.get("issues") or []),
+    }
+    return well, casing, mud
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value in (None, "", "Unknown") else str(value)
+
+
+class ResultsStore:
+    """
+    Columnar store of extracted well data for cross-well queries, in SQLite with one
+    typed, indexed table per record type: 'wells' (header and geology fields), 'casing'
+    and 'mud' (one row per string or mud system, linked by well_id).
+
+    Writes are buffered and appended in batches of `batch_size` reports. A report that
+    is added again replaces its earlier rows. Queries return a dict of NumPy arrays,
+    one per column, e.g. store.casing(size='9 5/8"', min_depth=3000)["depth_m"].
+    """
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for table, columns in TABLES.items():
+            definition = ", ".join(f"{name} {sql_type}" for name, sql_type, _ in columns)
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+        # Covers the size/depth queries, so they never read the table itself.
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_casing_size_depth ON casing(size_in, depth_m, well_id, weight_lbft)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_casing_well ON casing(well_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_mud_density ON mud(density_sg)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_mud_well ON mud(well_id)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ResultsStore"]:
+        """The configured store, or None if `results_db_path` is empty."""
+        path = config.get("results_db_path", "./well_results.sqlite")
+        if not path:
+            return None
+        return cls(path, batch_size=config.get("results_batch_size", 500))
+
+    def add(self, report: str, well_data: Dict[str, Any]):
+        """Queues a report's result; the queue is written once it holds `batch_size` reports."""
+        for section in ("header", "specs", "geology"):
+            if not isinstance(well_data.get(section) or {}, dict):
+                raise ValueError(f"{report}: well_data['{section}'] must be a dict, "
+                                 f"not {type(well_data[section]).__name__}")
+        with self._lock:
+            self._pending[report] = well_data
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Writes the queued results in a single transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            rows = [(report, *normalise_well_data(well_data)) for report, well_data in pending.items()]
+            with self._conn:
+                self._delete(list(pending))
+                well_names = [name for name, _, _ in WELL_COLUMNS[1:]]
+                self._conn.executemany(
+                    f"INSERT INTO wells ({', '.join(well_names)}) VALUES ({', '.join('?' * len(well_names))})",
+                    [(report, *(well[name] for name in well_names[1:])) for report, well, _, _ in rows]
+                )
+                well_ids = self._well_ids([report for report, _, _, _ in rows])
+                self._conn.executemany(
+                    "INSERT INTO casing (well_id, size_in, depth_m, weight_lbft) VALUES (?, ?, ?, ?)",
+                    [(well_ids[report], *entry) for report, _, casing, _ in rows for entry in casing]
+                )
+                self._conn.executemany(
+                    "INSERT INTO mud (well_id, mud_type, density_sg) VALUES (?, ?, ?)",
+                    [(well_ids[report], *entry) for report, _, _, mud in rows for entry in mud]
+                )
+
+    def _well_ids(self, reports: List[str]) -> Dict[str, int]:
+        ids = {}
+        # Stay below SQLite's limit on host parameters.
+        for start in range(0, len(reports), 900):
+            batch = reports[start:start + 900]
+            ids.update(self._conn.execute(
+                f"SELECT report, well_id FROM wells WHERE report IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall())
+        return ids
+
+    def _delete(self, reports: List[str]):
+        for well_id in self._well_ids(reports).values():
+            self._conn.execute("DELETE FROM casing WHERE well_id = ?", (well_id,))
+            self._conn.execute("DELETE FROM mud WHERE well_id = ?", (well_id,))
+            self._conn.execute("DELETE FROM wells WHERE well_id = ?", (well_id,))
+
+    def remove(self, reports: List[str]):
+        with self._lock:
+            for report in reports:
+                self._pending.pop(report, None)
+            with self._conn:
+                self._delete(list(reports))
+
+    def query(self, sql: str, params: Sequence[Any] = (),
+              dtypes: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Runs a read-only SQL query and returns its result column by column as NumPy
+        arrays. Columns named in `dtypes` get that dtype, known store columns get
+        theirs (NULL becomes NaN in float columns) and the rest are object arrays.
+        """
+        self.flush()
+        known = {name: dtype for columns in TABLES.values() for name, _, dtype in columns}
+        known.update(dtypes or {})
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            rows = cursor.fetchall()
+            names = [description[0] for description in cursor.description]
+
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        result = {}
+        for name, values in zip(names, columns):
+            dtype = known.get(name, object)
+            if dtype is np.float64:
+                values = [np.nan if value is None else value for value in values]
+            result[name] = np.array(values, dtype=dtype)
+        return result
+
+    def casing(self, size: Union[str, float, None] = None, min_depth: Optional[float] = None,
+               max_depth: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Casing strings across all wells, optionally of one size (e.g. '9 5/8"' or 9.625)
+        and within a depth range in metres, ordered by size and depth. Columns:
+        well_id, well_name, size_in, depth_m, weight_lbft.
+        """
+        conditions, params = [], []
+        if size is not None:
+            size_in = float(size) if isinstance(size, (int, float)) else parse_size_inches(size)
+            if size_in is None:
+                raise ValueError(f"Unrecognised casing size: {size!r}")
+            conditions.append("c.size_in = ?")
+            params.append(round(size_in, SIZE_DECIMALS))
+        if min_depth is not None:
+            conditions.append("c.depth_m >= ?")
+            params.append(min_depth)
+        if max_depth is not None:
+            conditions.append("c.depth_m <= ?")
+            params.append(max_depth)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(
+            "SELECT c.well_id, w.well_name, c.size_in, c.depth_m, c.weight_lbft "
+            f"FROM casing c JOIN wells w ON w.well_id = c.well_id {where} ORDER BY c.size_in, c.depth_m",
+            params
+        )
+
+    def mud(self, min_density: Optional[float] = None, max_density: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Mud systems across all wells, optionally within a density range in sg."""
+        conditions, params = [], []
+        if min_density is not None:
+            conditions.append("m.density_sg >= ?")
+            params.append(min_density)
+        if max_density is not None:
+            conditions.append("m.density_sg <= ?")
+            params.append(max_density)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(
+            "SELECT m.well_id, w.well_name, m.mud_type, m.density_sg "
+            f"FROM mud m JOIN wells w ON w.well_id = m.well_id {where} ORDER BY m.well_id, m.density_sg",
+            params
+        )
+
+    def wells(self, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Whole columns of the wells table (all of them by default)."""
+        names = columns or [name for name, _, _ in WELL_COLUMNS]
+        unknown = set(names) - {name for name, _, _ in WELL_COLUMNS}
+        if unknown:
+            raise ValueError(f"Unknown wells columns: {sorted(unknown)}")
+        return self.query(f"SELECT {', '.join(names)} FROM wells ORDER BY well_id")
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM wells").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self._conn.close()
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import chromadb
+
+
+def shard_of(value: Any, shard_count: int) -> int:
+    """Stable shard number of a key value (the same in every process, unlike hash())."""
+    digest = hashlib.sha256(str(value if value is not None else "").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def check_layout(config: Dict[str, Any], client, embedding_model: Optional[str] = None):
+    """
+    Records the collection's shard layout (shard_count, shard_key, shard_directories) and
+    embedding model in `<collection_name>_shards.json` under `chroma_db_path` when the
+    database is first opened, and raises ValueError if it is opened later with a
+    different layout, since chunks would then be looked up in the wrong shards, or with a
+    different embedding model, since queries would then be compared with vectors of
+    another model. A database created before layouts were recorded holds a single
+    unsharded collection, so it counts as shard_count 1.
+    """
+    shard_count = config.get("shard_count") or 1
+    layout = {"shard_count": shard_count}
+    if shard_count > 1:
+        layout["shard_key"] = config.get("shard_key", "source")
+        layout["shard_directories"] = bool(config.get("shard_directories", False))
+
+    path = config.get("chroma_db_path", "./chroma_db")
+    collection_name = config.get("collection_name", "well_reports")
+    layout_path = os.path.join(path, f"{collection_name}_shards.json")
+    recorded = None
+    if os.path.exists(layout_path):
+        with open(layout_path, 'r') as f:
+            recorded = json.load(f)
+        stored = {key: value for key, value in recorded.items() if key != "embedding_model"}
+    elif collection_name in _collection_names(client):
+        stored = {"shard_count": 1}
+    else:
+        stored = layout
+    if stored != layout:
+        raise ValueError(f"The database at {path} was created with shard layout {stored}, but the config "
+                         f"sets {layout}. Changing the shard layout requires a fresh database.")
+
+    # A record written before embedding models were recorded adopts the configured one.
+    stored_model = (recorded or {}).get("embedding_model") or embedding_model
+    if embedding_model and stored_model != embedding_model:
+        raise ValueError(f"The database at {path} was embedded with {stored_model}, but the config "
+                         f"selects {embedding_model}. Changing the embedding model requires a fresh database.")
+
+    record = dict(layout)
+    if stored_model:
+        record["embedding_model"] = stored_model
+    if record != recorded:
+        os.makedirs(path, exist_ok=True)
+        with open(layout_path, 'w') as f:
+            json.dump(record, f)
+
+
+def _collection_names(client) -> List[str]:
+    # Depending on the Chroma version, list_collections returns collection objects or names.
+    return [getattr(collection, "name", collection) for collection in client.list_collections()]
+
+
+def pinned_values(where: Optional[Dict[str, Any]], key: str) -> Optional[List[Any]]:
+    """
+    The values of `key` a Chroma metadata filter restricts results to, or None if the
+    filter does not pin the key. Understands {key: v}, {key: {"$eq": v}},
+    {key: {"$in": [...]}} and those conditions inside a top-level "$and".
+    """
+    if not where:
+        return None
+    if "$and" in where:
+        for condition in where["$and"]:
+            values = pinned_values(condition, key)
+            if values is not None:
+                return values
+        return None
+    if key not in where:
+        return None
+    condition = where[key]
+    if not isinstance(condition, dict):
+        return [condition]
+    if "$eq" in condition:
+        return [condition["$eq"]]
+    if "$in" in condition:
+        return list(condition["$in"])
+    return None
+
+
+class ShardedCollection:
+    """
+    Chunks partitioned over several Chroma collections by a metadata key (`shard_key`,
+    e.g. the report's source, its field or basin), so each shard's HNSW index stays a
+    fraction of the corpus.
+
+    Offers the subset of the Chroma collection API DatabaseManager uses (get, query,
+    upsert, delete, count). Rows are written to the shard of their key value. Reads
+    whose filter pins the key go to that shard only; the others fan out to every shard
+    on a thread pool, and query results are merged by distance (all shards use the same
+    embeddings and distance, so distances are comparable). Id-only gets and deletes fan
+    out, since an id does not carry its key.
+    """
+    def __init__(self, clients: List[Any], names: List[str], key: str = "source",
+                 max_workers: Optional[int] = None):
+        self.clients = clients
+        self.shards = [client.get_or_create_collection(name=name) for client, name in zip(clients, names)]
+        self.key = key
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or len(names),
+                                            thread_name_prefix="chroma-shard")
+
+    @classmethod
+    def open(cls, config: Dict[str, Any], client: Any) -> "ShardedCollection":
+        """
+        Opens (creating if needed) the `shard_count` shards of `collection_name`, as
+        collections `<collection_name>_shard_<i>` of `client`, or with `shard_directories`
+        each in its own persistent directory `shard_<i>` under `chroma_db_path`.
+        """
+        name = config.get("collection_name", "well_reports")
+        shard_count = config.get("shard_count")
+        clients = [client] * shard_count
+        if config.get("shard_directories", False):
+            path = config.get("chroma_db_path", "./chroma_db")
+            clients = [chromadb.PersistentClient(path=os.path.join(path, f"shard_{i}")) for i in range(shard_count)]
+        names = [f"{name}_shard_{i}" for i in range(shard_count)]
+        return cls(clients, names, key=config.get("shard_key", "source"), max_workers=config.get("shard_query_threads"))
+
+    def _targets(self, where: Optional[Dict[str, Any]]) -> List[int]:
+        values = pinned_values(where, self.key)
+        if values is None:
+            return list(range(len(self.shards)))
+        return sorted({shard_of(value, len(self.shards)) for value in values})
+
+    def _map(self, targets: List[int], call) -> List[Any]:
+        if len(targets) == 1:
+            return [call(self.shards[targets[0]])]
+        return list(self._executor.map(lambda i: call(self.shards[i]), targets))
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+               embeddings: Optional[List[List[float]]] = None):
+        """Writes each row to the shard of its key value. Raises ValueError if a row has no key value."""
+        rows_by_shard: Dict[int, List[int]] = {}
+        for row, metadata in enumerate(metadatas):
+            if metadata.get(self.key) in (None, ""):
+                # Would all land in one shard, and be missed by queries pinning the key.
+                raise ValueError(f"Chunk {ids[row]} has no '{self.key}' metadata to choose its shard "
+                                 f"(shard_key); add it to every chunk or shard by 'source'.")
+            rows_by_shard.setdefault(shard_of(metadata.get(self.key), len(self.shards)), []).append(row)
+
+        def write(shard: int):
+            rows = rows_by_shard[shard]
+            self.shards[shard].upsert(
+                ids=[ids[row] for row in rows],
+                documents=[documents[row] for row in rows],
+                metadatas=[metadatas[row] for row in rows],
+                embeddings=[embeddings[row] for row in rows] if embeddings is not None else None
+            )
+        list(self._executor.map(write, sorted(rows_by_shard)))
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = ["documents", "metadatas"] if include is None else include
+        responses = self._map(self._targets(where),
+                              lambda shard: shard.get(ids=ids, where=where, limit=limit, include=include))
+        merged: Dict[str, Any] = {"ids": [], "included": include}
+        for field in ("documents", "metadatas", "embeddings"):
+            merged[field] = [] if field in include else None
+        for response in responses:
+            merged["ids"].extend(response["ids"])
+            for field in include:
+                if merged.get(field) is not None:
+                    merged[field].extend(response[field])
+        if limit is not None:
+            for field in ("ids", "documents", "metadatas", "embeddings"):
+                if merged[field] is not None:
+                    merged[field] = merged[field][:limit]
+        return merged
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = ["documents", "metadatas", "distances"] if include is None else include
+        # Distances are needed to merge the shards' results.
+        shard_include = sorted(set(include) | {"distances"})
+        responses = self._map(self._targets(where), lambda shard: shard.query(
+            query_embeddings=query_embeddings, n_results=n_results, where=where, include=shard_include
+        ))
+
+        fields = [field for field in ("documents", "metadatas", "distances") if field in include]
+        merged: Dict[str, Any] = {"ids": [], "included": include}
+        for field in ("documents", "metadatas", "distances"):
+            merged[field] = [] if field in fields else None
+        for query in range(len(query_embeddings)):
+            hits = []
+            for response in responses:
+                for rank, doc_id in enumerate(response["ids"][query]):
+                    hit = {field: response[field][query][rank] for field in fields}
+                    hit["distances"] = response["distances"][query][rank]
+                    hits.append((doc_id, hit))
+            hits.sort(key=lambda item: item[1]["distances"])
+            hits = hits[:n_results]
+            merged["ids"].append([doc_id for doc_id, _ in hits])
+            for field in fields:
+                merged[field].append([hit[field] for _, hit in hits])
+        return merged
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        self._map(self._targets(where), lambda shard: shard.delete(ids=ids, where=where))
+
+    def count(self) -> int:
+        return sum(self.counts())
+
+    def counts(self) -> List[int]:
+        """Number of chunks in each shard."""
+        return self._map(list(range(len(self.shards))), lambda shard: shard.count())
+
+    def reset(self):
+        """Deletes and recreates every shard (useful for testing)."""
+        for i, (client, shard) in enumerate(zip(self.clients, self.shards)):
+            client.delete_collection(shard.name)
+            self.shards[i] = client.get_or_create_collection(name=shard.name)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -1,23 +1,51 @@
-import pdfplumber
-import ollama
 import json
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, Callable
+
+from .async_llm import bounded_json_chat
+from .context_packer import ContextPacker, SPECS_TERMS
+from .json_stream import stream_json_chat, SPECS_SCHEMA
+from .llm_cache import LLMCache, get_default_cache
+from .llm_client import default_model
+from .table_parser import parse_spec_tables, normalise_specs, source_units
+from .utils import PDFIngestor, ParsedDocument, extraction_filter
 
 class TechSpecsExtractor:
     """
     Extracts technical specifications (Casing, Mud) from PDF reports using
-    table extraction and LLM parsing.
+    table extraction, rule-based table parsing and LLM parsing as a fallback.
     """
 
-    def extract_tables_to_markdown(self, pdf_path: str, keywords: List[str]) -> str:
+    def __init__(self, model: Optional[str] = None, cache: Optional[LLMCache] = None,
+                 raise_errors: bool = False, context_tokens: int = 1500, num_predict: int = 1024):
+        self.model = model or default_model()
+        self.cache = cache or get_default_cache()
+        # Unparsed tables sent to the LLM are packed to this budget, casing and mud rows first.
+        self.packer = ContextPacker(SPECS_TERMS, context_tokens)
+        # Cap on generated tokens; the streamed answer is cut as soon as it is complete anyway.
+        self.num_predict = num_predict
+        # Re-raise LLM failures instead of falling back (the job runner retries them).
+        self.raise_errors = raise_errors
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs) -> "TechSpecsExtractor":
+        kwargs.setdefault("model", config.get("llm_model"))
+        return cls(context_tokens=config.get("specs_context_tokens", 1500),
+                   num_predict=config.get("specs_num_predict", 1024), **kwargs)
+
+    def extract_tables_to_markdown(self, source: Union[str, ParsedDocument], keywords: List[str],
+                                   fast_layout: bool = False) -> str:
         """
-        Scans a PDF for pages containing specific keywords, extracts tables found on those pages,
-        and converts them into a Markdown string.
+        Collects the tables of the sections named by the keywords and combines their
+        Markdown into a single string. Sections are found through the document outline
+        (e.g. "5.0 Casing" for "Casing"); for a keyword the outline has no section for,
+        the pages containing the keyword are used instead.
 
         Args:
-            pdf_path (str): Path to the PDF file.
-            keywords (List[str]): List of keywords to search for on pages (e.g., ["Casing", "Mud"]).
+            source (Union[str, ParsedDocument]): An already parsed document (preferred, so the
+                PDF is not parsed a second time) or the path to the PDF file.
+            keywords (List[str]): Section names or keywords (e.g., ["Casing", "Mud"]).
+            fast_layout (bool): Parse a PDF path in PDFIngestor's fast layout mode.
 
         Returns:
             str: Combined Markdown representation of the extracted tables.
@@ -25,50 +53,82 @@ class TechSpecsExtractor:
         markdown_output = []
 
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text() or ""
-                    
-                    # Check if any keyword is present on the page (case-insensitive)
-                    if any(keyword.lower() in text.lower() for keyword in keywords):
-                        tables = page.extract_tables()
-                        
-                        for table in tables:
-                            if not table:
-                                continue
-                            
-                            # Clean table data: replace None with empty string
-                            cleaned_table = [[cell if cell is not None else "" for cell in row] for row in table]
-                            
-                            if not cleaned_table:
-                                continue
-
-                            # Create header
-                            header = cleaned_table[0]
-                            # Format header row
-                            markdown_table = "| " + " | ".join(str(x).replace("\n", " ") for x in header) + " |\n"
-                            # Add separator row
-                            markdown_table += "| " + " | ".join(["---"] * len(header)) + " |\n"
-                            
-                            # Create data rows
-                            for row in cleaned_table[1:]:
-                                markdown_table += "| " + " | ".join(str(x).replace("\n", " ") for x in row) + " |\n"
-                            
-                            markdown_output.append(markdown_table)
-                            markdown_output.append("\n")
+            if isinstance(source, ParsedDocument):
+                parsed_doc = source
+            else:
+                ingestor = PDFIngestor(source, fast_layout=fast_layout)
+                try:
+                    # Only the section and keyword pages are kept.
+                    parsed_doc = ingestor.parse_document(keep=extraction_filter(0, keywords, keywords))
+                finally:
+                    ingestor.close()
+
+            # Keyword matching is case-insensitive and uses each page's cached lowercase text;
+            # the tables were already converted to Markdown during parsing.
+            sections = [keyword for keyword in keywords if parsed_doc.outline.find(keyword) is not None]
+            others = [keyword for keyword in keywords if keyword not in sections]
+            section_pages = {page.number for page in parsed_doc.section_pages(sections)}
+            pages = [page for page in parsed_doc.pages
+                     if page.number in section_pages or (others and page.keyword_hits(others))]
+            for page in pages:
+                for markdown_table in page.table_markdowns:
+                    markdown_output.append(markdown_table)
+                    markdown_output.append("\n")
                             
         except Exception as e:
-            print(f"Error reading PDF {pdf_path}: {e}")
+            print(f"Error reading PDF {source if isinstance(source, str) else source.source}: {e}")
             return ""
 
         return "\n".join(markdown_output)
 
-    def parse_specs_with_llm(self, markdown_content: str) -> Dict[str, Any]:
+    def parse_specs(self, markdown_content: str) -> Dict[str, Any]:
+        """
+        Parses technical specifications from Markdown table content, using the rule-based
+        table parser for standard casing and mud tables and the LLM only for the tables
+        it cannot confidently parse.
+
+        Args:
+            markdown_content (str): Markdown string containing table data.
+
+        Returns:
+            Dict[str, Any]: Dictionary containing 'casing_data' and 'mud_data', with sizes
+            like 9 5/8" and depth (m), weight (lb/ft) and density (sg) as floats from
+            either path.
+        """
+        fast = parse_spec_tables(markdown_content)
+        if not fast["unparsed"]:
+            return {"casing_data": fast["casing_data"], "mud_data": fast["mud_data"]}
+        return self._merge_specs(fast, self.parse_specs_with_llm("\n\n".join(fast["unparsed"])))
+
+    async def parse_specs_async(self, markdown_content: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async variant of parse_specs for the concurrent pipeline."""
+        fast = parse_spec_tables(markdown_content)
+        if not fast["unparsed"]:
+            return {"casing_data": fast["casing_data"], "mud_data": fast["mud_data"]}
+        llm_specs = await self.parse_specs_with_llm_async("\n\n".join(fast["unparsed"]), timeout=timeout)
+        return self._merge_specs(fast, llm_specs)
+
+    def _merge_specs(self, fast: Dict[str, Any], llm_specs: Dict[str, Any]) -> Dict[str, Any]:
+        # The LLM's rows are converted to the fast path's typed, canonical-unit rows;
+        # numbers it returns without a unit are in the unit of the tables' headers.
+        llm_specs = normalise_specs(llm_specs, source_units("\n\n".join(fast["unparsed"])))
+        return {
+            "casing_data": fast["casing_data"] + llm_specs["casing_data"],
+            "mud_data": fast["mud_data"] + llm_specs["mud_data"]
+        }
+
+    def parse_specs_with_llm(self, markdown_content: str,
+                             on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Uses an LLM to parse technical specifications from Markdown table content.
 
+        The answer is streamed in JSON mode and generation stops as soon as an object
+        with 'casing_data' and 'mud_data' lists is complete.
+
         Args:
             markdown_content (str): Markdown string containing table data.
+            on_partial: Called with the fields parsed so far (e.g. 'casing_data' before
+                'mud_data' has been generated). Not called on a cache hit.
 
         Returns:
             Dict[str, Any]: Dictionary containing 'casing_data' and 'mud_data'.
@@ -76,6 +136,51 @@ class TechSpecsExtractor:
         if not markdown_content.strip():
             return {"casing_data": [], "mud_data": []}
 
+        messages = self._specs_messages(markdown_content)
+        try:
+            response = self.cache.chat(
+                self.model, messages,
+                lambda: stream_json_chat(self.model, messages, SPECS_SCHEMA,
+                                         num_predict=self.num_predict, on_partial=on_partial),
+                options=self._llm_options()
+            )
+            return self._parse_specs_response(response)
+
+        except Exception as e:
+            if self.raise_errors:
+                raise
+            print(f"Error calling LLM: {e}")
+            return {"casing_data": [], "mud_data": []}
+
+    async def parse_specs_with_llm_async(self, markdown_content: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async variant of parse_specs_with_llm for the concurrent pipeline. Returns the
+        same empty result on timeout or error.
+        """
+        if not markdown_content.strip():
+            return {"casing_data": [], "mud_data": []}
+
+        messages = self._specs_messages(markdown_content)
+        try:
+            response = await self.cache.achat(
+                self.model, messages,
+                lambda: bounded_json_chat(self.model, messages, SPECS_SCHEMA,
+                                          num_predict=self.num_predict, timeout=timeout),
+                options=self._llm_options()
+            )
+            return self._parse_specs_response(response)
+
+        except Exception as e:
+            if self.raise_errors:
+                raise
+            print(f"Error calling LLM: {e!r}")
+            return {"casing_data": [], "mud_data": []}
+
+    def _llm_options(self) -> Dict[str, Any]:
+        # Part of the cache key: answers generated under other settings are not reused.
+        return {"format": "json", "num_predict": self.num_predict}
+
+    def _specs_messages(self, markdown_content: str) -> List[Dict[str, str]]:
         prompt = f"""
         You are a Drilling Data Engineer. Analyze the following Markdown table data extracted from a well report.
         
@@ -95,35 +200,30 @@ class TechSpecsExtractor:
             ]
         }}
 
+        Copy each depth, weight and density with its unit as given in the table (e.g. "4500 ft",
+        "53.5 lb/ft", "10.2 ppg").
         If a field is missing, use null. Do not include any explanation, only the JSON.
 
         Markdown Content:
-        {markdown_content}
+        {self.packer.pack(markdown_content)}
         """
+        return [{'role': 'user', 'content': prompt}]
 
+    def _parse_specs_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        content = response['message']['content']
+        
+        # Attempt to parse JSON
         try:
-            response = ollama.chat(model='llama3.1', messages=[
-                {'role': 'user', 'content': prompt},
-            ])
-            
-            content = response['message']['content']
-            
-            # Attempt to parse JSON
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                # Fallback: find first { and last } to handle potential markdown code blocks or extra text
-                match = re.search(r'\{.*\}', content, re.DOTALL)
-                if match:
-                    json_str = match.group(0)
-                    return json.loads(json_str)
-                else:
-                    print("Failed to extract JSON from LLM response.")
-                    return {"casing_data": [], "mud_data": []}
-
-        except Exception as e:
-            print(f"Error calling LLM: {e}")
-            return {"casing_data": [], "mud_data": []}
+            return json.loads(content)
+        except json.JSONDecodeError:
+            # Fallback: find first { and last } to handle potential markdown code blocks or extra text
+            match = re.search(r'\{.*\}', content, re.DOTALL)
+            if match:
+                json_str = match.group(0)
+                return json.loads(json_str)
+            else:
+                print("Failed to extract JSON from LLM response.")
+                return {"casing_data": [], "mud_data": []}
 
 if __name__ == "__main__":
     # Mock Markdown String for testing
@@ -144,9 +244,9 @@ if __name__ == "__main__":
     extractor = TechSpecsExtractor()
     
     # We are skipping extract_tables_to_markdown as we don't have a PDF here
-    # directly testing the LLM parsing part.
+    # directly testing the parsing part.
     
-    result = extractor.parse_specs_with_llm(mock_markdown)
+    result = extractor.parse_specs(mock_markdown)
     
     print("\nExtracted Data:")
     print(json.dumps(result, indent=2))
\ No newline at end of file
@@ -0,0 +1,314 @@
+import re
+from fractions import Fraction
+from typing import List, Dict, Any, Optional, Tuple
+
+# Header aliases, tried in order; the first field whose pattern matches a header cell wins.
+# Density comes before weight so that "Mud Weight" is read as a density.
+COLUMN_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("density", re.compile(r'mud\s*(weight|wt|density)|density|\bmw\b|\bemw\b|^sg$|^ppg$')),
+    ("mud_type", re.compile(r'(mud|fluid)\s*(type|system|name)|^(type|mud|fluid|system)$')),
+    ("size", re.compile(r'(casing|liner|csg)?\s*(size|od|o\.d\.|diameter)\b|^(casing|liner|csg|string)$')),
+    ("depth", re.compile(r'depth|\bmd\b|\btvd\b|shoe|set\s*at|setting')),
+    ("weight", re.compile(r'weight|\bwt\b|lb/ft|ppf|kg/m$|nominal')),
+]
+
+# Unit conversions to the canonical units of the fast path:
+# depth in metres, casing weight in lb/ft, mud density in specific gravity (sg).
+DEPTH_UNITS = {"m": 1.0, "ft": 0.3048, "feet": 0.3048}
+WEIGHT_UNITS = {"lb/ft": 1.0, "ppf": 1.0, "#/ft": 1.0, "lb/foot": 1.0, "kg/m": 1 / 1.48816}
+DENSITY_UNITS = {"sg": 1.0, "s.g.": 1.0, "g/cc": 1.0, "g/cm3": 1.0, "ppg": 1 / 8.3454,
+                 "lb/gal": 1 / 8.3454, "kg/m3": 0.001, "kg/l": 1.0}
+DEFAULT_UNITS = {"depth": "m", "weight": "lb/ft", "density": "sg"}
+UNIT_TABLES = {"depth": DEPTH_UNITS, "weight": WEIGHT_UNITS, "density": DENSITY_UNITS}
+
+# Size columns of these are not casing sizes (bit-run and hole-section tables).
+NON_CASING_SIZE = re.compile(r'hole|bit|nozzle')
+# A casing table's header has to name the casing; other size/depth tables go to the LLM.
+CASING_HINTS = re.compile(r'casing|liner|csg|conductor|shoe|string', re.IGNORECASE)
+
+# Words that make an unparsed table worth sending to the LLM.
+SPEC_HINTS = re.compile(r'casing|liner|mud|fluid|density|ppg|\bsg\b|shoe|lb/ft|ppf', re.IGNORECASE)
+
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+SIZE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(?:\s*[- ]\s*(\d+)\s*/\s*(\d+))?\s*(?:"|in\b|inch)?')
+
+# A table is parsed by the fast path only if at least this share of its rows parse.
+MIN_CONFIDENCE = 0.8
+
+
+def split_markdown_tables(markdown: str) -> List[List[List[str]]]:
+    """
+    Splits Markdown into tables, each a list of rows of stripped cell strings.
+    Separator rows (|---|---|) are dropped; the first row of each table is its header.
+    """
+    tables, current = [], []
+    for line in markdown.split("\n"):
+        line = line.strip()
+        if line.startswith("|"):
+            cells = [cell.strip() for cell in line.strip("|").split("|")]
+            if not all(re.fullmatch(r':?-{3,}:?', cell) for cell in cells if cell):
+                current.append(cells)
+        elif current:
+            tables.append(current)
+            current = []
+    if current:
+        tables.append(current)
+    return tables
+
+
+def table_to_markdown(rows: List[List[str]]) -> str:
+    """Inverse of split_markdown_tables for one table."""
+    lines = ["| " + " | ".join(rows[0]) + " |", "| " + " | ".join(["---"] * len(rows[0])) + " |"]
+    lines += ["| " + " | ".join(row) + " |" for row in rows[1:]]
+    return "\n".join(lines)
+
+
+def parse_size_inches(text: str) -> Optional[float]:
+    """Parses casing sizes like 13 3/8", 13-3/8, 9.625 in or 7" into inches."""
+    text = text.replace("⅜", " 3/8").replace("⅝", " 5/8").replace("½", " 1/2").replace("¼", " 1/4")
+    match = SIZE_PATTERN.search(text)
+    if not match:
+        return None
+    value = float(match.group(1))
+    if match.group(2):
+        value += float(Fraction(int(match.group(2)), int(match.group(3))))
+    # Casing and liner sizes range from 2 3/8" to 36".
+    return value if 2 <= value <= 36 else None
+
+
+def format_size(inches: float) -> str:
+    """Formats a size in inches with an eighths fraction, e.g. 13.375 -> 13 3/8"."""
+    whole = int(inches)
+    fraction = Fraction(inches - whole).limit_denominator(8)
+    if fraction == 0:
+        return f'{whole}"'
+    return f'{whole} {fraction.numerator}/{fraction.denominator}"'
+
+
+def parse_numbers(cells: List[str]) -> List[Optional[float]]:
+    """Parses a whole column of numeric cells (thousands separators allowed); None where not numeric."""
+    values = []
+    for cell in cells:
+        match = NUMBER_PATTERN.search(cell.replace(",", ""))
+        values.append(float(match.group(0)) if match else None)
+    return values
+
+
+def normalise_unit(unit: str) -> str:
+    """
+    Canonical spelling of a unit: "lbs/ft", "lbm/ft" and "lb/ft." become "lb/ft",
+    "kg/m³" becomes "kg/m3", and depth references ("mMD", "ftRKB") are dropped.
+    """
+    unit = unit.lower().replace(" ", "").rstrip(".").replace("³", "3")
+    unit = re.sub(r'^lb[sm]?/', 'lb/', unit)
+    unit = re.sub(r'^lbs?$', 'lb', unit)
+    return re.sub(r'^(m|ft)(md|tvd|rkb|bdf|ah)$', r'\1', unit)
+
+
+def parse_quantity(value: Any, field: str, unit: Optional[str] = None) -> Optional[float]:
+    """
+    Converts one extracted depth, weight or density to the canonical units. Text has to
+    name its unit ("4,500 ft", "10.2 ppg") unless `unit`, the unit of values that do not
+    name one (e.g. their column's header unit), is given; bare numeric text is otherwise
+    unreadable and returns None. Numbers without `unit` are taken to be canonical
+    already, except densities above 3, which can only be ppg. Returns None if the value
+    is not numeric or its unit is unknown.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number, own_unit = float(value), ""
+    else:
+        text = str(value).lower().replace(",", "")
+        match = NUMBER_PATTERN.search(text)
+        if not match:
+            return None
+        number, own_unit = float(match.group(0)), normalise_unit(text[match.end():])
+        if not own_unit and unit is None:
+            return None
+
+    units = UNIT_TABLES[field]
+    unit = own_unit or (normalise_unit(unit) if unit is not None else "")
+    if unit:
+        factor = units.get(unit)
+        if factor is None:
+            return None
+    elif field == "density" and number > 3:
+        factor = DENSITY_UNITS["ppg"]
+    else:
+        factor = 1.0
+    return round(number * factor, 3)
+
+
+def header_name_and_unit(cell: str) -> Tuple[str, Optional[str]]:
+    """Splits a header cell such as "Depth (ft)" into its lowercase name and unit ("depth", "ft")."""
+    cell = cell.lower().replace("<br>", " ")
+    unit_match = re.search(r'[\(\[]\s*([^\)\]]+?)\s*[\)\]]', cell)
+    unit = unit_match.group(1).replace(" ", "") if unit_match else None
+    name = re.sub(r'[\(\[][^\)\]]*[\)\]]', ' ', cell)
+    return re.sub(r'\s+', ' ', name).strip(), unit
+
+
+def _match_unit(field: str, unit: Optional[str], name: str) -> Optional[float]:
+    """Returns the factor converting the column to canonical units, None if the unit is unknown."""
+    units = UNIT_TABLES[field]
+    if unit is None:
+        # Units are sometimes part of the header name, e.g. "Depth ft" or "MW ppg".
+        for candidate in units:
+            if re.search(rf'(^|\s){re.escape(candidate)}$', name):
+                return units[candidate]
+        return units[DEFAULT_UNITS[field]]
+    return units.get(normalise_unit(unit))
+
+
+def map_columns(header: List[str]) -> Dict[str, Tuple[int, Optional[float]]]:
+    """Maps fields (size, depth, weight, mud_type, density) to (column index, unit factor)."""
+    columns: Dict[str, Tuple[int, Optional[float]]] = {}
+    for index, cell in enumerate(header):
+        name, unit = header_name_and_unit(cell)
+        for field, pattern in COLUMN_PATTERNS:
+            if field == "size" and NON_CASING_SIZE.search(name):
+                continue
+            if field not in columns and pattern.search(name):
+                factor = _match_unit(field, unit, name) if field in UNIT_TABLES else None
+                columns[field] = (index, factor)
+                break
+    return columns
+
+
+def _column(rows: List[List[str]], index: int) -> List[str]:
+    return [row[index] if index < len(row) else "" for row in rows]
+
+
+def _converted(values: List[Optional[float]], factor: Optional[float]) -> List[Optional[float]]:
+    return [round(value * factor, 3) if value is not None else None for value in values]
+
+
+def _parse_casing_table(rows: List[List[str]], columns) -> Optional[List[Dict[str, Any]]]:
+    size_index, _ = columns["size"]
+    depth_index, depth_factor = columns["depth"]
+    if depth_factor is None:
+        return None
+
+    sizes = [parse_size_inches(cell) for cell in _column(rows, size_index)]
+    depths = _converted(parse_numbers(_column(rows, depth_index)), depth_factor)
+    weights = [None] * len(rows)
+    if "weight" in columns:
+        weight_index, weight_factor = columns["weight"]
+        if weight_factor is None:
+            # Unknown unit: the LLM reads the table rather than the weights being dropped.
+            return None
+        weights = _converted(parse_numbers(_column(rows, weight_index)), weight_factor)
+
+    parsed = [i for i in range(len(rows)) if sizes[i] is not None and depths[i] is not None]
+    if len(parsed) < MIN_CONFIDENCE * len(rows):
+        return None
+    return [{"size": format_size(sizes[i]), "depth": depths[i], "weight": weights[i]} for i in parsed]
+
+
+def _parse_mud_table(rows: List[List[str]], columns) -> Optional[List[Dict[str, Any]]]:
+    type_index, _ = columns["mud_type"]
+    density_index, density_factor = columns["density"]
+    if density_factor is None:
+        return None
+
+    types = _column(rows, type_index)
+    densities = _converted(parse_numbers(_column(rows, density_index)), density_factor)
+
+    parsed = [i for i in range(len(rows)) if types[i] and densities[i] is not None]
+    if len(parsed) < MIN_CONFIDENCE * len(rows):
+        return None
+    return [{"type": types[i], "density": densities[i]} for i in parsed]
+
+
+def source_units(markdown: str) -> Dict[str, str]:
+    """
+    The unit depth, weight and density are given in by the headers of the tables in
+    `markdown`, e.g. {"depth": "ft", "weight": "lb/ft"}. A field is left out if no header
+    names a known unit for it or the tables disagree.
+    """
+    found: Dict[str, set] = {}
+    for table in split_markdown_tables(markdown):
+        for field, (index, factor) in map_columns(table[0]).items():
+            if field not in UNIT_TABLES or factor is None:
+                continue
+            name, unit = header_name_and_unit(table[0][index])
+            if unit is None:
+                unit = next((candidate for candidate in UNIT_TABLES[field]
+                             if re.search(rf'(^|\s){re.escape(candidate)}$', name)), None)
+            if unit is not None:
+                found.setdefault(field, set()).add(normalise_unit(unit))
+    return {field: units.pop() for field, units in found.items() if len(units) == 1}
+
+
+def normalise_specs(specs: Dict[str, Any], units: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Converts free-form casing and mud rows (the LLM's answer) to the typed rows of
+    parse_spec_tables: sizes formatted like 9 5/8", depth, weight and density as floats
+    in canonical units. Values that do not name their unit are read in `units` (by
+    field, e.g. from source_units), else in the canonical unit, as the fast path reads
+    a header without a unit. Values that cannot be read become None; casing rows
+    without a size or depth and mud rows without a density are dropped.
+    """
+    units = units or {}
+
+    def quantity(entry: Dict[str, Any], field: str) -> Optional[float]:
+        return parse_quantity(entry.get(field), field, units.get(field, DEFAULT_UNITS[field]))
+
+    casing = []
+    for entry in specs.get("casing_data") or []:
+        if not isinstance(entry, dict):
+            continue
+        size = entry.get("size")
+        size_in = float(size) if isinstance(size, (int, float)) else parse_size_inches(str(size or ""))
+        depth = quantity(entry, "depth")
+        if size_in is not None and depth is not None:
+            casing.append({"size": format_size(size_in), "depth": depth, "weight": quantity(entry, "weight")})
+
+    mud = []
+    for entry in specs.get("mud_data") or []:
+        if not isinstance(entry, dict):
+            continue
+        density = quantity(entry, "density")
+        if density is not None:
+            mud.append({"type": str(entry.get("type") or "Unknown"), "density": density})
+    return {"casing_data": casing, "mud_data": mud}
+
+
+def parse_spec_tables(markdown: str) -> Dict[str, Any]:
+    """
+    Rule-based fast path for casing and mud tables.
+
+    Recognises header aliases, normalises units (depth to metres, casing weight to lb/ft,
+    mud density to sg) and fractional casing sizes. Returns the same 'casing_data' /
+    'mud_data' structure as TechSpecsExtractor.parse_specs_with_llm, plus 'unparsed':
+    the Markdown of spec-looking tables the rules could not parse confidently.
+    Size/depth tables whose header does not name the casing (e.g. "Size | Depth") are
+    left to the LLM; hole, bit and nozzle sizes are never read as casing sizes.
+    Tables without any casing or mud hint are ignored.
+    """
+    result = {"casing_data": [], "mud_data": [], "unparsed": []}
+
+    for table in split_markdown_tables(markdown):
+        if len(table) < 2:
+            continue
+        header, rows = table[0], [row for row in table[1:] if any(row)]
+        columns = map_columns(header)
+
+        parsed = None
+        size_table = "size" in columns and "depth" in columns
+        if size_table and CASING_HINTS.search(" ".join(header)):
+            parsed = _parse_casing_table(rows, columns)
+            if parsed is not None:
+                result["casing_data"].extend(parsed)
+        elif "mud_type" in columns and "density" in columns:
+            parsed = _parse_mud_table(rows, columns)
+            if parsed is not None:
+                result["mud_data"].extend(parsed)
+
+        if parsed is None:
+            markdown_table = table_to_markdown(table)
+            if size_table or SPEC_HINTS.search(markdown_table):
+                result["unparsed"].append(markdown_table)
+
+    return result
@@ -1,6 +1,165 @@
 import fitz  # PyMuPDF
-import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+
+from .chunker import Chunker
+from .instrumentation import timer, count
+from .outline import (
+    DocumentOutline, OutlineBuilder, OutlineEntry, SectionPages, build_outline, outline_from_pages, outline_from_toc
+)
+
+class ParsedPage:
+    """
+    One parsed PDF page: the text outside tables, the Markdown of each table
+    (converted once), the section the page belongs to and the section headings on it.
+    """
+    def __init__(self, number: int, text: str, table_markdowns: List[str], section: Optional[str],
+                 initial_section: Optional[str] = None, headings: Optional[List[OutlineEntry]] = None):
+        self.number = number
+        self.text = text
+        self.table_markdowns = table_markdowns
+        self.section = section
+        # Section in effect at the top of the page (section is the one at the bottom).
+        self.initial_section = initial_section if initial_section is not None else section
+        # The document outline's headings on this page, in order (start_char is their
+        # offset in `text`); None if the page was not parsed with an outline.
+        self.headings = headings
+        self._lower_text = None
+
+    @property
+    def full_text(self) -> str:
+        # Appending tables at the end of the page text for now
+        return self.text + "\n\n" + "\n\n".join(self.table_markdowns)
+
+    @property
+    def lower_text(self) -> str:
+        """Lowercased page text including tables, computed once for keyword lookups."""
+        if self._lower_text is None:
+            self._lower_text = self.full_text.lower()
+        return self._lower_text
+
+    def keyword_hits(self, keywords: List[str]) -> List[str]:
+        """Returns the keywords (case-insensitive) that occur on this page."""
+        return [keyword for keyword in keywords if keyword.lower() in self.lower_text]
+
+    def to_chunks(self, source: str, chunker: Optional[Chunker] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the page as chunks in the format expected by DatabaseManager.save_chunks:
+        the whole page as one chunk, or token-bounded pieces if a chunker is given.
+        """
+        if chunker is not None:
+            return chunker.split_page(self, source)
+        return [{
+            "text": self.full_text,
+            "metadata": {
+                "source": source,
+                "page": self.number,
+                "section": self.section
+            }
+        }]
+
+
+class ParsedDocument:
+    """
+    The result of a single parsing pass over a PDF. Both the ingestion (chunks) and
+    the specs extraction (tables) read from it, so the PDF is only parsed once.
+    """
+    def __init__(self, source: str, pages: List[ParsedPage], toc: Optional[List[list]] = None,
+                 outline: Optional[DocumentOutline] = None):
+        self.source = source
+        self.pages = pages
+        self.toc = toc
+        # The outline of the whole document, when the parse built one (see PDFIngestor.iter_pages).
+        self._outline = outline
+
+    @property
+    def outline(self) -> DocumentOutline:
+        """
+        Section outline of the document: the one built while parsing, or else one built
+        once from the parsed pages, from the PDF's TOC if it has one, otherwise from the
+        numbered headings in the page text.
+        """
+        if self._outline is None:
+            texts = {page.number: page.text for page in self.pages}
+            page_count = max(texts, default=0)
+            if self.toc:
+                self._outline = outline_from_toc(self.toc, page_count, lambda number: texts.get(number, ""))
+            else:
+                self._outline = outline_from_pages(texts.items(), page_count)
+        return self._outline
+
+    def section_text(self, name: str) -> str:
+        """Text (without tables) of the section called `name`, e.g. "Geology"; empty if not found."""
+        texts = {page.number: page.text for page in self.pages}
+        return self.outline.section_text(name, lambda number: texts.get(number, ""))
+
+    def keyword_hits(self, keywords: List[str]) -> Dict[str, List[int]]:
+        """Maps each keyword to the page numbers (1-based) it occurs on."""
+        hits = {keyword: [] for keyword in keywords}
+        for page in self.pages:
+            for keyword in page.keyword_hits(keywords):
+                hits[keyword].append(page.number)
+        return hits
+
+    def pages_with_keywords(self, keywords: List[str]) -> List[ParsedPage]:
+        """Returns the pages containing any of the keywords (case-insensitive)."""
+        return [page for page in self.pages if page.keyword_hits(keywords)]
+
+    def section_pages(self, names: List[str]) -> List[ParsedPage]:
+        """The parsed pages of the sections called `names` (e.g. "Casing"), found through the outline."""
+        numbers = {number for name in names for number in self.outline.pages(name)}
+        return [page for page in self.pages if page.number in numbers]
+
+    def header_text(self, max_pages: int = 3) -> str:
+        """
+        Text of the first few pages (including their tables) for header analysis,
+        like PDFIngestor.get_header_text but without reading the PDF again.
+        """
+        return "".join(page.full_text + "\n" for page in self.pages[:max_pages])
+
+    def to_chunks(self, chunker: Optional[Chunker] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the chunks in the format expected by DatabaseManager.save_chunks: one per
+        page, or token-bounded pieces if a chunker is given.
+        """
+        return [chunk for page in self.pages for chunk in page.to_chunks(self.source, chunker)]
+
+
+def _has_ruling(page: fitz.Page) -> bool:
+    """
+    Cheap table-candidate check: find_tables' default "lines" strategy builds tables
+    from drawn lines and rectangles only, so a page without any cannot contain a table.
+    """
+    for path in page.get_cdrawings():
+        for item in path["items"]:
+            if item[0] in ("l", "re", "qu"):
+                return True
+    return False
+
+
+def _text_outside(page: fitz.Page, rects: List[fitz.Rect]) -> str:
+    """
+    The page text without the characters that overlap any of `rects`, laid out as
+    page.get_text() returns it after redacting those rects: a line with a removed run
+    in its middle is split in two.
+    """
+    lines = []
+    raw = page.get_text("rawdict", flags=fitz.TEXTFLAGS_TEXT)
+    for block in raw["blocks"]:
+        for line in block.get("lines", []):
+            current = []
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    bbox = fitz.Rect(char["bbox"])
+                    if any(bbox.intersects(rect) for rect in rects):
+                        if current:
+                            lines.append("".join(current))
+                            current = []
+                    else:
+                        current.append(char["c"])
+            if current:
+                lines.append("".join(current))
+    return "".join(line + "\n" for line in lines)
+
 
 class PDFIngestor:
     """
@@ -8,63 +167,184 @@ class PDFIngestor:
     and chunking them by section.
     Requires pymupdf>=1.24.0 for table.to_markdown()
     """
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, fast_layout: bool = False):
+        """
+        Args:
+            pdf_path (str): The PDF to parse.
+            fast_layout (bool): Only run the table finder on pages that have drawn lines
+                or rectangles, and drop table text while extracting instead of redacting
+                the page. Produces the same pages, much faster on text-heavy reports.
+        """
         self.pdf_path = pdf_path
+        self.fast_layout = fast_layout
         self.doc = fitz.open(pdf_path)
+        self._parsed = None
+        self._outline = None
 
-    def parse(self) -> List[Dict[str, Any]]:
+    @property
+    def page_count(self) -> int:
+        return self.doc.page_count
+
+    def parse_pages(self, start_page: int = 0, end_page: Optional[int] = None,
+                    initial_section: Optional[str] = "Header") -> List[ParsedPage]:
         """
-        Parses the PDF, extracting text and converting tables to Markdown.
-        Returns a list of document chunks with metadata.
+        Parses a range of pages, extracting text and converting tables to Markdown.
+        See iter_pages for the arguments.
         """
-        chunks = []
-        current_section = "Header"
-        
-        for page_num, page in enumerate(self.doc):
-            # 1. Detect and extract tables
+        return list(self.iter_pages(start_page, end_page, initial_section))
+
+    def iter_pages(self, start_page: int = 0, end_page: Optional[int] = None,
+                   initial_section: Optional[str] = "Header") -> Iterator[ParsedPage]:
+        """
+        Parses a range of pages one at a time, yielding each page as soon as it is parsed.
+
+        Section headings are found in the same pass by the outline's matcher (see
+        OutlineBuilder): the PDF's TOC entries when it has a TOC, otherwise numbered
+        headings. Each page carries its headings and the section in effect at its top
+        and bottom. A pass over the whole document also keeps the outline it built, so
+        outline() does not read the document again.
+
+        Args:
+            start_page (int): First page (0-based) to parse.
+            end_page (Optional[int]): Page to stop before (exclusive). Defaults to the last page.
+            initial_section (Optional[str]): Section assumed for pages before the first
+                detected header. Batch workers parsing a page range from the middle of a
+                document pass None so the section can be carried over when merging.
+        """
+        current_section = initial_section
+        if end_page is None:
+            end_page = self.doc.page_count
+        end_page = min(end_page, self.doc.page_count)
+        builder = OutlineBuilder(self.doc.get_toc(simple=True))
+
+        for page_num in range(start_page, end_page):
+            page = self.doc[page_num]
+            if self.fast_layout:
+                text, table_markdowns = self._extract_page_fast(page)
+            else:
+                text, table_markdowns = self._extract_page(page)
+            count("pages")
+            count("tables", len(table_markdowns))
+
+            page_initial_section = current_section
+            headings = builder.add_page(page_num + 1, text)
+            if headings:
+                current_section = headings[-1].title
+
+            yield ParsedPage(page_num + 1, text, table_markdowns, current_section, page_initial_section, headings)
+
+        if start_page == 0 and end_page == self.doc.page_count and self._outline is None:
+            self._outline = builder.outline(self.doc.page_count)
+
+    def _extract_page(self, page: fitz.Page) -> Tuple[str, List[str]]:
+        """Returns the page text outside tables and the Markdown of each table."""
+        # 1. Detect and extract tables
+        with timer("find_tables"):
             tables = page.find_tables()
-            table_markdowns = []
-            
-            # We use redaction to remove the table text from the main text flow
-            # so we don't have duplicates when we append the markdown.
+        table_markdowns = []
+
+        # We use redaction to remove the table text from the main text flow
+        # so we don't have duplicates when we append the markdown.
+        with timer("table_markdown"):
             for table in tables:
                 # Get markdown before redaction
                 md = table.to_markdown()
                 table_markdowns.append(md)
-                
+
                 # Redact the table area to remove its raw text
                 page.add_redact_annot(table.bbox)
-            
-            # Apply redactions to clean the page text
+
+        # Apply redactions to clean the page text
+        with timer("apply_redactions"):
             page.apply_redactions()
-            
-            # 2. Extract remaining text
+
+        # 2. Extract remaining text
+        with timer("get_text"):
             text = page.get_text()
-            
-            # 3. Detect Section Headers (Simple Heuristic)
-            # Looking for lines starting with "X.Y Title"
-            lines = text.split('\n')
-            for line in lines:
-                # Regex for "4.0 Geology" or "4. Geology"
-                match = re.match(r'^(\d+(\.\d+)*)\s+([A-Z][a-zA-Z\s]+)', line.strip())
-                if match:
-                    current_section = f"{match.group(1)} {match.group(3)}"
-            
-            # 4. Combine text and tables
-            # Appending tables at the end of the page text for now
-            full_page_text = text + "\n\n" + "\n\n".join(table_markdowns)
-            
-            chunk = {
-                "text": full_page_text,
-                "metadata": {
-                    "source": self.pdf_path,
-                    "page": page_num + 1,
-                    "section": current_section
-                }
-            }
-            chunks.append(chunk)
-            
-        return chunks
+        return text, table_markdowns
+
+    def _extract_page_fast(self, page: fitz.Page) -> Tuple[str, List[str]]:
+        """
+        Fast-layout variant of _extract_page. The table finder only runs on pages that
+        can contain a table, and table text is dropped during extraction rather than
+        by rewriting the page with redactions.
+        """
+        with timer("table_candidate"):
+            candidate = _has_ruling(page)
+        if not candidate:
+            with timer("get_text"):
+                return page.get_text(), []
+
+        with timer("find_tables"):
+            tables = page.find_tables()
+        if not tables.tables:
+            with timer("get_text"):
+                return page.get_text(), []
+
+        with timer("table_markdown"):
+            table_markdowns = [table.to_markdown() for table in tables]
+        with timer("get_text"):
+            text = _text_outside(page, [fitz.Rect(table.bbox) for table in tables])
+        return text, table_markdowns
+
+    def parse_document(self, keep: Optional[Callable[[ParsedPage], bool]] = None) -> ParsedDocument:
+        """
+        Parses the whole PDF once and returns the shared ParsedDocument, with the outline
+        built during the pass. Repeated calls return the cached result.
+
+        Args:
+            keep: Only keep the pages it accepts, in page order (e.g. extraction_filter),
+                so memory does not grow with the length of the document. Such a partial
+                document is not cached.
+        """
+        if keep is not None:
+            pages = [page for page in self.iter_pages() if keep(page)]
+            return ParsedDocument(self.pdf_path, pages, toc=self.doc.get_toc(simple=True), outline=self.outline())
+        if self._parsed is None:
+            pages = self.parse_pages()
+            self._parsed = ParsedDocument(self.pdf_path, pages, toc=self.doc.get_toc(simple=True),
+                                          outline=self.outline())
+        return self._parsed
+
+    def parse(self, start_page: int = 0, end_page: Optional[int] = None,
+              initial_section: Optional[str] = "Header", chunker: Optional[Chunker] = None) -> List[Dict[str, Any]]:
+        """
+        Parses the PDF, extracting text and converting tables to Markdown.
+        Returns a list of document chunks with metadata: one per page, or token-bounded
+        pieces if a chunker is given. See parse_pages for the other arguments.
+        """
+        if start_page == 0 and end_page is None and initial_section == "Header":
+            return self.parse_document().to_chunks(chunker)
+        pages = self.parse_pages(start_page, end_page, initial_section)
+        return ParsedDocument(self.pdf_path, pages).to_chunks(chunker)
+
+    def iter_chunks(self, chunker: Optional[Chunker] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of parse: yields the chunks of each page as it is parsed, so
+        memory use does not grow with the length of the document. Pass the generator
+        straight to DatabaseManager.save_chunks to overlap parsing with embedding.
+        """
+        for page in self.iter_pages():
+            yield from page.to_chunks(self.pdf_path, chunker)
+
+    def outline(self) -> DocumentOutline:
+        """
+        The document's section outline (see src/outline.py), built once: during a full
+        iter_pages pass, or on first use from the embedded TOC or, without one, from font
+        sizes and heading numbering.
+        """
+        if self._outline is None:
+            with timer("outline"):
+                self._outline = build_outline(self.doc)
+        return self._outline
+
+    def section_pages(self, name: str) -> List[int]:
+        """Pages (1-based) of the section called `name`, e.g. "Geology" or "Casing"."""
+        return self.outline().pages(name)
+
+    def section_text(self, name: str) -> str:
+        """Text of the section called `name`, reading only that section's pages."""
+        return self.outline().section_text(name, lambda number: self.doc[number - 1].get_text())
 
     def close(self):
         self.doc.close()
@@ -80,6 +360,21 @@ class PDFIngestor:
             text += page.get_text() + "\n"
         return text
 
+def extraction_filter(header_pages: int, sections: List[str], table_keywords: List[str]) -> Callable[[ParsedPage], bool]:
+    """
+    Page filter for a streaming parse (pages passed in order) that keeps only what the
+    extractors read: the first `header_pages` pages, the pages of the named sections
+    (e.g. "Geology", "Casing"; see SectionPages) and, for spec tables outside a section
+    of that name, the pages with tables that mention one of `table_keywords`.
+    """
+    in_sections = SectionPages(sections)
+
+    def keep(page: ParsedPage) -> bool:
+        in_section = in_sections.accept(page.headings or [])
+        return (page.number <= header_pages or in_section
+                or bool(page.table_markdowns and page.keyword_hits(table_keywords)))
+    return keep
+
 def load_pdf(pdf_path: str) -> List[Dict[str, Any]]:
     """
     Helper function to load and parse a PDF.
@@ -0,0 +1,102 @@
+import sys
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.async_llm import configure_async_llm
+from src.llm_cache import LLMCache
+from src.metadata_extractor import MetadataExtractor
+from src.geology_extractor import GeologyExtractor
+from src.specs_extractor import TechSpecsExtractor
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Imitates Ollama's /api/chat (non-streaming) with a configurable latency."""
+    latency = 0.2
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        prompt = body["messages"][-1]["content"]
+        if "well_name" in prompt:
+            content = '{"well_name": "Deep Earth 1", "operator": "Big Oil Corp"}'
+        elif "casing_data" in prompt:
+            content = '{"casing_data": [{"size": "9 5/8", "depth": "4500", "weight": "40"}], "mud_data": []}'
+        else:
+            content = "No drilling problems reported."
+        payload = json.dumps({
+            "model": body["model"],
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": content},
+            "done": True
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def _start_stub_server(latency: float):
+    StubOllamaHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def _run_extractors(cache: LLMCache):
+    return await asyncio.gather(
+        MetadataExtractor(cache=cache).extract_header_async("Well Name: Deep Earth 1\nSpud Date: 2023-05-15"),
+        TechSpecsExtractor(cache=cache).parse_specs_with_llm_async("| Casing Size | Depth |\n|---|---|\n| 9 5/8 | 4500 |"),
+        GeologyExtractor(cache=cache).summarize_problems_async("4.0 Geology\nSandstone interbedded with shale.")
+    )
+
+def _timed_run(max_in_flight: int, latency: float, timeout: float = 10.0):
+    server = _start_stub_server(latency)
+    try:
+        configure_async_llm(host=f"http://127.0.0.1:{server.server_port}",
+                            max_in_flight=max_in_flight, timeout=timeout)
+        with tempfile.TemporaryDirectory() as folder:
+            cache = LLMCache(os.path.join(folder, "cache.sqlite"))
+            start = time.perf_counter()
+            results = asyncio.run(_run_extractors(cache))
+            elapsed = time.perf_counter() - start
+            cache.close()
+        return results, elapsed
+    finally:
+        server.shutdown()
+
+def test_concurrent_extraction_speedup():
+    latency = 0.3
+    (header, specs, issues), concurrent = _timed_run(max_in_flight=3, latency=latency)
+    assert header["well_name"] == "Deep Earth 1"
+    assert header["operator"] == "Big Oil Corp"
+    assert header["spud_date"] == "2023-05-15"
+    assert specs["casing_data"][0]["size"] == "9 5/8"
+    assert issues == "No drilling problems reported."
+
+    _, serial = _timed_run(max_in_flight=1, latency=latency)
+    print(f"in-flight=3: {concurrent:.2f}s, in-flight=1: {serial:.2f}s")
+    assert serial >= 3 * latency
+    assert concurrent < 2 * latency
+
+def test_timeout_returns_fallback():
+    (header, specs, issues), _ = _timed_run(max_in_flight=3, latency=1.0, timeout=0.1)
+    # The labelled well name is still found without the LLM.
+    assert header["well_name"] == "Deep Earth 1"
+    assert header["operator"] == "Unknown"
+    assert header["spud_date"] == "2023-05-15"
+    assert specs == {"casing_data": [], "mud_data": []}
+    assert issues == ""
+
+if __name__ == "__main__":
+    test_concurrent_extraction_speedup()
+    test_timeout_returns_fallback()
+    print("Test Complete.")
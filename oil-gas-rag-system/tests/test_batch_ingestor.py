@@ -0,0 +1,55 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+
+from src import instrumentation
+from src.batch_ingestor import BatchIngestor
+from src.instrumentation import configure_instrumentation, prometheus_text, report_trace
+from src.utils import load_pdf
+
+def _write_report(path: str, pages: int):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        title = f"{i // 3 + 1}.0 Section" if i % 3 == 0 else "continued"
+        page.insert_text((72, 72), f"{title}\nPage body {i + 1}")
+    doc.save(path)
+    doc.close()
+
+def test_parallel_matches_sequential():
+    with tempfile.TemporaryDirectory() as folder:
+        _write_report(os.path.join(folder, "a.pdf"), 7)
+        _write_report(os.path.join(folder, "b.pdf"), 2)
+
+        batch_ingestor = BatchIngestor(num_workers=2, pages_per_task=2)
+        chunks = batch_ingestor.parse_folder(folder)
+
+        expected = load_pdf(os.path.join(folder, "a.pdf")) + load_pdf(os.path.join(folder, "b.pdf"))
+        assert chunks == expected
+
+def test_worker_timings_and_counters_are_merged():
+    with tempfile.TemporaryDirectory() as folder:
+        _write_report(os.path.join(folder, "a.pdf"), 7)
+        _write_report(os.path.join(folder, "b.pdf"), 2)
+        configure_instrumentation({"instrumentation": True})
+        instrumentation.reset()
+        try:
+            with report_trace("batch") as trace:
+                BatchIngestor(num_workers=2, pages_per_task=2).parse_folder(folder)
+            # Pages are parsed in the workers; their counts reach the trace and the totals.
+            assert trace.counters["pages"] == 9
+            assert trace.stages["get_text"]["count"] >= 9
+            assert "wellrag_pages_total 9" in prometheus_text()
+        finally:
+            configure_instrumentation({"instrumentation": False})
+            instrumentation.reset()
+
+if __name__ == "__main__":
+    test_parallel_matches_sequential()
+    test_worker_timings_and_counters_are_merged()
+    print("Test Complete.")
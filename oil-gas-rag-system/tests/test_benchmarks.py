@@ -0,0 +1,45 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.run_benchmarks import find_regressions
+from benchmarks.synthetic_report import SECTIONS, generate_report
+from src.llm_cache import LLMCache
+from src.table_parser import parse_spec_tables
+from src.specs_extractor import TechSpecsExtractor
+from src.utils import PDFIngestor
+
+def test_synthetic_report_parses():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=len(SECTIONS))
+        ingestor = PDFIngestor(pdf_path)
+        parsed_doc = ingestor.parse_document()
+        ingestor.close()
+
+        assert len(parsed_doc.pages) == len(SECTIONS)
+        assert "Well Name: Synthetic 1" in parsed_doc.header_text()
+        assert [page.section for page in parsed_doc.pages] == [heading for heading, _ in SECTIONS]
+
+        markdown = TechSpecsExtractor(cache=LLMCache(os.path.join(folder, "cache.sqlite"))).extract_tables_to_markdown(parsed_doc, ["Casing", "Mud"])
+        specs = parse_spec_tables(markdown)
+        assert len(specs["casing_data"]) == 5
+        assert specs["mud_data"][0] == {"type": "Spud Mud", "density": 1.05}
+
+def test_find_regressions():
+    baseline = {"benchmarks": {"parse[10]": {"median_seconds": 1.0}, "get_chunks[10]": {"median_seconds": 0.1}}}
+    results = {"benchmarks": {
+        "parse[10]": {"median_seconds": 1.2},
+        "get_chunks[10]": {"median_seconds": 0.2},
+        "save_chunks[10]": {"median_seconds": 5.0},
+    }}
+    regressions = find_regressions(results, baseline, threshold=0.25)
+    assert [r["benchmark"] for r in regressions] == ["get_chunks[10]"]
+    assert regressions[0]["ratio"] == 2.0
+
+if __name__ == "__main__":
+    test_synthetic_report_parses()
+    test_find_regressions()
+    print("Test Complete.")
@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.chunker import Chunker, estimate_tokens
+from src.utils import ParsedPage
+
+def _page():
+    text = "\n".join(
+        [f"Drilling progressed normally through interval {i} with no losses observed." for i in range(20)]
+        + ["4.0 Geology", "The formation consists primarily of sandstone interbedded with shale."]
+    )
+    table = "\n".join(
+        ["|Casing Size|Depth (m)|Weight (lb/ft)|", "|---|---|---|"]
+        + [f"|9 5/8\"|{1000 + i * 10}|40.0|" for i in range(60)]
+    )
+    return ParsedPage(3, text, [table], "4.0 Geology", initial_section="3.0 Operations")
+
+def test_pieces_are_bounded_and_sectioned():
+    chunker = Chunker(max_tokens=100, overlap_tokens=20)
+    chunks = chunker.split_page(_page(), "report.pdf")
+
+    assert len(chunks) > 3
+    for index, chunk in enumerate(chunks):
+        assert estimate_tokens(chunk["text"]) <= 110
+        assert chunk["metadata"]["page"] == 3
+        assert chunk["metadata"]["chunk_index"] == index
+
+    sections = [chunk["metadata"]["section"] for chunk in chunks]
+    assert sections[0] == "3.0 Operations"
+    assert sections[-1] == "4.0 Geology"
+    geology = [chunk for chunk in chunks if chunk["text"].startswith("4.0 Geology")]
+    assert geology and geology[0]["metadata"]["section"] == "4.0 Geology"
+
+def test_overlap_between_consecutive_pieces():
+    chunker = Chunker(max_tokens=100, overlap_tokens=20)
+    first, second = chunker.split_page(_page(), "report.pdf")[:2]
+    last_line = first["text"].split("\n")[-1]
+    assert second["text"].startswith(last_line)
+
+def test_tables_split_between_rows_with_header():
+    chunker = Chunker(max_tokens=100, overlap_tokens=20)
+    table_chunks = [chunk for chunk in chunker.split_page(_page(), "report.pdf") if chunk["text"].startswith("|")]
+
+    assert len(table_chunks) > 1
+    rows = []
+    for chunk in table_chunks:
+        lines = chunk["text"].split("\n")
+        assert lines[0] == "|Casing Size|Depth (m)|Weight (lb/ft)|"
+        assert lines[1] == "|---|---|---|"
+        for row in lines[2:]:
+            assert row.startswith("|9 5/8\"|") and row.endswith("|40.0|")
+        rows.extend(lines[2:])
+    assert len(rows) == 60
+
+if __name__ == "__main__":
+    test_pieces_are_bounded_and_sectioned()
+    test_overlap_between_consecutive_pieces()
+    test_tables_split_between_rows_with_header()
+    print("Test Complete.")
@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.chunker import estimate_tokens
+from src.context_packer import ContextPacker, GEOLOGY_TERMS, HEADER_TERMS, SPECS_TERMS
+
+TABLES = """
+| Bit Run | Depth In (m) | ROP (m/h) |
+| --- | --- | --- |
+| Run 1 | 100 | 20.5 |
+| Run 2 | 200 | 25.0 |
+
+| Casing Size | Depth (m) | Weight (lb/ft) |
+| --- | --- | --- |
+| 13 3/8" | 1500 | 68.0 |
+| 9 5/8" | 3200 | 53.5 |
+"""
+
+def test_relevant_rows_fill_the_budget_first():
+    packed = ContextPacker(SPECS_TERMS, max_tokens=40).pack(TABLES)
+    assert packed.startswith("| Casing Size | Depth (m) | Weight (lb/ft) |\n| --- | --- | --- |")
+    assert '| 9 5/8" | 3200 | 53.5 |' in packed
+    assert "Run 1" not in packed
+    assert estimate_tokens(packed) <= 40
+
+def test_boilerplate_and_duplicates_are_dropped():
+    page = ("FINAL WELL REPORT - CONFIDENTIAL\nPage 4 of 120\n"
+            "Drilled ahead with no problems. Mud losses of 20 m3 at 1850 m. Gas peak 4.2 % at 1900 m.")
+    chunks = [page, page.replace("Page 4", "Page 5") + " Pulled out of hole."]
+    packed = ContextPacker(GEOLOGY_TERMS, max_tokens=1000).pack(chunks)
+    assert "Page" not in packed
+    assert packed.count("Gas peak 4.2 %") == 1
+    # Everything fits: the output keeps reading order.
+    assert packed.split("\n") == [
+        "FINAL WELL REPORT - CONFIDENTIAL", "Drilled ahead with no problems.",
+        "Mud losses of 20 m3 at 1850 m.", "Gas peak 4.2 % at 1900 m.", "Pulled out of hole."
+    ]
+
+    tight = ContextPacker(GEOLOGY_TERMS, max_tokens=20).pack(chunks)
+    assert tight.split("\n") == ["Mud losses of 20 m3 at 1850 m.", "Gas peak 4.2 % at 1900 m."]
+
+def test_values_on_their_own_line_are_kept():
+    page = "Well Name:\n6507/7-2\nSpud Date:\n2023-05-15\n- 3 -\n17\n=====\n3 of 120"
+    packed = ContextPacker(HEADER_TERMS, max_tokens=1000).pack([page])
+    assert packed.split("\n") == ["Well Name:", "6507/7-2", "Spud Date:", "2023-05-15"]
+
+if __name__ == "__main__":
+    test_relevant_rows_fill_the_budget_first()
+    test_boilerplate_and_duplicates_are_dropped()
+    test_values_on_their_own_line_are_kept()
+    print("Test Complete.")
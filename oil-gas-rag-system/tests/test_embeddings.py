@@ -0,0 +1,78 @@
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.embeddings import EmbeddingProvider, HashingEmbedder, CachedEmbedder
+
+def _dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+def test_hashing_embedder_is_deterministic():
+    embedder = HashingEmbedder(dimensions=128)
+    first, second = embedder.embed(["13-3/8 casing set at 500m", "13-3/8 casing set at 500m"])
+    assert first == second
+    assert len(first) == 128
+    assert abs(_dot(first, first) - 1.0) < 1e-9
+
+    casing, related, unrelated = embedder.embed([
+        "13-3/8 casing set at 500m",
+        "the 13-3/8 casing shoe was set at 510m",
+        "mud weight maintained at 1.2 sg"
+    ])
+    assert _dot(casing, related) > _dot(casing, unrelated)
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dimensions=16)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+def test_providers_must_implement_embed():
+    class Incomplete(EmbeddingProvider):
+        model_id = "incomplete"
+    for provider in (EmbeddingProvider, Incomplete):
+        try:
+            provider()
+            assert False, f"{provider.__name__} was instantiated without embed()"
+        except TypeError:
+            pass
+
+def test_cached_embedder_embeds_each_text_once():
+    with tempfile.TemporaryDirectory() as folder:
+        provider = CountingEmbedder()
+        cached = CachedEmbedder(provider, os.path.join(folder, "embeddings.sqlite"), batch_size=2, threads=2)
+
+        boilerplate = "This report is confidential."
+        vectors = cached.embed([boilerplate, "page one", boilerplate, "page two", "page three"])
+        assert len(vectors) == 5
+        assert vectors[0] == vectors[2]
+        assert sorted(provider.embedded) == sorted([boilerplate, "page one", "page two", "page three"])
+
+        # Float32 storage round-trips to (nearly) the same vectors.
+        again = cached.embed(["page one", boilerplate])
+        assert len(provider.embedded) == 4
+        assert all(abs(a - b) < 1e-6 for a, b in zip(again[1], vectors[0]))
+        assert cached.stats() == {"hits": 2, "misses": 4}
+
+        # Closing releases the batch threads and the cache connection.
+        executor = cached._executor
+        cached.close()
+        assert executor is not None and executor._shutdown
+        try:
+            cached.embed(["page four"])
+            assert False, "closed cache was still used"
+        except sqlite3.ProgrammingError:
+            pass
+
+if __name__ == "__main__":
+    test_hashing_embedder_is_deterministic()
+    test_providers_must_implement_embed()
+    test_cached_embedder_embeds_each_text_once()
+    print("Test Complete.")
@@ -0,0 +1,49 @@
+import sys
+import os
+import tempfile
+
+import fitz
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_report import generate_report
+from src.chunker import Chunker
+from src.utils import PDFIngestor
+
+def _parse(pdf_path: str, fast_layout: bool):
+    ingestor = PDFIngestor(pdf_path, fast_layout=fast_layout)
+    chunks = ingestor.parse(chunker=Chunker(max_tokens=200, overlap_tokens=20))
+    ingestor.close()
+    return chunks
+
+def test_fast_layout_matches_default_mode():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=12)
+        fast = _parse(pdf_path, fast_layout=True)
+        assert fast == _parse(pdf_path, fast_layout=False)
+        assert any("|Casing Size|" in chunk["text"] for chunk in fast)
+
+def test_fast_layout_splits_lines_like_redaction():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "overlap.pdf")
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "Summary above the table")
+        # Text running past the right edge of the table.
+        page.insert_text((80, 112), "Size    Depth    continues outside the table")
+        page.insert_text((80, 132), "9 5/8   3200")
+        for y in (98, 118, 138):
+            page.draw_line((76, y), (196, y))
+        for x in (76, 136, 196):
+            page.draw_line((x, 98), (x, 138))
+        page.insert_text((72, 170), "Text below the table")
+        doc.save(pdf_path)
+        doc.close()
+
+        assert _parse(pdf_path, fast_layout=True) == _parse(pdf_path, fast_layout=False)
+
+if __name__ == "__main__":
+    test_fast_layout_matches_default_mode()
+    test_fast_layout_splits_lines_like_redaction()
+    print("Test Complete.")
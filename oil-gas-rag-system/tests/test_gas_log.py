@@ -0,0 +1,88 @@
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.gas_log import GasLog, describe_gas_peak
+from src.geology_extractor import GeologyExtractor
+from src.llm_cache import LLMCache
+
+REPORT = """4.0 Geology
+Interval 1200-1210 m MD: sandstone with traces of shale, Viking Group.
+Total gas 0.20 % at 1205 m, background 0.10 %.
+Interval 1210-1220 m MD: shale with traces of marl, Brent Group.
+Total gas 4.20 % at 1215 m, background 0.10 %.
+Total gas 4.20 % at 1215 m, background 0.10 %.
+
+| Depth (ft) | Total Gas (%) | C1 (ppm) | iC4 (ppm) | nC4 (ppm) | Formation |
+| --- | --- | --- | --- | --- | --- |
+| 4000 | 0.10 | 800 | 5 | 6 | Draupne |
+| 4010 | 0.12 | 900 | | 6 | Draupne |
+| 4020 | 2.50 | 20000 | 40 | 50 | Draupne |
+| 4030 | 0.15 | 1000 | 5 | 6 | Heather |
+"""
+
+def test_readings_from_tables_and_sentences():
+    log = GasLog.from_text(REPORT)
+    # The repeated sentence is counted once; feet are converted to metres.
+    assert len(log) == 6
+    assert np.allclose(log.depth_m, [1205.0, 1215.0, 1219.2, 1222.248, 1225.296, 1228.344])
+    assert np.allclose(log.components["c1"][2:], [0.08, 0.09, 2.0, 0.1])
+    assert np.allclose(log.components["c4"][2:], [0.0011, 0.0006, 0.009, 0.0011])
+
+    with tempfile.TemporaryDirectory() as folder:
+        extractor = GeologyExtractor(cache=LLMCache(os.path.join(folder, "cache.sqlite")), gas_background_window=5)
+        peak = extractor.extract_gas_peak(REPORT)
+        assert (peak["percent"], peak["depth_m"]) == (4.2, 1215.0)
+        assert peak["formation"] == "shale with traces of marl, Brent Group"
+        assert [(p["depth_m"], p["formation"]) for p in peak["peaks"]] == [(1215.0, peak["formation"]), (1225.3, "Draupne")]
+        assert peak["peaks"][1]["components"]["c1"] == 2.0
+        assert describe_gas_peak(peak) == "4.2 % at 1215 m (shale with traces of marl, Brent Group)"
+        assert extractor.extract_gas_peak("No gas readings.") == "N/A"
+
+def test_log_built_piece_by_piece_matches_the_whole_text():
+    whole = GasLog.from_text(REPORT)
+    sentences, table = REPORT.split("\n\n")
+    # Pages (or stored chunks) read one at a time, with one piece read twice.
+    pieces = GasLog.concatenate(GasLog.from_text(text) for text in (sentences, table, sentences, "No gas."))
+    assert len(pieces) == len(whole)
+    assert np.allclose(pieces.depth_m, whole.depth_m) and np.allclose(pieces.total_gas, whole.total_gas)
+    assert np.allclose(pieces.components["c1"][2:], whole.components["c1"][2:])
+    assert pieces.formation_at(pieces.depth_m) == whole.formation_at(whole.depth_m)
+    assert len(GasLog.concatenate([])) == 0
+
+def test_anomalous_intervals():
+    depth = np.arange(1000.0, 1100.0)
+    gas = np.full(100, 0.1)
+    gas[20:24] = [0.5, 0.9, 0.6, 0.4]
+    gas[70] = 2.0
+    log = GasLog(depth, gas)
+    intervals = log.anomalies(ratio=3.0)
+    assert [(i["top_m"], i["base_m"], i["max_depth_m"], i["max_percent"]) for i in intervals] == [
+        (1020.0, 1023.0, 1021.0, 0.9), (1070.0, 1070.0, 1070.0, 2.0)
+    ]
+    assert [i["top_m"] for i in log.anomalies(ratio=3.0, limit=1)] == [1070.0]
+    assert [p["depth_m"] for p in log.peaks(ratio=3.0)] == [1070.0, 1021.0]
+
+def test_gas_columns_in_unknown_units_skipped():
+    table = """
+| Depth (m) | Total Gas (units) | C1 (%) |
+| --- | --- | --- |
+| 1500 | 250 | 1.5 |
+| 1510 | 40 | 0.2 |
+"""
+    log = GasLog.from_text(table)
+    # Gas units are not percent: the total comes from the components instead.
+    assert np.allclose(log.total_gas, [1.5, 0.2])
+    assert len(GasLog.from_text(table.replace("C1 (%)", "C1 (units)"))) == 0
+
+if __name__ == "__main__":
+    test_readings_from_tables_and_sentences()
+    test_log_built_piece_by_piece_matches_the_whole_text()
+    test_anomalous_intervals()
+    test_gas_columns_in_unknown_units_skipped()
+    print("Test Complete.")
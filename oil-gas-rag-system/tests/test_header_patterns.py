@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.header_patterns import extract_header_fields
+
+def test_labelled_fields():
+    text = """
+    DRILLING REPORT
+    Operator: Big Oil Corp
+    Well Name: Deep Earth 1
+    Spud Date: 2023-05-15
+    Drilling Rig: Noble 12
+    """
+    fields = extract_header_fields(text)
+    assert fields["well_name"] == ("Deep Earth 1", 0.95)
+    assert fields["operator"] == ("Big Oil Corp", 0.95)
+    assert fields["spud_date"][0] == "2023-05-15"
+    assert fields["rig"][0] == "Noble 12"
+    assert "field" not in fields
+
+def test_table_and_next_line_layouts():
+    text = "|Field|Californie|\n|Licence No.|T-123|\nWell Name\nCAL-GT-01\nOperator\n"
+    fields = extract_header_fields(text)
+    assert fields["field"] == ("Californie", 0.9)
+    assert fields["licence"] == ("T-123", 0.9)
+    # Value on the line below the label is less certain.
+    assert fields["well_name"] == ("CAL-GT-01", 0.7)
+    assert "operator" not in fields
+
+def test_implausible_values_get_low_confidence():
+    fields = extract_header_fields("Well Name: N/A\nSpud Date: unknown")
+    assert fields["well_name"][1] < 0.5
+    assert "spud_date" not in fields
+
+if __name__ == "__main__":
+    test_labelled_fields()
+    test_table_and_next_line_layouts()
+    test_implausible_values_get_low_confidence()
+    print("Test Complete.")
@@ -0,0 +1,68 @@
+import sys
+import os
+import asyncio
+import json
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import instrumentation
+from src.instrumentation import (
+    configure_instrumentation, count, prometheus_text, record_llm_response, report_trace, timed, timer
+)
+
+def test_disabled_is_a_noop():
+    configure_instrumentation({"instrumentation": False})
+    instrumentation.reset()
+    with report_trace("report.pdf") as trace:
+        with timer("find_tables"):
+            count("pages")
+    assert trace is None
+    assert "wellrag_pages_total" not in prometheus_text()
+
+    wrapped = timed("render")(prometheus_text)
+    assert wrapped.__name__ == "prometheus_text" and wrapped.__wrapped__ is prometheus_text
+
+def test_report_trace_collects_stages_and_ollama_stats():
+    with tempfile.TemporaryDirectory() as folder:
+        configure_instrumentation({"instrumentation": True, "trace_dir": folder})
+        instrumentation.reset()
+
+        async def extract():
+            with timer("llm"):
+                await asyncio.to_thread(count, "tables", 2)
+            record_llm_response({"eval_count": 40, "eval_duration": 2_000_000}, prompt_chars=120)
+
+        with report_trace("/data/report.pdf"):
+            with timer("find_tables"):
+                count("pages")
+            asyncio.run(extract())
+        # Outside the trace: only the process totals see it.
+        count("pages")
+
+        traces = [name for name in os.listdir(folder) if name.endswith(".trace.json")]
+        assert len(traces) == 1 and traces[0].startswith("report.pdf.")
+        with open(os.path.join(folder, traces[0])) as f:
+            trace = json.load(f)
+        assert trace["stages"]["find_tables"]["count"] == 1
+        assert trace["stages"]["llm"]["count"] == 1
+        assert trace["counters"] == {
+            "pages": 1, "tables": 2, "llm_calls": 1, "prompt_chars": 120,
+            "ollama_eval_count": 40, "ollama_eval_duration": 2_000_000
+        }
+
+        metrics = prometheus_text()
+        assert 'wellrag_stage_seconds_count{stage="find_tables"} 1' in metrics
+        assert "wellrag_pages_total 2" in metrics
+
+        # A same-named report in another folder gets its own trace file.
+        with report_trace("/archive/report.pdf"):
+            count("pages")
+        assert len([name for name in os.listdir(folder) if name.endswith(".trace.json")]) == 2
+        configure_instrumentation({"instrumentation": False})
+
+if __name__ == "__main__":
+    test_disabled_is_a_noop()
+    test_report_trace_collects_stages_and_ollama_stats()
+    print("Test Complete.")
@@ -0,0 +1,115 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_report import SECTIONS, generate_report
+from src.database_manager import DatabaseManager
+from src.job_runner import JobRunner, JobStore, STAGES
+from src.llm_cache import LLMCache
+from src.results_store import ResultsStore
+
+def _make_runner(folder: str, store: JobStore, **kwargs) -> JobRunner:
+    config_path = os.path.join(folder, "config.yaml")
+    with open(config_path, "w") as f:
+        f.write(f"chroma_db_path: {os.path.join(folder, 'db')}\n"
+                "collection_name: jobs_test\n"
+                "embedding_provider: hashing\n"
+                "embedding_cache_path: ''\n")
+    return JobRunner(DatabaseManager(config_path=config_path), store, max_attempts=3, backoff_seconds=0,
+                     cache=LLMCache(os.path.join(folder, "llm_cache.sqlite")), **kwargs)
+
+def test_failed_stage_is_retried():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=len(SECTIONS))
+        store = JobStore(os.path.join(folder, "jobs.sqlite"))
+        runner = _make_runner(folder, store)
+        # Two spellings of the same report are one job.
+        assert store.enqueue([pdf_path, os.path.join(folder, ".", "report.pdf")]) == 1
+
+        calls = []
+        def flaky_summary(text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise ConnectionError("LLM unavailable")
+            return "No drilling problems reported."
+        runner.geology_extractor.summarize_problems = flaky_summary
+
+        assert runner.run() == 1
+        assert "Total gas" in calls[0]
+        stages = {stage["stage"]: stage for stage in store.stages(pdf_path)}
+        assert stages["geology"]["attempts"] == 2
+        assert all(stages[stage]["status"] == "done" for stage in STAGES)
+        result = store.result(pdf_path)
+        assert result["header"]["well_name"] == "Synthetic 1"
+        assert len(result["specs"]["casing_data"]) == 5
+        assert result["geology"]["issues"] == ["No drilling problems reported."]
+
+        status = store.status()
+        assert status["jobs"]["done"] == 1 and status["total"] == 1
+        assert status["reports_per_hour"] > 0
+
+def test_resumes_after_crash_and_gives_up_after_max_attempts():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=len(SECTIONS))
+        jobs_path = os.path.join(folder, "jobs.sqlite")
+        store = JobStore(jobs_path)
+        runner = _make_runner(folder, store)
+        store.enqueue([pdf_path])
+
+        # A crash (anything that is not an Exception) in the middle of the header stage.
+        def crash(report, outputs):
+            raise KeyboardInterrupt
+        runner._run_header = crash
+        try:
+            runner.run()
+        except KeyboardInterrupt:
+            pass
+        store.close()
+
+        store = JobStore(jobs_path)
+        stages = {stage["stage"]: stage for stage in store.stages(pdf_path)}
+        assert stages["embedded"]["status"] == "done" and stages["embedded"]["output"]["chunks"] > 0
+        assert stages["header"]["status"] == "pending" and stages["header"]["attempts"] == 1
+
+        runner = _make_runner(folder, store)
+        runner.geology_extractor.summarize_problems = lambda text: (_ for _ in ()).throw(ConnectionError("down"))
+        assert runner.run() == 0
+        stages = {stage["stage"]: stage for stage in store.stages(pdf_path)}
+        # Completed stages were not run again.
+        assert stages["ingested"]["attempts"] == 1 and stages["embedded"]["attempts"] == 1
+        assert stages["header"]["status"] == "done"
+        assert stages["geology"]["status"] == "failed" and stages["geology"]["attempts"] == 3
+        assert store.status()["jobs"]["failed"] == 1
+
+        assert store.retry_failed() == 1
+        runner.geology_extractor.summarize_problems = lambda text: "Gas peak at 1520 m."
+        assert runner.run() == 1
+        assert store.result(pdf_path)["geology"]["issues"] == ["Gas peak at 1520 m."]
+
+def test_default_results_go_to_results_store():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=len(SECTIONS))
+        store = JobStore(os.path.join(folder, "jobs.sqlite"))
+        results = ResultsStore(os.path.join(folder, "results.sqlite"))
+        runner = _make_runner(folder, store, results_store=results)
+        runner.geology_extractor.summarize_problems = lambda text: "No drilling problems reported."
+        store.enqueue([pdf_path])
+
+        assert runner.run() == 1
+        geology = store.result(pdf_path)["geology"]
+        runner.close()
+        assert isinstance(geology["gas_peak"], str) and geology["gas_log"]["percent"] > 0
+        reopened = ResultsStore(os.path.join(folder, "results.sqlite"))
+        wells = reopened.wells(["well_name", "gas_peak_percent"])
+        assert list(wells["well_name"]) == ["Synthetic 1"]
+        assert wells["gas_peak_percent"][0] == geology["gas_log"]["percent"]
+        reopened.close()
+
+if __name__ == "__main__":
+    test_failed_stage_is_retried()
+    test_resumes_after_crash_and_gives_up_after_max_attempts()
+    test_default_results_go_to_results_store()
+    print("Test Complete.")
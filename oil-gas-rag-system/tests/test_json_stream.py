@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+
+import ollama
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.run_benchmarks import start_stub_llm
+from src.json_stream import IncrementalJSONParser, stream_json_chat, HEADER_SCHEMA, SPECS_SCHEMA
+
+class FakeStreamClient:
+    """Yields the given pieces as streamed chat parts and records how many were read."""
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.read = 0
+        self.kwargs = None
+
+    def chat(self, **kwargs):
+        self.kwargs = kwargs
+        def parts():
+            for piece in self.pieces:
+                self.read += 1
+                yield {"message": {"role": "assistant", "content": piece}, "done": False}
+        return parts()
+
+def test_parser_skips_chatter_and_invalid_objects():
+    parser = IncrementalJSONParser(SPECS_SCHEMA)
+    assert not parser.feed('Sure! {"note": "a } inside a string"} then ')
+    assert not parser.feed('{"casing_data": [{"size": "9 5/8", "depth": 4500}], ')
+    assert parser.partial() == {"casing_data": [{"size": "9 5/8", "depth": 4500}]}
+    assert parser.feed('"mud_data": []} and some more text')
+    assert parser.result == {"casing_data": [{"size": "9 5/8", "depth": 4500}], "mud_data": []}
+
+def test_generation_stops_at_the_complete_object():
+    answer = '{"well_name": "Deep Earth 1", "operator": "Big Oil Corp"}'
+    pieces = [answer[i:i + 5] for i in range(0, len(answer), 5)] + ["\n\nHope", " this", " helps!"]
+    client = FakeStreamClient(pieces)
+    partials = []
+    response = stream_json_chat("llama3.1", [], HEADER_SCHEMA, num_predict=64,
+                                on_partial=partials.append, client=client)
+
+    assert json.loads(response["message"]["content"]) == {"well_name": "Deep Earth 1", "operator": "Big Oil Corp"}
+    assert response["early_stop"]
+    assert client.read == len(pieces) - 3
+    assert client.kwargs["format"] == "json" and client.kwargs["options"] == {"num_predict": 64}
+    assert partials[0] == {"well_name": "Deep Earth 1"}
+
+def test_missing_keys_raise():
+    client = FakeStreamClient(['{"well_name": "Deep Earth 1"}'])
+    try:
+        stream_json_chat("llama3.1", [], HEADER_SCHEMA, client=client)
+    except ValueError as e:
+        assert "operator" in str(e)
+    else:
+        raise AssertionError("expected a ValueError")
+
+def test_streaming_over_http():
+    server = start_stub_llm()
+    try:
+        client = ollama.Client(host=f"http://127.0.0.1:{server.server_port}")
+        messages = [{"role": "user", "content": "Return well_name and operator as JSON."}]
+        response = stream_json_chat("llama3.1", messages, HEADER_SCHEMA, num_predict=128, client=client)
+        assert json.loads(response["message"]["content"])["operator"] == "Benchmark Energy AS"
+        assert response["early_stop"]
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_parser_skips_chatter_and_invalid_objects()
+    test_generation_stops_at_the_complete_object()
+    test_missing_keys_raise()
+    test_streaming_over_http()
+    print("Test Complete.")
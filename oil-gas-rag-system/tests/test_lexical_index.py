@@ -0,0 +1,105 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lexical_index import BM25Index, tokenize
+
+def test_tokenize_keeps_drilling_notation():
+    tokens = tokenize("Ran 13-3/8\" casing, MW 1.2 sg")
+    assert "13-3/8" in tokens and "13" in tokens and "3/8" in tokens
+    assert "1.2" in tokens
+
+def test_search_remove_and_reload():
+    with tempfile.TemporaryDirectory() as folder:
+        index = BM25Index(folder)
+        index.add(["a", "b", "c"], [
+            "13-3/8 casing set at 500m",
+            "LOT performed at 510m",
+            "sandstone and shale",
+        ])
+        assert index.search("LOT")[0][0] == "b"
+        assert index.search("13 3/8 casing")[0][0] == "a"
+
+        index.save()
+        reloaded = BM25Index(folder)
+        assert len(reloaded) == 3
+        assert reloaded.search("lot")[0][0] == "b"
+
+        reloaded.remove(["b"])
+        reloaded.add(["a"], ["kick taken while drilling"])
+        reloaded.save()
+        reloaded.close()
+
+        reloaded = BM25Index(folder)
+        assert reloaded.search("lot") == []
+        assert reloaded.search("casing") == []
+        assert reloaded.search("kick")[0][0] == "a"
+        reloaded.close()
+        index.close()
+
+def test_search_ranks_only_allowed_docs():
+    with tempfile.TemporaryDirectory() as folder:
+        index = BM25Index(folder)
+        index.add(["a", "b", "c"], [
+            "casing casing casing set at 500m",
+            "casing set at 1200m",
+            "sandstone and shale",
+        ])
+        assert [doc_id for doc_id, _ in index.search("casing", k=1)] == ["a"]
+        # The filter is applied before the top k, so a weaker allowed hit is still returned.
+        assert [doc_id for doc_id, _ in index.search("casing", k=1, allowed={"b", "c", "unknown"})] == ["b"]
+        assert index.search("casing", allowed=set()) == []
+        # Scores do not depend on the filter.
+        assert dict(index.search("casing"))["b"] == index.search("casing", allowed={"b"})[0][1]
+        index.close()
+
+def test_segments_are_merged():
+    with tempfile.TemporaryDirectory() as folder:
+        index = BM25Index(folder)
+        for i in range(BM25Index.MAX_SEGMENTS + 1):
+            index.add([f"doc{i}"], [f"formation top number{i}"])
+            index.save()
+        assert len(index.segments) == 1
+        index.close()
+
+        reloaded = BM25Index(folder)
+        assert len(reloaded.search("formation", k=20)) == BM25Index.MAX_SEGMENTS + 1
+        assert reloaded.search("number3")[0][0] == "doc3"
+        reloaded.close()
+
+def test_deleted_docs_are_compacted_and_not_counted():
+    with tempfile.TemporaryDirectory() as folder:
+        index = BM25Index(os.path.join(folder, "churned"))
+        fresh = BM25Index(os.path.join(folder, "fresh"))
+        fresh.add(["b", "a"], ["lost circulation", "kick at 1500m"])
+        index.add(["b"], ["lost circulation"])
+        for i in range(BM25Index.MAX_SEGMENTS + 1):
+            # Replaced and removed chunks leave deleted postings of "kick" behind.
+            index.add(["a", f"tmp{i}"], ["kick at 1500m", "kick"])
+            index.remove([f"tmp{i}"])
+            assert index.search("kick") == fresh.search("kick")
+            index.save()
+
+        # The merge dropped the deleted docs from the doc table.
+        assert len(index.segments) == 1 and index.deleted == set()
+        with open(os.path.join(folder, "churned", "docs.ids")) as f:
+            assert f.read().split() == ["b", "a"]
+        assert index.search("kick") == fresh.search("kick")
+        index.close()
+
+        reloaded = BM25Index(os.path.join(folder, "churned"))
+        assert len(reloaded) == 2 and reloaded.deleted == set()
+        assert reloaded.search("kick lost", k=5) == fresh.search("kick lost", k=5)
+        reloaded.close()
+        fresh.close()
+
+if __name__ == "__main__":
+    test_tokenize_keeps_drilling_notation()
+    test_search_remove_and_reload()
+    test_search_ranks_only_allowed_docs()
+    test_segments_are_merged()
+    test_deleted_docs_are_compacted_and_not_counted()
+    print("Test Complete.")
@@ -0,0 +1,60 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_cache import LLMCache
+
+def _response(content):
+    return {"message": {"role": "assistant", "content": content}}
+
+def test_cache_hits_and_misses():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = LLMCache(os.path.join(folder, "cache.sqlite"))
+        calls = []
+        messages = [{"role": "user", "content": "Extract the well name."}]
+
+        def call():
+            calls.append(1)
+            return _response("Deep Earth 1")
+
+        first = cache.chat("llama3.1", messages, call)
+        second = cache.chat("llama3.1", messages, call)
+        assert first == second
+        assert len(calls) == 1
+
+        # Different model or options are different entries.
+        cache.chat("llama3.2", messages, call)
+        cache.chat("llama3.1", messages, call, options={"temperature": 0})
+        assert len(calls) == 3
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 3
+
+        # Persisted across instances.
+        cache.close()
+        reopened = LLMCache(cache.path)
+        assert reopened.chat("llama3.1", messages, call) == first
+        assert len(calls) == 3
+        reopened.close()
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = LLMCache(os.path.join(folder, "cache.sqlite"), max_entries=2)
+        for i in range(3):
+            cache.put(f"key{i}", "llama3.1", _response(str(i)))
+        cache.get("key0")
+        cache.put("key3", "llama3.1", _response("3"))
+        cache.evict()
+
+        assert cache.get("key0") is not None
+        assert cache.get("key3") is not None
+        assert cache.get("key1") is None
+        assert cache.stats()["entries"] == 2
+        cache.close()
+
+if __name__ == "__main__":
+    test_cache_hits_and_misses()
+    test_lru_eviction()
+    print("Test Complete.")
@@ -0,0 +1,38 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.run_benchmarks import start_stub_llm
+from src import llm_client
+from src.geology_extractor import GeologyExtractor
+from src.llm_cache import LLMCache
+
+def test_client_is_shared_and_configured():
+    server = start_stub_llm()
+    defaults = dict(llm_client._settings)
+    folder = tempfile.TemporaryDirectory()
+    try:
+        llm_client.configure_llm_client({"ollama_url": f"http://127.0.0.1:{server.server_port}",
+                                         "llm_model": "llama3.1:8b-instruct-q4_k_m", "llm_keep_alive": "1h"})
+        client = llm_client.get_llm_client()
+        assert llm_client.get_llm_client() is client
+        # Unchanged settings keep the pooled client.
+        llm_client.configure_llm_client({"llm_model": "llama3.1:8b-instruct-q4_k_m"})
+        assert llm_client.get_llm_client() is client
+
+        extractor = GeologyExtractor(cache=LLMCache(os.path.join(folder.name, "cache.sqlite")))
+        assert extractor.model == "llama3.1:8b-instruct-q4_k_m"
+        assert extractor.summarize_problems("Gas peak 4.2 % at 1900 m.") == "No drilling problems reported."
+
+        llm_client.warm_up(background=True).join(timeout=5)
+    finally:
+        server.shutdown()
+        folder.cleanup()
+        llm_client.configure_llm_client(**defaults)
+
+if __name__ == "__main__":
+    test_client_is_shared_and_configured()
+    print("Test Complete.")
@@ -0,0 +1,55 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.manifest import IngestManifest, report_path
+
+def test_manifest_tracks_changes():
+    with tempfile.TemporaryDirectory() as folder:
+        report = os.path.join(folder, "report.pdf")
+        with open(report, "wb") as f:
+            f.write(b"version 1")
+
+        manifest = IngestManifest(os.path.join(folder, "manifest.json"))
+        assert not manifest.is_unchanged(report)
+
+        manifest.record(report)
+        manifest.save()
+        assert IngestManifest(manifest.path).is_unchanged(report)
+
+        # Touched with identical content: still unchanged.
+        stat = os.stat(report)
+        os.utime(report, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert manifest.is_unchanged(report)
+
+        with open(report, "wb") as f:
+            f.write(b"version 2")
+        assert not manifest.is_unchanged(report)
+
+def test_report_path_is_one_spelling():
+    with tempfile.TemporaryDirectory() as folder:
+        report = os.path.join(folder, "report.pdf")
+        with open(report, "wb") as f:
+            f.write(b"version 1")
+        os.mkdir(os.path.join(folder, "sub"))
+        other_spelling = os.path.join(folder, "sub", "..", ".", "report.pdf")
+        assert report_path(other_spelling) == report_path(report)
+
+        manifest = IngestManifest(os.path.join(folder, "manifest.json"))
+        manifest.record(report)
+        assert manifest.is_unchanged(other_spelling)
+
+        cwd = os.getcwd()
+        os.chdir(folder)
+        try:
+            assert report_path("report.pdf") == report_path(report)
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_manifest_tracks_changes()
+    test_report_path_is_one_spelling()
+    print("Test Complete.")
@@ -0,0 +1,109 @@
+import sys
+import os
+import tempfile
+
+import fitz
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_report import generate_report
+from src.chunker import Chunker
+from src.outline import match_heading, outline_from_pages
+from src.utils import PDFIngestor, extraction_filter
+
+def test_heading_variants():
+    assert match_heading("4.0 Geology") == ("4.0 Geology", 1)
+    assert match_heading("4. Geology") == ("4 Geology", 1)
+    assert match_heading("4 GEOLOGY") == ("4 GEOLOGY", 1)
+    assert match_heading("4.2 Casing Design") == ("4.2 Casing Design", 2)
+    assert match_heading("3 stands pulled out of hole.") is None
+    assert match_heading("1200 Balder Formation") is None
+    assert match_heading("12 Heather Formation") is None
+    assert match_heading("15 MD Draupne") is None
+    assert match_heading("4.3 Formation Evaluation") == ("4.3 Formation Evaluation", 2)
+
+def test_depth_lines_do_not_end_a_section():
+    text = "4.0 Geology\nFormation tops:\n1200 Balder Formation\n3 Heather\nGas peak 4.2 % at 1215 m\n5.0 Casing"
+    outline = outline_from_pages([(1, text)], page_count=1)
+    assert [entry.title for entry in outline.entries] == ["4.0 Geology", "5.0 Casing"]
+    # "3 Heather" does not follow 4.0, so it is body text rather than a heading.
+    assert outline.section_text("Geology", lambda _: text) == text[:text.index("\n5.0 Casing")]
+
+def test_section_ranges_from_text():
+    pages = [
+        (1, "Intro\n4.0 Geology\nSandstone.\n4.1 Tops\nBalder at 1200m"),
+        (2, "Shale.\n5 CASING\n13 3/8 at 500m"),
+    ]
+    outline = outline_from_pages(pages, page_count=2)
+    texts = dict(pages)
+    assert outline.pages("geology") == [1, 2]
+    assert outline.section_text("Geology", texts.get) == "4.0 Geology\nSandstone.\n4.1 Tops\nBalder at 1200m\nShale."
+    assert outline.section_text("Tops", texts.get) == "4.1 Tops\nBalder at 1200m\nShale."
+    assert outline.pages("Casing") == [2]
+    assert outline.pages("Cementing") == []
+
+def test_outline_from_fonts_and_toc():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=20)
+        ingestor = PDFIngestor(pdf_path)
+        assert ingestor.outline().origin == "fonts"
+        geology_pages = ingestor.section_pages("Geology")
+        assert geology_pages and ingestor.section_text("Geology").startswith("4.0 Geology")
+        ingestor.close()
+
+        doc = fitz.open(pdf_path)
+        doc.set_toc([[1, "Geology", geology_pages[0]], [1, "Casing", geology_pages[-1] + 1]])
+        toc_path = os.path.join(folder, "report_toc.pdf")
+        doc.save(toc_path)
+        doc.close()
+
+        ingestor = PDFIngestor(toc_path)
+        assert ingestor.outline().origin == "toc"
+        assert ingestor.section_pages("4 GEOLOGY") == geology_pages
+        ingestor.close()
+
+def _write_pages(pdf_path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(pdf_path)
+    doc.close()
+
+def test_streamed_pages_carry_the_outline_headings():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "report.pdf")
+        _write_pages(pdf_path, [
+            "Well 15/9-F-11\nDaily drilling summary",
+            "4.0 Geology\nFormation tops:\n1200 Balder Formation\nSandstone.",
+            "Shale with gas shows.",
+            "5.0 Casing\n13 3/8 at 500m",
+            "6.0 Drilling Fluids\nMud weight 1.2 sg",
+        ])
+        ingestor = PDFIngestor(pdf_path)
+        pages = list(ingestor.iter_pages())
+        # Depth lines are not headings, so the section runs on to "5.0 Casing".
+        assert [[entry.title for entry in page.headings] for page in pages] == \
+            [[], ["4.0 Geology"], [], ["5.0 Casing"], ["6.0 Drilling Fluids"]]
+        assert [page.section for page in pages] == ["Header", "4.0 Geology", "4.0 Geology", "5.0 Casing",
+                                                    "6.0 Drilling Fluids"]
+        assert ingestor.outline().pages("Geology") == [2, 3]
+
+        # The chunker splits at the same headings.
+        chunks = pages[1].to_chunks(pdf_path, Chunker(max_tokens=200))
+        assert [chunk["metadata"]["section"] for chunk in chunks] == ["4.0 Geology"]
+
+        # A streaming parse keeps the header and the pages of the named sections only.
+        parsed_doc = ingestor.parse_document(keep=extraction_filter(1, ["Geology", "Casing"], ["Casing"]))
+        assert [page.number for page in parsed_doc.pages] == [1, 2, 3, 4]
+        assert parsed_doc.section_text("Geology") == ingestor.section_text("Geology")
+        assert "Sandstone." in parsed_doc.section_text("Geology") and "13 3/8" not in parsed_doc.section_text("Geology")
+        ingestor.close()
+
+if __name__ == "__main__":
+    test_heading_variants()
+    test_depth_lines_do_not_end_a_section()
+    test_section_ranges_from_text()
+    test_outline_from_fonts_and_toc()
+    test_streamed_pages_carry_the_outline_headings()
+    print("Test Complete.")
@@ -0,0 +1,131 @@
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.run_benchmarks import start_stub_llm, write_config
+from benchmarks.synthetic_report import generate_report
+from main import WellReportPipeline, make_server, _ingest_and_store, _report_gas_log
+from src.database_manager import DatabaseManager
+from src.gas_log import GasLog
+from src.manifest import IngestManifest
+from src.utils import PDFIngestor
+from src import llm_client
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def _request(url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_import_does_not_load_heavy_modules():
+    code = "import sys, main; print(sorted(m for m in ('chromadb', 'fitz', 'ollama', 'numpy') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
+
+def test_service_reuses_one_pipeline():
+    llm = start_stub_llm()
+    defaults = dict(llm_client._settings)
+    folder = tempfile.TemporaryDirectory()
+    server = None
+    try:
+        config_path = write_config(folder.name, f"http://127.0.0.1:{llm.server_port}")
+        with open(config_path, "a") as f:
+            f.write(f'results_db_path: "{os.path.join(folder.name, "results.sqlite")}"\n')
+        pdf_path = generate_report(os.path.join(folder.name, "report.pdf"), pages=3)
+
+        pipeline = WellReportPipeline(config_path)
+        server = make_server(pipeline, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://127.0.0.1:%d" % server.server_address[1]
+
+        status, response = _request(url + "/process", {"pdf_path": pdf_path})
+        assert status == 200
+        assert response["well_data"]["specs"]["casing_data"]
+        db = pipeline.db
+
+        # The second report is unchanged: same clients, nothing re-ingested.
+        status, response = _request(url + "/process", {"pdf_paths": [pdf_path]})
+        assert status == 200 and len(response["results"]) == 1
+        assert pipeline.db is db
+        assert _request(url + "/health") == (200, {"status": "ok", "reports_processed": 2})
+        assert _request(url + "/process", {"path": pdf_path})[0] == 400
+
+        # Missing reports are rejected, not processed as the mock report.
+        missing = os.path.join(folder.name, "missing.pdf")
+        assert _request(url + "/process", {"pdf_path": missing}) == (404, {"error": "PDF not found", "missing": [missing]})
+        assert _request(url + "/process", {"pdf_paths": [pdf_path, missing]})[0] == 404
+        assert pipeline.db.get_report_chunks("missing.pdf") == []
+        assert _request(url + "/health")[1]["reports_processed"] == 2
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.pipeline.close()
+        llm.shutdown()
+        folder.cleanup()
+        llm_client.configure_llm_client(**defaults)
+
+def test_single_report_is_streamed_into_the_database():
+    with tempfile.TemporaryDirectory() as folder:
+        config_path = write_config(folder, "http://127.0.0.1:1")
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=20)
+        db = DatabaseManager(config_path=config_path)
+        chunks, parsed_doc, gas_log, unchanged = _ingest_and_store(db, pdf_path, allow_mock=False)
+
+        # Every page went to the database; only the header, geology and spec-table pages were kept.
+        assert chunks == [] and not unchanged
+        stored_pages = {metadata["page"] for metadata in db.collection.get(where={"source": pdf_path})["metadatas"]}
+        assert stored_pages == set(range(1, 21))
+        kept = [page.number for page in parsed_doc.pages]
+        assert kept[:3] == [1, 2, 3] and len(kept) < 20
+        assert "|3200|53.5|" in "".join(page.full_text for page in parsed_doc.pages_with_keywords(["Casing"]))
+        # The geology section is read from its kept pages, located by the outline of the pass.
+        ingestor = PDFIngestor(pdf_path)
+        geology = ingestor.section_text("Geology")
+        assert set(ingestor.section_pages("Geology")) <= set(kept)
+        ingestor.close()
+        assert geology and parsed_doc.section_text("Geology") == geology
+        assert db.manifest.is_unchanged(pdf_path)
+
+        # The gas readings collected page by page match those read back from the stored chunks.
+        stored = GasLog.from_text("\n".join(db.get_report_chunks(pdf_path)))
+        assert len(gas_log) == len(stored) > 0
+        assert _report_gas_log(db, pdf_path).summary() == gas_log.summary() == stored.summary()
+        db.close()
+
+def test_reset_collection_forgets_ingested_reports():
+    with tempfile.TemporaryDirectory() as folder:
+        config_path = write_config(folder, "http://127.0.0.1:1")
+        pdf_path = generate_report(os.path.join(folder, "report.pdf"), pages=5)
+        db = DatabaseManager(config_path=config_path)
+        _ingest_and_store(db, pdf_path, allow_mock=False)
+
+        db.reset_collection()
+        assert not db.manifest.is_unchanged(pdf_path)
+        assert not IngestManifest(db.manifest.path).is_unchanged(pdf_path)
+
+        # Re-ingesting the same report stores it again instead of skipping it as unchanged.
+        _, parsed_doc, _, unchanged = _ingest_and_store(db, pdf_path, allow_mock=False)
+        assert not unchanged and parsed_doc is not None
+        assert len(db.collection.get(where={"source": pdf_path})["ids"]) >= 5
+        assert db.manifest.is_unchanged(pdf_path)
+        db.close()
+
+if __name__ == "__main__":
+    test_import_does_not_load_heavy_modules()
+    test_service_reuses_one_pipeline()
+    test_single_report_is_streamed_into_the_database()
+    test_reset_collection_forgets_ingested_reports()
+    print("Test Complete.")
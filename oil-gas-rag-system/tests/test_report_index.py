@@ -0,0 +1,45 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.report_index import ReportIndex, section_key
+
+def test_section_key_ignores_numbering_and_case():
+    assert section_key("4.0 Geology") == "geology"
+    assert section_key("4. Geology") == "geology"
+    assert section_key("Geology") == "geology"
+    assert section_key(None) == ""
+
+def test_lookup_is_scoped_to_one_report():
+    with tempfile.TemporaryDirectory() as folder:
+        index = ReportIndex(os.path.join(folder, "index.sqlite"))
+        for source in ("a.pdf", "b.pdf"):
+            index.add(
+                [f"{source}-1", f"{source}-2a", f"{source}-2b", f"{source}-3"],
+                [
+                    {"source": source, "page": 1, "section": "Header"},
+                    {"source": source, "page": 2, "section": "4.0 Geology", "chunk_index": 0},
+                    {"source": source, "page": 2, "section": "4.0 Geology", "chunk_index": 1},
+                    {"source": source, "page": 3, "section": "5.0 Casing"},
+                ]
+            )
+
+        assert index.lookup("a.pdf", page=1) == ["a.pdf-1"]
+        assert index.lookup("b.pdf", section="Geology") == ["b.pdf-2a", "b.pdf-2b"]
+        assert index.lookup("b.pdf", section="Geology", limit=1) == ["b.pdf-2a"]
+        assert index.sections("a.pdf") == [("Header", 1, 1), ("4.0 Geology", 2, 2), ("5.0 Casing", 3, 3)]
+
+        index.remove(["a.pdf-1"])
+        index.close()
+        reloaded = ReportIndex(os.path.join(folder, "index.sqlite"))
+        assert reloaded.lookup("a.pdf", page=1) == []
+        assert reloaded.has_source("a.pdf") and not reloaded.has_source("c.pdf")
+        reloaded.close()
+
+if __name__ == "__main__":
+    test_section_key_ignores_numbering_and_case()
+    test_lookup_is_scoped_to_one_report()
+    print("Test Complete.")
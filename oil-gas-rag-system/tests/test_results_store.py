@@ -0,0 +1,78 @@
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.results_store import ResultsStore, normalise_well_data
+from src.table_parser import parse_quantity
+
+def _well(name, casing, mud, gas_peak="N/A"):
+    return {
+        "header": {"well_name": name, "operator": "Deep Earth", "spud_date": "2023-05-15", "duration_days": 230},
+        "specs": {"casing_data": casing, "mud_data": mud},
+        "geology": {"issues": ["No drilling problems reported."], "gas_peak": gas_peak},
+    }
+
+def test_parse_quantity_normalises_units():
+    assert parse_quantity("4,500 ft", "depth") == 1371.6
+    assert parse_quantity("3000 m MD", "depth") == 3000.0
+    assert parse_quantity(12.0, "density") == 1.438  # bare densities above 3 are ppg
+    assert parse_quantity("1.25 sg", "density") == 1.25
+    assert parse_quantity("N/A", "weight") is None
+    # Bare numeric text is only read with its source unit.
+    assert parse_quantity("1500", "depth") is None
+    assert parse_quantity("1500", "depth", "ft") == 457.2
+    assert parse_quantity(1500, "depth", "ft") == 457.2
+
+def test_normalise_well_data():
+    well, casing, mud = normalise_well_data(_well(
+        "A-1", [{"size": '9 5/8"', "depth": "10,500 ft", "weight": "53.5 lb/ft"}],
+        [{"type": "OBM", "density": "10.5 ppg"}, {"type": "Spud Mud", "density": 1.05}], "3.2 %"
+    ))
+    assert casing == [(9.625, 3200.4, 53.5)]
+    _, casing, _ = normalise_well_data(_well("A-2", [{"size": '7"', "depth": "1500", "weight": 29.0}], []))
+    assert casing == [(7.0, None, 29.0)]
+    assert mud[0] == ("OBM", 1.258)
+    assert well["mud_weight_sg"] == 1.258
+    assert well["gas_peak_percent"] == 3.2
+    assert well["duration_days"] == 230
+    detailed = _well("A-3", [], [], "4.2 % at 1215 m (Brent Group)")
+    detailed["geology"]["gas_log"] = {"percent": 4.2, "depth_m": 1215.0}
+    assert normalise_well_data(detailed)[0]["gas_peak_percent"] == 4.2
+
+def test_cross_well_casing_query():
+    with tempfile.TemporaryDirectory() as folder:
+        store = ResultsStore(os.path.join(folder, "results.sqlite"), batch_size=2)
+        store.add("a.pdf", _well("A-1", [{"size": '13 3/8"', "depth": 1500.0, "weight": 68.0},
+                                         {"size": '9 5/8"', "depth": 3200.0, "weight": 53.5}],
+                                 [{"type": "OBM", "density": 1.45}]))
+        store.add("b.pdf", _well("B-2", [{"size": "9-5/8", "depth": "8000 ft", "weight": None}], []))
+        store.add("c.pdf", _well("C-3", [{"size": "9.625 in", "depth": "3500 m", "weight": "47 ppf"}], []))
+        # Re-adding a report replaces its rows.
+        store.add("b.pdf", _well("B-2", [{"size": "9-5/8", "depth": "9000 ft", "weight": None}], []))
+
+        deep = store.casing(size='9 5/8"', min_depth=3000)
+        assert list(deep["well_name"]) == ["A-1", "C-3"]
+        assert deep["depth_m"].dtype == np.float64
+        assert np.allclose(deep["depth_m"], [3200.0, 3500.0])
+
+        all_casing = store.casing(size=9.625)
+        assert len(all_casing["well_id"]) == 3
+        assert np.isnan(all_casing["weight_lbft"]).sum() == 1
+        assert np.allclose(store.mud(min_density=1.4)["density_sg"], [1.45])
+        assert len(store) == 3
+        store.close()
+
+        reopened = ResultsStore(os.path.join(folder, "results.sqlite"))
+        assert list(reopened.wells(["report"])["report"]) == ["a.pdf", "c.pdf", "b.pdf"]
+        reopened.close()
+
+if __name__ == "__main__":
+    test_parse_quantity_normalises_units()
+    test_normalise_well_data()
+    test_cross_well_casing_query()
+    print("Test Complete.")
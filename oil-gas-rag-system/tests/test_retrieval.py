@@ -0,0 +1,60 @@
+import sys
+import os
+import tempfile
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database_manager import DatabaseManager
+
+def _make_db(folder: str) -> DatabaseManager:
+    config_path = os.path.join(folder, "config.yaml")
+    with open(config_path, "w") as f:
+        f.write(f"chroma_db_path: {os.path.join(folder, 'db')}\n"
+                "collection_name: retrieval_test\n"
+                "embedding_provider: hashing\n"
+                f"embedding_cache_path: {os.path.join(folder, 'embeddings.sqlite')}\n")
+    db = DatabaseManager(config_path=config_path)
+    chunks = []
+    for source in ("a.pdf", "b.pdf"):
+        for page, (section, text) in enumerate([
+            ("Header", f"Well {source} operated by Deep Earth"),
+            ("4.0 Geology", f"Sandstone with shale, LOT at 510m in {source}"),
+            ("5.0 Casing", f"13-3/8 casing set at 500m in {source}"),
+        ], start=1):
+            chunks.append({"text": text, "metadata": {"source": source, "page": page, "section": section}})
+    db.save_chunks(chunks)
+    return db
+
+def test_get_report_chunks_is_scoped():
+    with tempfile.TemporaryDirectory() as folder:
+        db = _make_db(folder)
+        assert db.get_report_chunks("b.pdf", page=1) == ["Well b.pdf operated by Deep Earth"]
+        assert db.get_report_chunks("a.pdf", section="Geology") == ["Sandstone with shale, LOT at 510m in a.pdf"]
+        assert db.get_report_chunks("c.pdf", page=1) == []
+
+def test_get_chunks_many_matches_single_queries():
+    with tempfile.TemporaryDirectory() as folder:
+        db = _make_db(folder)
+        requests = [
+            ("LOT", None, 2),
+            ("casing depth", {"source": "a.pdf"}, 2),
+            ("", {"page": 1}, 5),
+            ("LOT", None, 2),
+            ("sandstone", {"source": "a.pdf"}, 1),
+        ]
+        expected = [db.get_chunks(query_text, n_results, where) for query_text, where, n_results in requests]
+
+        query_calls = []
+        query = db.collection.query
+        db.collection.query = lambda **kwargs: query_calls.append(kwargs) or query(**kwargs)
+
+        assert db.get_chunks_many(requests) == expected
+        # One query per distinct filter, each carrying all of that filter's query texts.
+        assert len(query_calls) == 2
+        assert sorted(len(call["query_embeddings"]) for call in query_calls) == [1, 2]
+
+if __name__ == "__main__":
+    test_get_report_chunks_is_scoped()
+    test_get_chunks_many_matches_single_queries()
+    print("Test Complete.")
@@ -0,0 +1,114 @@
+import sys
+import os
+import json
+import tempfile
+
+import chromadb
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database_manager import DatabaseManager
+from src.shards import ShardedCollection, pinned_values, shard_of
+
+def _make_db(folder: str, name: str, extra: str = "") -> DatabaseManager:
+    config_path = os.path.join(folder, f"{name}.yaml")
+    with open(config_path, "w") as f:
+        f.write(f"chroma_db_path: {os.path.join(folder, name)}\n"
+                f"collection_name: {name}\n"
+                "embedding_provider: hashing\n"
+                "embedding_cache_path: ''\n" + extra)
+    db = DatabaseManager(config_path=config_path)
+    chunks = []
+    for well in range(6):
+        source = f"well_{well}.pdf"
+        for page, text in enumerate([f"Well {well} operated by Deep Earth",
+                                     f"Sandstone with shale, LOT at {500 + well}m",
+                                     f"13-3/8 casing set at {1000 + 10 * well}m, mud losses"], start=1):
+            chunks.append({"text": text, "metadata": {"source": source, "page": page, "section": "Geology"}})
+    db.save_chunks(chunks)
+    return db
+
+def test_pinned_values():
+    assert pinned_values({"source": "a.pdf"}, "source") == ["a.pdf"]
+    assert pinned_values({"$and": [{"page": 1}, {"source": {"$in": ["a", "b"]}}]}, "source") == ["a", "b"]
+    assert pinned_values({"source": {"$ne": "a"}}, "source") is None
+    assert pinned_values({"page": 1}, "source") is None
+
+def test_sharded_results_match_a_single_collection():
+    with tempfile.TemporaryDirectory() as folder:
+        single = _make_db(folder, "single")
+        for extra in ("shard_count: 3\n", "shard_count: 3\nshard_directories: true\n"):
+            sharded = _make_db(folder, f"sharded_{len(extra)}", extra)
+            assert isinstance(sharded.collection, ShardedCollection)
+            assert sharded.collection.count() == 18 and max(sharded.collection.counts()) < 18
+
+            requests = [("casing depth", None, 6), ("LOT", {"source": "well_2.pdf"}, 2),
+                        ("mud losses", {"page": 3}, 6), ("", {"source": "well_4.pdf"}, 5)]
+            # The casing chunks are equally distant from the queries, so their order may differ.
+            assert ([sorted(chunks) for chunks in sharded.get_chunks_many(requests)]
+                    == [sorted(chunks) for chunks in single.get_chunks_many(requests)])
+            assert sharded.get_report_chunks("well_5.pdf", page=2) == ["Sandstone with shale, LOT at 505m"]
+
+            # A filter pinning the source only queries that report's shard.
+            queried = []
+            for number, shard in enumerate(sharded.collection.shards):
+                shard.query = (lambda query, number: lambda **kwargs: queried.append(number) or query(**kwargs))(
+                    shard.query, number)
+            sharded.get_chunks("LOT", 2, {"source": "well_1.pdf"})
+            assert queried == [shard_of("well_1.pdf", 3)]
+            sharded.close()
+
+def test_missing_shard_key_and_changed_layout_are_refused():
+    with tempfile.TemporaryDirectory() as folder:
+        db = _make_db(folder, "by_source", "shard_count: 3\n")
+        db.close()
+        for changed in ("shard_count: 4\n", "shard_count: 3\nshard_key: field\n", ""):
+            try:
+                _make_db(folder, "by_source", changed)
+                assert False, f"layout change accepted: {changed!r}"
+            except ValueError as e:
+                assert "fresh database" in str(e)
+
+        # The chunks carry no 'field', so they cannot be placed.
+        try:
+            _make_db(folder, "by_field", "shard_count: 3\nshard_key: field\n")
+            assert False, "chunks without the shard key were stored"
+        except ValueError as e:
+            assert "'field'" in str(e)
+
+def test_unrecorded_unsharded_database_keeps_one_shard():
+    with tempfile.TemporaryDirectory() as folder:
+        # A database created before shard layouts were recorded.
+        chromadb.PersistentClient(path=os.path.join(folder, "legacy")).get_or_create_collection("legacy")
+        try:
+            _make_db(folder, "legacy", "shard_count: 3\n")
+            assert False, "sharded layout adopted for an unsharded database"
+        except ValueError as e:
+            assert "fresh database" in str(e)
+        assert not os.path.exists(os.path.join(folder, "legacy", "legacy_shards.json"))
+
+        db = _make_db(folder, "legacy")
+        assert db.collection.count() == 18
+        db.close()
+        with open(os.path.join(folder, "legacy", "legacy_shards.json")) as f:
+            assert json.load(f) == {"shard_count": 1, "embedding_model": "hashing-256"}
+
+def test_changed_embedding_model_is_refused():
+    with tempfile.TemporaryDirectory() as folder:
+        _make_db(folder, "hashed").close()
+        with open(os.path.join(folder, "hashed", "hashed_shards.json")) as f:
+            assert json.load(f) == {"shard_count": 1, "embedding_model": "hashing-256"}
+        try:
+            _make_db(folder, "hashed", "embedding_dimensions: 128\n")
+            assert False, "collection opened with another embedding model"
+        except ValueError as e:
+            assert "hashing-256" in str(e) and "hashing-128" in str(e)
+
+if __name__ == "__main__":
+    test_pinned_values()
+    test_sharded_results_match_a_single_collection()
+    test_missing_shard_key_and_changed_layout_are_refused()
+    test_unrecorded_unsharded_database_keeps_one_shard()
+    test_changed_embedding_model_is_refused()
+    print("Test Complete.")
@@ -0,0 +1,124 @@
+import sys
+import os
+
+# Add the project root to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.table_parser import (parse_spec_tables, parse_size_inches, format_size, parse_quantity,
+                              normalise_specs, source_units)
+
+MOCK_MARKDOWN = """
+    | Casing Size | Depth (ft) | Weight (lb/ft) |
+    |---|---|---|
+    | 13 3/8" | 1,500 | 54.5 |
+    | 9-5/8 in | 4500 | 40.0 |
+
+    | Mud Type | Density (ppg) | Viscosity |
+    |---|---|---|
+    | Spud Mud | 8.5 | 40 |
+
+    | OD | Shoe MD (m) | Wt (kg/m) |
+    |---|---|---|
+    | 7" | 2500 | 43.16 |
+
+    | Fluid System | MW (sg) |
+    |---|---|
+    | OBM | 1.25 |
+"""
+
+def test_size_normalisation():
+    assert parse_size_inches('13 3/8"') == 13.375
+    assert parse_size_inches('13-3/8') == 13.375
+    assert parse_size_inches('9.625 in') == 9.625
+    assert parse_size_inches('n/a') is None
+    assert format_size(13.375) == '13 3/8"'
+    assert format_size(7.0) == '7"'
+
+def test_standard_tables_parsed_without_llm():
+    specs = parse_spec_tables(MOCK_MARKDOWN)
+
+    assert specs["unparsed"] == []
+    assert specs["casing_data"] == [
+        {"size": '13 3/8"', "depth": 457.2, "weight": 54.5},
+        {"size": '9 5/8"', "depth": 1371.6, "weight": 40.0},
+        {"size": '7"', "depth": 2500.0, "weight": 29.002},
+    ]
+    assert specs["mud_data"] == [
+        {"type": "Spud Mud", "density": 1.019},
+        {"type": "OBM", "density": 1.25},
+    ]
+
+def test_unclear_tables_left_for_llm():
+    markdown = """
+    | Casing | Remarks |
+    |---|---|
+    | Surface casing set without problems | cemented to surface |
+
+    | Bit | Type |
+    |---|---|
+    | 1 | PDC |
+    """
+    specs = parse_spec_tables(markdown)
+    assert specs["casing_data"] == [] and specs["mud_data"] == []
+    # Only the casing-looking table needs the LLM; the bit record is ignored.
+    assert len(specs["unparsed"]) == 1
+    assert "Casing" in specs["unparsed"][0]
+
+def test_bit_run_tables_are_not_casing():
+    markdown = """
+    | Hole Size | Depth (m) | Bit Type |
+    |---|---|---|
+    | 17 1/2" | 500 | Milled tooth |
+    | 12 1/4" | 1500 | PDC |
+
+    | Size | Depth (m) |
+    |---|---|
+    | 9 5/8" | 3200 |
+    """
+    specs = parse_spec_tables(markdown)
+    assert specs["casing_data"] == []
+    # The bit record is ignored; the size table without a casing hint goes to the LLM.
+    assert specs["unparsed"] == ['| Size | Depth (m) |\n| --- | --- |\n| 9 5/8" | 3200 |']
+
+def test_weight_unit_spellings():
+    markdown = """
+    | Casing Size | Depth (m) | Weight (lbs/ft) |
+    |---|---|---|
+    | 9 5/8" | 3200 | 53.5 |
+
+    | Casing | Depth (m) | Weight (lbm/ft.) |
+    |---|---|---|
+    | 7" | 4100 | 29 |
+
+    | Casing | Depth (m) | Weight (kg/m3) |
+    |---|---|---|
+    | 5" | 4500 | 18 |
+    """
+    specs = parse_spec_tables(markdown)
+    assert [row["weight"] for row in specs["casing_data"]] == [53.5, 29.0]
+    # kg/m3 is not a weight per length: the table goes to the LLM instead of losing its weights.
+    assert specs["unparsed"] == ['| Casing | Depth (m) | Weight (kg/m3) |\n| --- | --- | --- |\n| 5" | 4500 | 18 |']
+    assert parse_quantity("53.5 lbs/ft", "weight") == 53.5
+
+def test_llm_rows_normalised_with_header_units():
+    unparsed = '| Csg | Depth (ft) | Wt (lb/ft) |\n| --- | --- | --- |\n| 9-5/8 | 1500 | 40 |'
+    units = source_units(unparsed)
+    assert units == {"depth": "ft", "weight": "lb/ft"}
+    llm_specs = {"casing_data": [{"size": "9-5/8", "depth": "1500", "weight": "40"},
+                                 {"size": "7 in", "depth": "2000 m", "weight": None},
+                                 {"size": "N/A", "depth": "3000"}],
+                 "mud_data": [{"type": "OBM", "density": "10.2 ppg"}, {"type": "WBM", "density": None}]}
+    assert normalise_specs(llm_specs, units) == {
+        "casing_data": [{"size": '9 5/8"', "depth": 457.2, "weight": 40.0},
+                        {"size": '7"', "depth": 2000.0, "weight": None}],
+        "mud_data": [{"type": "OBM", "density": 1.222}],
+    }
+
+if __name__ == "__main__":
+    test_size_normalisation()
+    test_standard_tables_parsed_without_llm()
+    test_unclear_tables_left_for_llm()
+    test_bit_run_tables_are_not_casing()
+    test_weight_unit_spellings()
+    test_llm_rows_normalised_with_header_units()
+    print("Test Complete.")